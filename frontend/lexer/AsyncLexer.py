@@ -0,0 +1,259 @@
+"""
+Asynchronous lexer for the frontend.
+
+Notes
+-----
+The tokenize module pulls the source line by line with a blocking `readline`, and a
+token may need more than one line (e.g. a multi-line string, or the NAME after `$` that
+is merged into a CNAME), so it can't be suspended in the middle of a token. AsyncLexer
+runs it in a worker thread instead, and hands it the complete lines received so far. A
+line that is cut by a chunk boundary is kept until the rest of it arrives, and the
+tokenizer simply waits for the next line when it needs one.
+
+The stream is decoded as UTF-8, invalid bytes are replaced with U+FFFD (both in the
+source and in the tokens), so the stream is tokenized the same as a source with these
+characters rather than failing.
+
+References
+----------
+[1] https://docs.python.org/3/library/tokenize.html
+[2] https://docs.python.org/3/library/asyncio-stream.html
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import asyncio
+import collections
+import queue
+import tokenize
+from concurrent.futures import Executor
+from .TokenInfo import *
+from .Lexer import wrapTokens
+
+if typing.TYPE_CHECKING:
+    from pegen.tokenizer import Tokenizer
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'AsyncLexer',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+class AsyncLexer:
+    """
+    A lexer that tokenizes an asynchronous byte stream while it is being received.
+
+    Attributes
+    ----------
+    received: int
+        The number of bytes received so far.
+    _stream: typing.AsyncIterable[bytes]
+        The byte stream, in chunks of any size.
+    _chunks: typing.List[bytes]
+        The chunks received so far.
+    _lines: queue.SimpleQueue
+        The batches of complete lines for the tokenizer, None at the end of the stream.
+    _pending: typing.Deque[bytes]
+        The lines of the current batch that the tokenizer didn't read yet.
+    _finished: bool
+        Whether the tokenizer reached the end of the stream.
+    _feeding: typing.Optional[asyncio.Future]
+        The task that reads the stream.
+
+    Notes
+    -----
+    The tokens are the same as the ones of `Lexer.wrapper` for the whole source. The
+    stream can only be tokenized once, either with `tokens` (on the event loop) or with
+    `wrapper` and `tokenize` (in a worker thread, e.g. by the parser).
+
+    Doctests
+    --------
+    >>> async def chunks():
+    ...     yield b'package $a'
+    ...     yield b'bc\\n'
+    >>> async def main():
+    ...     return [token.string async for token in AsyncLexer(chunks())]
+    >>> asyncio.run(main())
+    ['package', '$abc', '\\n', '']
+    """
+    received: int
+    _stream: typing.AsyncIterable[bytes]
+    _chunks: typing.List[bytes]
+    _lines: queue.SimpleQueue
+    _pending: typing.Deque[bytes]
+    _finished: bool
+    _feeding: typing.Optional[asyncio.Future]
+
+    def __init__(self, stream: typing.AsyncIterable[bytes]):
+        """
+        Parameters
+        ----------
+        stream: typing.AsyncIterable[bytes]
+            The byte stream, e.g. an async generator of chunks or an asyncio.StreamReader.
+        """
+        self.received = 0
+        self._stream = stream
+        self._chunks = []
+        self._lines = queue.SimpleQueue()
+        self._pending = collections.deque()
+        self._finished = False
+        self._feeding = None
+
+    @property
+    def source(self) -> str:
+        """
+        The source code received so far, i.e. the whole source once `feed` has returned.
+        """
+        return b''.join(self._chunks).decode('utf-8', errors='replace')
+
+    # Receiving
+    # --------->
+
+    async def feed(self):
+        """
+        Reads the whole stream, lines are handed to the tokenizer as soon as they are complete.
+
+        Notes
+        -----
+        It is started by `tokens` too, and can be awaited any number of times. If the stream
+        fails, the tokenizer sees the end of the source and the error is raised here.
+        """
+        if self._feeding is None:
+            self._feeding = asyncio.ensure_future(self._feed())
+        await self._feeding
+
+    async def _feed(self):
+        partial: typing.List[bytes] = []
+        try:
+            async for chunk in self._stream:
+                if not chunk:
+                    continue
+                self._chunks.append(chunk)
+                self.received += len(chunk)
+                end = chunk.rfind(b'\n') + 1
+                if not end:
+                    partial.append(chunk)
+                    continue
+                partial.append(chunk[:end])
+                lines = b''.join(partial).split(b'\n')
+                lines.pop()
+                self._lines.put([line + b'\n' for line in lines])
+                partial = [chunk[end:]] if end < len(chunk) else []
+        finally:
+            if partial:
+                self._lines.put([b''.join(partial)])
+            self._lines.put(None)
+
+    def readline(self) -> bytes:
+        """
+        Returns the next line of the source, blocking until it is received.
+
+        Notes
+        -----
+        This method is meant for worker threads, it must never be called on the event loop.
+        """
+        while not self._pending:
+            if self._finished:
+                return b''
+            batch = self._lines.get()
+            if batch is None:
+                self._finished = True
+                return b''
+            self._pending.extend(batch)
+        return self._pending.popleft()
+
+    def _readText(self) -> str:
+        # Lines never split a UTF-8 sequence, so they are decoded the same way as `source`
+        return self.readline().decode('utf-8', errors='replace')
+
+    # Tokenizing
+    # ---------->
+
+    def wrapper(self) -> typing.Iterator[TokenInfo]:
+        """
+        Returns the blocking TokenInfo stream, see `Lexer.wrapper`.
+
+        Notes
+        -----
+        The stream must be fed by `feed` on the event loop, while this is consumed in a
+        worker thread. Nothing is read before the first token is requested, so this can be
+        called on the event loop.
+        """
+        yield from wrapTokens(tokenize.generate_tokens(self._readText))
+
+    def tokenize(self) -> Tokenizer:
+        """
+        Returns a tokenizer for the parser, that blocks until the tokens are received.
+
+        Notes
+        -----
+        The parser must run in a worker thread, e.g. with `loop.run_in_executor`, so it
+        parses the beginning of the source while the rest is still being received.
+        """
+        from pegen.tokenizer import Tokenizer
+        return Tokenizer(self.wrapper())
+
+    def _produce(self, loop: asyncio.AbstractEventLoop, tokens: asyncio.Queue):
+        # The tokens of a line are sent at once, right before the tokenizer waits for the next line
+        batch: typing.List[TokenInfo] = []
+
+        def send(item: typing.Any):
+            loop.call_soon_threadsafe(tokens.put_nowait, item)
+
+        def readline() -> bytes:
+            if batch:
+                send(batch.copy())
+                batch.clear()
+            return self._readText()
+
+        try:
+            for token in wrapTokens(tokenize.generate_tokens(readline)):
+                batch.append(token)
+            send(batch)
+            send(None)
+        except BaseException as error:
+            send(error)
+
+    async def tokens(self, executor: typing.Optional[Executor] = None) -> typing.AsyncIterator[TokenInfo]:
+        """
+        Yields the tokens as soon as they are complete.
+
+        Parameters
+        ----------
+        executor: typing.Optional[Executor]
+            The worker pool that runs the tokenizer, or None to use the default pool of the loop.
+
+        Returns
+        -------
+        typing.AsyncIterator[TokenInfo]
+            The TokenInfo stream.
+        """
+        loop = asyncio.get_running_loop()
+        tokens: asyncio.Queue = asyncio.Queue()
+        feeding = asyncio.ensure_future(self.feed())
+        producing = loop.run_in_executor(executor, self._produce, loop, tokens)
+        while True:
+            item = await tokens.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                # An error of the stream takes precedence over the error it caused in the tokenizer
+                await feeding
+                raise item
+            for token in item:
+                yield token
+        await producing
+        await feeding
+
+    def __aiter__(self) -> typing.AsyncIterator[TokenInfo]:
+        return self.tokens()
@@ -0,0 +1,266 @@
+"""
+Token cursor for the parser.
+
+Notes
+-----
+pegen's tokenizer pulls the tokens from a generator while the parser runs, and every
+`peek` and `getnext` checks whether the next token has to be read first. KiwiTokenizer
+gets all the tokens up front (already filtered the same way), so the parser only moves
+an index over a list: `mark`, `reset`, `peek` and `getnext` are O(1) and allocate nothing.
+
+It is a drop-in replacement of `pegen.tokenizer.Tokenizer`, including the position of
+syntax errors: `diagnose` returns the furthest token the parser looked at, which is the
+last token pegen's tokenizer would have read.
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import tokenize
+from .TokenInfo import *
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'KiwiTokenizer',
+    'filterTokens',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+def filterTokens(tokens: typing.Iterable[TokenInfo]) -> typing.Iterator[TokenInfo]:
+    """
+    Drops the tokens that pegen's tokenizer skips, i.e. whitespace error tokens and
+    consecutive NEWLINE tokens.
+    """
+    previous = None
+    for token in tokens:
+        if token.type == tokenize.ERRORTOKEN and token.string.isspace():
+            continue
+        if token.type == tokenize.NEWLINE and previous == tokenize.NEWLINE:
+            continue
+        previous = token.type
+        yield token
+
+
+class KiwiTokenizer:
+    """
+    An index into a prefilled token list, compatible with pegen's tokenizer.
+
+    Attributes
+    ----------
+    _array: typing.List[TokenInfo]
+        All the tokens (possibly of other sources too, see `_start` and `_size`).
+    _start: int
+        The index of the first token in `_array`.
+    _size: int
+        The index after the last token in `_array`, i.e. the number of tokens when `_start` is 0.
+    _index: int
+        The index of the next token.
+    _fill: int
+        The index after the furthest token the parser looked at, i.e. the furthest peek plus one.
+    _source: str
+        The source, used by `get_lines`.
+    _error: typing.Optional[Exception]
+        The error that stopped the tokenize module, raised when the parser needs the
+        token after the last one.
+    _released: int
+        The index of the first token that is not dropped, see `release`.
+    _lastReleased: typing.Optional[TokenInfo]
+        The last dropped token that is not whitespace, see `get_last_non_whitespace_token`.
+
+    Notes
+    -----
+    Tokenize errors (e.g. an unterminated string) are raised when the parser reaches
+    them, as with pegen's tokenizer, so an earlier syntax error is still reported first.
+
+    Marks are indices in `_array`, so they start at `_start` rather than 0.
+
+    Doctests
+    --------
+    >>> from frontend.lexer import Lexer
+    >>> tokenizer = Lexer().load('package a\\n').tokenize()
+    >>> mark = tokenizer.mark()
+    >>> tokenizer.getnext().string, tokenizer.peek().string
+    ('package', 'a')
+    >>> tokenizer.reset(mark)
+    >>> tokenizer.peek().string
+    'package'
+    """
+    _array: typing.List[TokenInfo]
+    _start: int
+    _size: int
+    _index: int
+    _fill: int
+    _source: str
+    _error: typing.Optional[Exception]
+    _released: int
+    _lastReleased: typing.Optional[TokenInfo]
+
+    def __init__(self, tokens: typing.List[TokenInfo], source: str = str(), error: typing.Optional[Exception] = None,
+                 *, start: int = 0, end: typing.Optional[int] = None):
+        """
+        Parameters
+        ----------
+        tokens: typing.List[TokenInfo]
+            The tokens, already filtered (see `filterTokens`).
+        source: str
+            The source code.
+        error: typing.Optional[Exception]
+            The error raised by the tokenize module after the last token, if any.
+        start: int
+            The index of the first token of the source in `tokens`.
+        end: typing.Optional[int]
+            The index after the last token of the source in `tokens`, its length by default.
+        """
+        self._array = tokens
+        self._start = start
+        self._size = len(tokens) if end is None else end
+        self._index = start
+        self._fill = start
+        self._source = source
+        self._error = error
+        self._released = start
+        self._lastReleased = None
+
+    @classmethod
+    def fromStream(cls, tokens: typing.Iterable[TokenInfo], source: str = str()) -> KiwiTokenizer:
+        """
+        Reads a whole TokenInfo stream (e.g. `Lexer.wrapper`) into a tokenizer.
+        """
+        array: typing.List[TokenInfo] = []
+        try:
+            array.extend(filterTokens(tokens))
+        except (tokenize.TokenError, SyntaxError) as error:
+            return cls(array, source, error)
+        return cls(array, source)
+
+    def __len__(self) -> int:
+        return self._size - self._start
+
+    @property
+    def _tokens(self) -> typing.List[TokenInfo]:
+        # The tokens pegen's tokenizer would have read so far
+        return self._array[self._start:self._fill]
+
+    def _pastEnd(self) -> typing.NoReturn:
+        if self._error is not None:
+            raise self._error
+        raise StopIteration
+
+    # Cursor
+    # ------>
+
+    def getnext(self) -> TokenInfo:
+        """
+        Returns the next token and moves past it.
+        """
+        index = self._index
+        if index >= self._fill:
+            if index >= self._size:
+                self._pastEnd()
+            self._fill = index + 1
+        self._index = index + 1
+        return self._array[index]
+
+    def peek(self) -> TokenInfo:
+        """
+        Returns the next token without moving.
+        """
+        index = self._index
+        if index >= self._fill:
+            if index >= self._size:
+                self._pastEnd()
+            self._fill = index + 1
+        return self._array[index]
+
+    def mark(self) -> int:
+        return self._index
+
+    def release(self, mark: int):
+        """
+        Drops the tokens before a mark, the parser never goes back before it.
+
+        Notes
+        -----
+        It's called by the parser at its commit points (see `ParserBase.commit`), so the
+        tokens of the parsed part of the source are only kept alive by the nodes that hold
+        them. The dropped tokens are replaced by None, so marks don't change.
+        """
+        released = self._released
+        if mark > released:
+            self._lastReleased = self._lastNonWhitespace(released, mark) or self._lastReleased or self._array[mark - 1]
+            self._array[released:mark] = [None] * (mark - released)
+            self._released = mark
+
+    def reset(self, index: int):
+        """
+        Moves back (or forward) to a mark.
+
+        Notes
+        -----
+        Unlike pegen's tokenizer, the mark is not checked, the parser only resets to marks
+        it got from `mark`.
+        """
+        self._index = index
+
+    # Diagnostics
+    # ----------->
+
+    def lookBehind(self, distance: int = 1) -> typing.Optional[TokenInfo]:
+        """
+        Returns a token before the current position, or None before the first token
+        (or before the first token that is not released).
+
+        Parameters
+        ----------
+        distance: int
+            1 for the last consumed token, 2 for the one before it, etc.
+        """
+        index = self._index - distance
+        return self._array[index] if self._released <= index < self._size else None
+
+    def diagnose(self) -> TokenInfo:
+        """
+        Returns the furthest token the parser looked at, where syntax errors are reported.
+        """
+        if self._fill == self._start:
+            self.getnext()
+        return self._array[self._fill - 1]
+
+    def get_last_non_whitespace_token(self) -> TokenInfo:
+        """
+        Returns the last consumed token that is not a NEWLINE, INDENT, DEDENT or ENDMARKER.
+        """
+        token = self._lastNonWhitespace(self._released, self._index)
+        if token is not None:
+            return token
+        # Every retained token before the position is whitespace, or none is retained
+        return self._lastReleased or self._array[self._released]
+
+    def _lastNonWhitespace(self, start: int, end: int) -> typing.Optional[TokenInfo]:
+        array = self._array
+        for index in range(end - 1, start - 1, -1):
+            token = array[index]
+            if token.type != tokenize.ENDMARKER and (token.type < tokenize.NEWLINE or token.type > tokenize.DEDENT):
+                return token
+        return None
+
+    def get_lines(self, line_numbers: typing.List[int]) -> typing.List[str]:
+        """
+        Returns the lines of the source with the given (1-indexed) numbers.
+        """
+        if not self._source:
+            lines = {
+                token.start[0]: token.line for token in reversed(self._array[self._released:self._fill])
+            }
+            return [lines.get(number, str()) for number in line_numbers]
+        lines = self._source.splitlines(keepends=True)
+        return [lines[number - 1] if number <= len(lines) else str() for number in line_numbers]
@@ -20,9 +20,14 @@ from __future__ import annotations
 import typing
 import tokenize
 import io
-from pegen.tokenizer import Tokenizer
 from .TokenType import *
 from .TokenInfo import *
+from .SourceIndex import *
+from .KiwiTokenizer import KiwiTokenizer, filterTokens
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from .TokenBuffer import TokenBuffer
 
 # EXPORTS
 # =======>
@@ -44,6 +49,61 @@ UNPARSABLE_TOKENS: typing.Set[TokenType] = {
 }
 
 
+def wrapTokens(tokenStream: typing.Iterator[tokenize.TokenInfo]) -> typing.Iterator[TokenInfo]:
+    """
+    Wraps a token stream of the tokenize module into a TokenInfo stream.
+
+    Notes
+    -----
+    `$` followed by a NAME is merged into a single CNAME token, and the tokens the parser
+    doesn't need are dropped.
+    """
+    for token in tokenStream:
+        if token.type == tokenize.ERRORTOKEN and token.string == '$':
+            next_token = next(tokenStream)
+            if next_token.type != tokenize.NAME or token.end[1] != next_token.start[1]:
+                yield TokenInfo(token)
+                yield TokenInfo(next_token)
+                continue
+            yield TokenInfo(tokenize.TokenInfo(
+                type=TokenType.CNAME,
+                string=f'${next_token.string}',
+                start=token.start,
+                end=next_token.end,
+                line=token.line,
+            ))  # type: ignore
+        if token.type in UNPARSABLE_TOKENS:
+            continue
+        yield TokenInfo(token)
+
+
+def scanSource(source: str) -> typing.Tuple[typing.List[TokenInfo], typing.Optional[Exception]]:
+    """
+    Returns the tokens of a source, filtered the same way as pegen's tokenizer does.
+
+    Returns
+    -------
+    typing.Tuple[typing.List[TokenInfo], typing.Optional[Exception]]
+        The tokens, and the error of the tokenize module after the last token, if any.
+    """
+    tokens: typing.List[TokenInfo] = []
+    try:
+        tokens.extend(filterTokens(wrapTokens(tokenize.generate_tokens(io.StringIO(source).readline))))
+    except (tokenize.TokenError, SyntaxError) as error:
+        return tokens, error
+    return tokens, None
+
+
+def scanSourceRaw(source: str) -> typing.Tuple[
+    typing.List[typing.Tuple[typing.Any, ...]], typing.Optional[Exception]
+]:
+    """
+    Same as `scanSource`, but with plain tuples, so they are cheap to send between processes.
+    """
+    tokens, error = scanSource(source)
+    return [(int(token.type), *token[1:]) for token in tokens], error
+
+
 class Lexer:
     """
     Lexer class for the frontend.
@@ -52,6 +112,8 @@ class Lexer:
     ----------
     source: str
         The source code.
+    sourceIndex: SourceIndex
+        The index of the line starts of the source code.
     _tokenStream: typing.Iterator[TokenInfo]
         The token stream.
 
@@ -60,6 +122,7 @@ class Lexer:
     This is a wrapper around the tokenize module, mainly for convenience.
     """
     source: str
+    sourceIndex: SourceIndex
     _tokenStream: typing.Iterator[tokenize.TokenInfo]
 
     def load(self, source: str) -> Lexer:
@@ -81,6 +144,7 @@ class Lexer:
         This method is chainable. (i.e. it returns the lexer itself to allow for method chaining)
         """
         self.source = source
+        self.sourceIndex = SourceIndex(source)
         self._tokenStream = tokenize.tokenize(
             io.BytesIO(source.encode('utf-8')).readline
         )
@@ -99,35 +163,60 @@ class Lexer:
         -----
         This method is private.
         """
-        for token in self._tokenStream:
-            if token.type == tokenize.ERRORTOKEN and token.string == '$':
-                next_token = next(self._tokenStream)
-                if next_token.type != tokenize.NAME or token.end[1] != next_token.start[1]:
-                    yield TokenInfo(token)
-                    yield TokenInfo(next_token)
-                    continue
-                yield TokenInfo(tokenize.TokenInfo(
-                    type=TokenType.CNAME,
-                    string=f'${next_token.string}',
-                    start=token.start,
-                    end=next_token.end,
-                    line=token.line,
-                ))  # type: ignore
-            if token.type in UNPARSABLE_TOKENS:
-                continue
-            yield TokenInfo(token)
+        return wrapTokens(self._tokenStream)
 
-    def tokenize(self) -> Tokenizer:
+    def tokenize(self) -> KiwiTokenizer:
         """
         Tokenizes the source code.
 
         Returns
         -------
-        Tokenizer
+        KiwiTokenizer
             The tokenizer.
 
         Notes
         -----
         This method is mainly used to adapt the tokenizer to the parser.
+        The whole source is tokenized here, the parser then only moves over the tokens.
+        """
+        return KiwiTokenizer.fromStream(self.wrapper(), self.source)
+
+    @classmethod
+    def tokenizeMany(cls, sources: typing.Iterable[str], *, executor: typing.Optional[Executor] = None,
+                     chunksize: int = 16) -> TokenBuffer:
+        """
+        Tokenizes many sources into one shared token buffer.
+
+        Parameters
+        ----------
+        sources: typing.Iterable[str]
+            The sources.
+        executor: typing.Optional[Executor]
+            The worker pool (e.g. a ProcessPoolExecutor), the sources are tokenized in this
+            thread by default.
+        chunksize: int
+            The number of sources sent to a worker at once.
+
+        Returns
+        -------
+        TokenBuffer
+            The tokens, `buffer[i]` is a tokenizer over the tokens of the i-th source that
+            the parser can use.
+
+        Notes
+        -----
+        No Lexer or SourceIndex is created per source. With an executor,
+        workers send back plain tuples and the TokenInfo objects are built here.
         """
-        return Tokenizer(self.wrapper())
+        from .TokenBuffer import TokenBuffer
+        sources = list(sources)
+        buffer = TokenBuffer()
+        if executor is None:
+            for source in sources:
+                buffer.append(source, *scanSource(source))
+            return buffer
+        types = TokenType._value2member_map_
+        new = tuple.__new__
+        for source, (raw, error) in zip(sources, executor.map(scanSourceRaw, sources, chunksize=chunksize)):
+            buffer.append(source, [new(TokenInfo, (types[token[0]], *token[1:])) for token in raw], error)
+        return buffer
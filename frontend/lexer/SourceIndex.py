@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+from bisect import bisect_right
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'SourceIndex'
+]
+
+
+# MAIN CONTENT
+# ============>
+
+class SourceIndex:
+    """
+    An index that converts between offsets and row/column positions.
+
+    Attributes
+    ----------
+    source: str
+        The source code.
+    lineStarts: typing.List[int]
+        The character offset of the first character of each line.
+    byteLineStarts: typing.List[int]
+        The UTF-8 byte offset of the first byte of each line.
+
+    Notes
+    -----
+    Rows are 1-indexed and columns are 0-indexed character offsets, the same as
+    the positions produced by the tokenize module.
+    Every lookup is a single bisect over the line starts, so it is O(log n).
+
+    Doctests
+    --------
+    >>> index = SourceIndex('package kiwi\\nimport a.f')
+    >>> index.offsetToPosition(15)
+    (2, 2)
+    >>> index.positionToOffset(2, 2)
+    15
+    """
+    source: str
+    lineStarts: typing.List[int]
+    byteLineStarts: typing.List[int]
+
+    def __init__(self, source: str):
+        self.source = source
+        self.lineStarts = [0]
+        position = source.find('\n')
+        while position != -1:
+            self.lineStarts.append(position + 1)
+            position = source.find('\n', position + 1)
+        if source.isascii():
+            self.byteLineStarts = self.lineStarts
+            return
+        self.byteLineStarts = [0]
+        for start, end in zip(self.lineStarts, self.lineStarts[1:]):
+            self.byteLineStarts.append(self.byteLineStarts[-1] + len(source[start:end].encode('utf-8')))
+
+    @property
+    def lineCount(self) -> int:
+        return len(self.lineStarts)
+
+    def offsetToPosition(self, offset: int) -> typing.Tuple[int, int]:
+        """
+        Converts a character offset to a position.
+
+        Parameters
+        ----------
+        offset: int
+            The character offset.
+
+        Returns
+        -------
+        typing.Tuple[int, int]
+            The row and column.
+        """
+        offset = max(0, min(offset, len(self.source)))
+        row = bisect_right(self.lineStarts, offset)
+        return row, offset - self.lineStarts[row - 1]
+
+    def positionToOffset(self, row: int, column: int) -> int:
+        """
+        Converts a position to a character offset.
+
+        Parameters
+        ----------
+        row: int
+            The row.
+        column: int
+            The column.
+
+        Returns
+        -------
+        int
+            The character offset.
+
+        Notes
+        -----
+        Rows past the end of the source are clamped to the end of the source, this is
+        where tokenize places the ENDMARKER token.
+        """
+        if row > len(self.lineStarts):
+            return len(self.source)
+        return min(self.lineStarts[max(row, 1) - 1] + column, len(self.source))
+
+    def byteOffsetToPosition(self, offset: int) -> typing.Tuple[int, int]:
+        """
+        Converts a UTF-8 byte offset to a position.
+
+        Parameters
+        ----------
+        offset: int
+            The byte offset.
+
+        Returns
+        -------
+        typing.Tuple[int, int]
+            The row and column.
+        """
+        if self.byteLineStarts is self.lineStarts:
+            return self.offsetToPosition(offset)
+        offset = max(0, offset)
+        row = bisect_right(self.byteLineStarts, offset)
+        start = self.lineStarts[row - 1]
+        end = self.lineStarts[row] if row < len(self.lineStarts) else len(self.source)
+        prefix = self.source[start:end].encode('utf-8')[:offset - self.byteLineStarts[row - 1]]
+        return row, len(prefix.decode('utf-8', errors='ignore'))
+
+    def positionToByteOffset(self, row: int, column: int) -> int:
+        """
+        Converts a position to a UTF-8 byte offset.
+
+        Parameters
+        ----------
+        row: int
+            The row.
+        column: int
+            The column.
+
+        Returns
+        -------
+        int
+            The byte offset.
+        """
+        if self.byteLineStarts is self.lineStarts:
+            return self.positionToOffset(row, column)
+        if row > len(self.lineStarts):
+            return self.byteLineStarts[-1] + len(self.source[self.lineStarts[-1]:].encode('utf-8'))
+        start = self.lineStarts[max(row, 1) - 1]
+        return self.byteLineStarts[max(row, 1) - 1] + len(self.source[start:start + column].encode('utf-8'))
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+from .TokenInfo import *
+from .KiwiTokenizer import KiwiTokenizer
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'TokenBuffer',
+    'TokenView',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+class TokenBuffer:
+    """
+    The tokens of many sources in one shared list.
+
+    Attributes
+    ----------
+    tokens: typing.List[TokenInfo]
+        The tokens of all sources, one after the other.
+    offsets: typing.List[int]
+        The index of the first token of each source, followed by the number of tokens.
+    sources: typing.List[str]
+        The sources.
+    errors: typing.List[typing.Optional[Exception]]
+        The error of the tokenize module in each source, if any.
+
+    Notes
+    -----
+    The tokens are already filtered the same way as pegen's tokenizer filters them, so a
+    view can be handed to the parser directly.
+    """
+    tokens: typing.List[TokenInfo]
+    offsets: typing.List[int]
+    sources: typing.List[str]
+    errors: typing.List[typing.Optional[Exception]]
+
+    def __init__(self):
+        self.tokens = []
+        self.offsets = [0]
+        self.sources = []
+        self.errors = []
+
+    def append(self, source: str, tokens: typing.Iterable[TokenInfo], error: typing.Optional[Exception] = None):
+        """
+        Appends the tokens of a source, and the error that stopped its tokenization.
+        """
+        self.tokens.extend(tokens)
+        self.offsets.append(len(self.tokens))
+        self.sources.append(source)
+        self.errors.append(error)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def __getitem__(self, index: int) -> TokenView:
+        return self.view(index)
+
+    def __iter__(self) -> typing.Iterator[TokenView]:
+        return (self.view(index) for index in range(len(self)))
+
+    def view(self, index: int) -> TokenView:
+        """
+        Returns a tokenizer over the tokens of a source.
+        """
+        if index < 0:
+            index += len(self)
+        return TokenView(
+            self.tokens, self.offsets[index], self.offsets[index + 1], self.sources[index], self.errors[index]
+        )
+
+
+class TokenView(KiwiTokenizer):
+    """
+    A tokenizer over the tokens of one source of a TokenBuffer.
+
+    Attributes
+    ----------
+    buffer: typing.List[TokenInfo]
+        The shared token list.
+    start: int
+        The index of the first token of the source in the shared list.
+
+    Notes
+    -----
+    The parser indexes the shared list directly, nothing is copied, so marks are indices
+    in the shared list (they start at `start`). Tokens are never released, the list is
+    shared by every view of the buffer.
+    """
+
+    def __init__(self, buffer: typing.List[TokenInfo], start: int, end: int, source: str = str(),
+                 error: typing.Optional[Exception] = None):
+        super().__init__(buffer, source, error, start=start, end=end)
+
+    @property
+    def buffer(self) -> typing.List[TokenInfo]:
+        return self._array
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    def release(self, mark: int):
+        pass
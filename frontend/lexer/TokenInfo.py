@@ -7,7 +7,9 @@ from __future__ import annotations
 import typing
 import tokenize
 from frontend.lexer.TokenType import *
-from util.formatter import *
+
+if typing.TYPE_CHECKING:
+    from util.formatter import FormatString, Column
 
 # EXPORTS
 # =======>
@@ -69,6 +71,53 @@ class TokenInfo(tokenize.TokenInfo):
     def __new__(cls, token: tokenize.TokenInfo):
         return super().__new__(cls, TokenType(token.exact_type), *token[1:])  # type: ignore
 
+    def __reduce__(self):
+        # `__new__` takes a token, so pickles rebuild the tuple directly (e.g. for worker processes)
+        return _fromFields, tuple(self)
+
+    def tableRow(self) -> typing.Tuple[str, str, str, str]:
+        """
+        Returns the cells of the token in a table, see `tableColumns`
+
+        Notes
+        -----
+        Control characters of the value (e.g. the one of a NEWLINE) are escaped, so each
+        token takes exactly one line.
+        """
+        value = self.string
+        if not value.isprintable():
+            value = value.encode('unicode_escape').decode('ascii') if value.isascii() else ''.join(
+                char if char.isprintable() else char.encode('unicode_escape').decode('ascii') for char in value
+            )
+        return str(self.start[0]), str(self.start[1]), self.type.name, value
+
+    @staticmethod
+    def tableColumns() -> typing.List[Column]:
+        """
+        Returns the columns of a token table, styled as `toFormatString`
+
+        Doctests
+        --------
+        >>> import io
+        >>> from frontend.lexer import Lexer
+        >>> from util.formatter import TableWriter
+        >>> stream = io.StringIO()
+        >>> writer = TableWriter(TokenInfo.tableColumns(), stream, color=False)
+        >>> tokens = list(Lexer().load('package a\\n').wrapper())
+        >>> writer.write([token.tableRow() for token in tokens[:-1]])
+        >>> print(stream.getvalue(), end='')
+        1  | 0  | NAME                 | package
+        1  | 8  | NAME                 | a
+        1  | 9  | NEWLINE              | \\n
+        """
+        from util.formatter import Column, TextColor
+        return [
+            Column(color=TextColor.YELLOW, bold=True, minWidth=2),
+            Column(color=TextColor.YELLOW, bold=True, minWidth=2),
+            Column(color=TextColor.BLUE, bold=True, minWidth=20, maxWidth=20),
+            Column(color=TextColor.GREEN, bold=True),
+        ]
+
     def toFormatString(self) -> FormatString:
         """
         Returns pretty formatted string of the token
@@ -78,6 +127,7 @@ class TokenInfo(tokenize.TokenInfo):
         FormatString
             The formatted string
         """
+        from util.formatter import FormatString, TextColor
         return FormatString(
             string=self.row,
             color=TextColor.YELLOW,
@@ -99,3 +149,7 @@ class TokenInfo(tokenize.TokenInfo):
             color=TextColor.GREEN,
             bold=True,
         )
+
+
+def _fromFields(*fields: typing.Any) -> TokenInfo:
+    return tuple.__new__(TokenInfo, fields)  # type: ignore
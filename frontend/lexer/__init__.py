@@ -7,17 +7,61 @@ Classes
 -------
 Lexer
     The lexer class for the frontend.
+AsyncLexer
+    A lexer that tokenizes an asynchronous byte stream while it is being received.
 TokenInfo
     A class that represents a token.
 TokenType
     An enumeration of all the token types.
+SourceIndex
+    An index that converts between offsets and row/column positions.
+KiwiTokenizer
+    The token cursor used by the parser.
+TokenBuffer
+    The tokens of many sources in one shared list, see `Lexer.tokenizeMany`.
+TokenView
+    A tokenizer over the tokens of one source of a TokenBuffer.
 
 Notes
 -----
 The lexer is a wrapper around the tokenize module, mainly for convenience.
 Also it's worth noting that the line and column numbers are 1-indexed.
+
+The classes are imported lazily on first access, so importing this package doesn't
+pay for the modules that are not used (e.g. the formatter or pegen).
 """
 
-from .Lexer import Lexer
-from .TokenInfo import TokenInfo
-from .TokenType import TokenType
+# noinspection PyUnresolvedReferences
+import typing
+from util.lazyimport import lazyExports
+
+if typing.TYPE_CHECKING:
+    from .Lexer import Lexer
+    from .AsyncLexer import AsyncLexer
+    from .TokenInfo import TokenInfo
+    from .TokenType import TokenType
+    from .SourceIndex import SourceIndex
+    from .KiwiTokenizer import KiwiTokenizer
+    from .TokenBuffer import TokenBuffer, TokenView
+
+__all__ = [
+    'Lexer',
+    'AsyncLexer',
+    'TokenInfo',
+    'TokenType',
+    'SourceIndex',
+    'KiwiTokenizer',
+    'TokenBuffer',
+    'TokenView',
+]
+
+lazyExports(__name__, {
+    'Lexer': '.Lexer',
+    'AsyncLexer': '.AsyncLexer',
+    'TokenInfo': '.TokenInfo',
+    'TokenType': '.TokenType',
+    'SourceIndex': '.SourceIndex',
+    'KiwiTokenizer': '.KiwiTokenizer',
+    'TokenBuffer': '.TokenBuffer',
+    'TokenView': '.TokenBuffer',
+})
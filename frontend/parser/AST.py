@@ -7,9 +7,11 @@ from __future__ import annotations
 import typing
 from dataclasses import dataclass, field
 from abc import ABC
-from frontend.lexer import *
 from frontend.parser.NodeMeta import *
-from util.formatter import *
+
+if typing.TYPE_CHECKING:
+    from frontend.lexer import TokenInfo, TokenType
+    from util.formatter import FormatString, TextColor
 
 # EXPORTS
 # =======>
@@ -31,16 +33,33 @@ __all__ = [
 # MAIN CONTENT
 # ============>
 
-rainbow_colors = [
-    TextColor.LIGHT_RED + TextColor.BG_DARK_GRAY,
-    TextColor.LIGHT_YELLOW + TextColor.BG_DARK_GRAY,
-    TextColor.LIGHT_GREEN + TextColor.BG_DARK_GRAY,
-    TextColor.LIGHT_CYAN + TextColor.BG_DARK_GRAY,
-    TextColor.LIGHT_BLUE + TextColor.BG_DARK_GRAY,
-    TextColor.LIGHT_PURPLE + TextColor.BG_DARK_GRAY,
-]
+rainbow_colors: typing.List[typing.Tuple[TextColor, TextColor]] = []
+
+
+def rainbowColors() -> typing.List[typing.Tuple[TextColor, TextColor]]:
+    """
+    Returns the colors of the brackets, by nesting level.
 
-rainbow_list_index = -1
+    Returns
+    -------
+    typing.List[typing.Tuple[TextColor, TextColor]]
+        The colors.
+
+    Notes
+    -----
+    The formatter is imported on first use, so parsing doesn't depend on it.
+    """
+    if not rainbow_colors:
+        from util.formatter import TextColor
+        rainbow_colors.extend([
+            TextColor.LIGHT_RED + TextColor.BG_DARK_GRAY,
+            TextColor.LIGHT_YELLOW + TextColor.BG_DARK_GRAY,
+            TextColor.LIGHT_GREEN + TextColor.BG_DARK_GRAY,
+            TextColor.LIGHT_CYAN + TextColor.BG_DARK_GRAY,
+            TextColor.LIGHT_BLUE + TextColor.BG_DARK_GRAY,
+            TextColor.LIGHT_PURPLE + TextColor.BG_DARK_GRAY,
+        ])
+    return rainbow_colors
 
 
 @dataclass(kw_only=True)
@@ -82,7 +101,7 @@ class Node(ABC, metaclass=NodeMeta, is_base=True):
     end_column: int = field(default=None)
     children: typing.List[str] = field(default=None, init=False, repr=False, compare=False)
 
-    def toFormatString(self, *, indent: int = 4) -> FormatString:
+    def toFormatString(self, *, indent: int = 4, depth: int = 0) -> FormatString:
         """
         Converts the node to a formatted string.
 
@@ -90,31 +109,60 @@ class Node(ABC, metaclass=NodeMeta, is_base=True):
         ----------
         indent: int
             The number of spaces to indent by.
+        depth: int
+            The nesting level of the brackets, it selects their color.
 
         Returns
         -------
         FormatString
             The formatted string.
         """
+        from util.formatter import FormatString, TextColor
         if len(self.children) == 0:
             return FormatString(
                 string=f"<{self.name}>",
                 bold=True,
                 color=TextColor.BLUE,
             )
-        global rainbow_list_index
-        rainbow_list_index = (rainbow_list_index + 1) % len(rainbow_colors)
-        result = FormatString(
+        rainbow_colors = rainbowColors()
+        color = rainbow_colors[depth % len(rainbow_colors)]
+        return FormatString(
             string=f"<{self.name}>",
             bold=True,
             color=TextColor.BLUE,
-        ) + ' ' + FormatString('{', color=rainbow_colors[rainbow_list_index]) + '\n' + FormatString("\n").join([
+        ) + ' ' + FormatString('{', color=color) + '\n' + FormatString("\n").join([
             FormatString(child, color=TextColor.LIGHT_YELLOW) + ': ' + FormatString(
-                self.__getattribute__(child).toFormatString(indent=indent)
+                self.__getattribute__(child).toFormatString(indent=indent, depth=depth + 1)
             ) for child in self.children
-        ]).indent(indent) + '\n' + FormatString('}', color=rainbow_colors[rainbow_list_index])
-        rainbow_list_index = (rainbow_list_index - 1) % len(rainbow_colors)
-        return result
+        ]).indent(indent) + '\n' + FormatString('}', color=color)
+
+    def structuralHash(self) -> int:
+        """
+        Returns the hash of the node that ignores positions, cached on the node.
+
+        Notes
+        -----
+        See `frontend.parser.NodeStructure` for what is part of the structure of a node,
+        and when the cached hash has to be cleared.
+        """
+        cached = self.__dict__.get('_structuralHash')
+        if cached is not None:
+            return cached
+        from frontend.parser.NodeStructure import structuralHash
+        return structuralHash(self)
+
+    def equalIgnoringPositions(self, other: Node) -> bool:
+        """
+        Returns whether the node is structurally equal to another node, wherever they are.
+        """
+        from frontend.parser.NodeStructure import structurallyEqual
+        return structurallyEqual(self, other)
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        # Copies may be modified, and hashes are only valid in the current process
+        state = self.__dict__.copy()
+        state.pop('_structuralHash', None)
+        return state
 
 
 @dataclass(kw_only=True)
@@ -144,21 +192,24 @@ class List(Node, list, metaclass=NodeMeta, is_base=True):
             self.end_row = -1
             self.end_column = -1
             return
-        self.row = self[0].row
-        self.column = self[0].column
-        self.end_row = self[-1].end_row
-        self.end_column = self[-1].end_column
-
-    def toFormatString(self, *, indent: int = 4) -> FormatString:
-        global rainbow_list_index
-        rainbow_list_index = (rainbow_list_index + 1) % len(rainbow_colors)
-        content = FormatString(FormatString("[", color=rainbow_colors[rainbow_list_index]) + (
+        # The first and last elements with a position, as for the children of a node
+        first = next((element for element in self if hasPosition(element)), self[0])
+        last = next((element for element in reversed(self) if hasPosition(element)), self[-1])
+        self.row = first.row
+        self.column = first.column
+        self.end_row = last.end_row
+        self.end_column = last.end_column
+
+    def toFormatString(self, *, indent: int = 4, depth: int = 0) -> FormatString:
+        from util.formatter import FormatString, TextColor
+        rainbow_colors = rainbowColors()
+        color = rainbow_colors[depth % len(rainbow_colors)]
+        content = FormatString(FormatString("[", color=color) + (
             "\n" if len(self.elements) > 0 else str())) + FormatString(",\n").join(
             [FormatString(f" {index}.", color=TextColor.LIGHT_GREEN + TextColor.BG_BLACK) + ' ' +
-             element.toFormatString(indent=indent) for index, element in enumerate(self, start=1)
+             element.toFormatString(indent=indent, depth=depth + 1) for index, element in enumerate(self, start=1)
              ]).indent(indent) + ("\n" if len(self.elements) > 0 else str()) + FormatString(
-            "]", color=rainbow_colors[rainbow_list_index])
-        rainbow_list_index = (rainbow_list_index - 1) % len(rainbow_colors)
+            "]", color=color)
         return FormatString(
             string=f" L:",
             bold=True,
@@ -211,7 +262,8 @@ class File(Node, metaclass=NodeMeta, base=Node):
 class Identifier(Node, metaclass=NodeMeta, base=Node):
     attrs: List[TokenWrapper]
 
-    def toFormatString(self, *, indent: int = 4) -> FormatString:
+    def toFormatString(self, *, indent: int = 4, depth: int = 0) -> FormatString:
+        from util.formatter import FormatString, TextColor
         return FormatString(
             string=f"I:",
             color=TextColor.BLUE + TextColor.BG_BLACK,
@@ -254,7 +306,8 @@ class Null(Node, metaclass=NodeMeta, base=Node, no_track=True):
     end_row: int = field(default=-1)
     end_column: int = field(default=-1)
 
-    def toFormatString(self, *, indent: int = 4) -> FormatString:
+    def toFormatString(self, *, indent: int = 4, depth: int = 0) -> FormatString:
+        from util.formatter import FormatString, TextColor
         return FormatString(
             string=f" NULL ",
             color=TextColor.BLUE + TextColor.BG_BLACK,
@@ -265,13 +318,14 @@ class Null(Node, metaclass=NodeMeta, base=Node, no_track=True):
 class ImportAlias(Node, metaclass=NodeMeta, base=Node):
     identifier: TokenWrapper | Null = field(default_factory=Null)
 
-    def toFormatString(self, *, indent: int = 4) -> FormatString:
+    def toFormatString(self, *, indent: int = 4, depth: int = 0) -> FormatString:
+        from util.formatter import FormatString, TextColor
         if isinstance(self.identifier, Null):
             return FormatString(
                 string=f" ALL* ",
                 color=TextColor.BLUE + TextColor.BG_BLACK,
             )
-        return super().toFormatString(indent=indent)
+        return super().toFormatString(indent=indent, depth=depth)
 
 
 @dataclass(kw_only=True)
@@ -294,14 +348,14 @@ class TokenWrapper(Node, metaclass=NodeMeta, base=Node, no_track=True):
     type: TokenType = field(default=None)
 
     def __post_init__(self):
-        self.value = self.value or self.token.value
-        self.type = self.type or self.token.type
-        self.row = self.token.row
-        self.column = self.token.column
-        self.end_row = self.token.end_row
-        self.end_column = self.token.end_column
+        token = self.token
+        self.value = self.value or token.string
+        self.type = self.type or token.type
+        self.row, self.column = token.start
+        self.end_row, self.end_column = token.end
 
     def toFormatString(self, *args, **kwargs) -> FormatString:
+        from util.formatter import FormatString, TextColor
         return FormatString(
             string=f"\"{self.value}\"",
             color=TextColor.GREEN + TextColor.BG_BLACK,
@@ -315,3 +369,6 @@ for name, typeNames in late_names.items():
         globals()[name] = globals()[typeNames[0]]
     else:
         globals()[name] = typing.Union[tuple(globals()[typeName] for typeName in typeNames)]
+
+# All the node types are defined, compute their children once and for all
+NodeMeta.resolveAll()
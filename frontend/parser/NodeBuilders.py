@@ -0,0 +1,358 @@
+"""
+Positional-only builders of the AST nodes, called by the actions of the generated parsers.
+
+@generated by scripts/grammar.py from frontend/parser/AST.py, frontend/parser/NodeMeta.py, do not edit.
+
+Notes
+-----
+A builder creates the same node as its class (same attributes, same position), but the
+attribute dictionary is built at once instead of going through the keyword-only dataclass
+`__init__`, and the position is copied from the first and last children inline instead
+of being looked up by `__post_init__` (which is still called when one of them has no
+position, see `hasPosition`).
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import frontend.parser.AST as AST
+from frontend.parser.NodeMeta import hasPosition as _hasPosition
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    "File",
+    "TokenWrapper",
+    "Identifier",
+    "ImportAlias",
+    "Null",
+    "ImportHeader",
+    "PackageHeader",
+    "FunctionDeclaration",
+    "List",
+]
+
+# MAIN CONTENT
+# ============>
+
+_Node = AST.Node
+_MISSING = object()
+
+
+# File
+# ---->
+_File = AST.File
+_newFile = _File.__new__
+_File_children = _File.__dataclass_fields__["children"].default_factory()
+
+
+def File(packageHeader, importList, declarations, /) -> AST.File:
+    node = _newFile(_File)
+    if (
+        isinstance(packageHeader, _Node)
+        and packageHeader.row is not None
+        and packageHeader.row >= 0
+        and packageHeader.end_row is not None
+        and packageHeader.end_row >= 0
+        and isinstance(declarations, _Node)
+        and declarations.row is not None
+        and declarations.row >= 0
+        and declarations.end_row is not None
+        and declarations.end_row >= 0
+    ):
+        node.__dict__ = {
+            "children": _File_children,
+            "packageHeader": packageHeader,
+            "importList": importList,
+            "declarations": declarations,
+            "row": packageHeader.row,
+            "column": packageHeader.column,
+            "end_row": declarations.end_row,
+            "end_column": declarations.end_column,
+        }
+    else:
+        node.__dict__ = {
+            "children": _File_children,
+            "packageHeader": packageHeader,
+            "importList": importList,
+            "declarations": declarations,
+        }
+        _File.__post_init__(node)
+    return node
+
+
+# TokenWrapper
+# ------------>
+_TokenWrapper = AST.TokenWrapper
+_newTokenWrapper = _TokenWrapper.__new__
+_TokenWrapper_children = _TokenWrapper.__dataclass_fields__[
+    "children"
+].default_factory()
+
+
+def TokenWrapper(token, value=None, type=None, /) -> AST.TokenWrapper:
+    node = _newTokenWrapper(_TokenWrapper)
+    row, column = token.start
+    end_row, end_column = token.end
+    node.__dict__ = {
+        "children": _TokenWrapper_children,
+        "token": token,
+        "value": value or token.string,
+        "type": type or token.type,
+        "row": row,
+        "column": column,
+        "end_row": end_row,
+        "end_column": end_column,
+    }
+    return node
+
+
+# Identifier
+# ---------->
+_Identifier = AST.Identifier
+_newIdentifier = _Identifier.__new__
+_Identifier_children = _Identifier.__dataclass_fields__["children"].default_factory()
+
+
+def Identifier(attrs, /) -> AST.Identifier:
+    node = _newIdentifier(_Identifier)
+    if (
+        isinstance(attrs, _Node)
+        and attrs.row is not None
+        and attrs.row >= 0
+        and attrs.end_row is not None
+        and attrs.end_row >= 0
+    ):
+        node.__dict__ = {
+            "children": _Identifier_children,
+            "attrs": attrs,
+            "row": attrs.row,
+            "column": attrs.column,
+            "end_row": attrs.end_row,
+            "end_column": attrs.end_column,
+        }
+    else:
+        node.__dict__ = {"children": _Identifier_children, "attrs": attrs}
+        _Identifier.__post_init__(node)
+    return node
+
+
+# ImportAlias
+# ----------->
+_ImportAlias = AST.ImportAlias
+_newImportAlias = _ImportAlias.__new__
+_ImportAlias_identifier = _ImportAlias.__dataclass_fields__[
+    "identifier"
+].default_factory
+_ImportAlias_children = _ImportAlias.__dataclass_fields__["children"].default_factory()
+
+
+def ImportAlias(identifier=_MISSING, /) -> AST.ImportAlias:
+    node = _newImportAlias(_ImportAlias)
+    if identifier is _MISSING:
+        identifier = _ImportAlias_identifier()
+    if (
+        isinstance(identifier, _Node)
+        and identifier.row is not None
+        and identifier.row >= 0
+        and identifier.end_row is not None
+        and identifier.end_row >= 0
+    ):
+        node.__dict__ = {
+            "children": _ImportAlias_children,
+            "identifier": identifier,
+            "row": identifier.row,
+            "column": identifier.column,
+            "end_row": identifier.end_row,
+            "end_column": identifier.end_column,
+        }
+    else:
+        node.__dict__ = {"children": _ImportAlias_children, "identifier": identifier}
+        _ImportAlias.__post_init__(node)
+    return node
+
+
+# Null
+# ---->
+_Null = AST.Null
+_newNull = _Null.__new__
+_Null_children = _Null.__dataclass_fields__["children"].default_factory()
+
+
+def Null() -> AST.Null:
+    node = _newNull(_Null)
+    node.__dict__ = {"children": _Null_children}
+    return node
+
+
+# ImportHeader
+# ------------>
+_ImportHeader = AST.ImportHeader
+_newImportHeader = _ImportHeader.__new__
+_ImportHeader_children = _ImportHeader.__dataclass_fields__[
+    "children"
+].default_factory()
+
+
+def ImportHeader(identifier, alias, /) -> AST.ImportHeader:
+    node = _newImportHeader(_ImportHeader)
+    if (
+        isinstance(identifier, _Node)
+        and identifier.row is not None
+        and identifier.row >= 0
+        and identifier.end_row is not None
+        and identifier.end_row >= 0
+        and isinstance(alias, _Node)
+        and alias.row is not None
+        and alias.row >= 0
+        and alias.end_row is not None
+        and alias.end_row >= 0
+    ):
+        node.__dict__ = {
+            "children": _ImportHeader_children,
+            "identifier": identifier,
+            "alias": alias,
+            "row": identifier.row,
+            "column": identifier.column,
+            "end_row": alias.end_row,
+            "end_column": alias.end_column,
+        }
+    else:
+        node.__dict__ = {
+            "children": _ImportHeader_children,
+            "identifier": identifier,
+            "alias": alias,
+        }
+        _ImportHeader.__post_init__(node)
+    return node
+
+
+# PackageHeader
+# ------------->
+_PackageHeader = AST.PackageHeader
+_newPackageHeader = _PackageHeader.__new__
+_PackageHeader_children = _PackageHeader.__dataclass_fields__[
+    "children"
+].default_factory()
+
+
+def PackageHeader(identifier, /) -> AST.PackageHeader:
+    node = _newPackageHeader(_PackageHeader)
+    if (
+        isinstance(identifier, _Node)
+        and identifier.row is not None
+        and identifier.row >= 0
+        and identifier.end_row is not None
+        and identifier.end_row >= 0
+    ):
+        node.__dict__ = {
+            "children": _PackageHeader_children,
+            "identifier": identifier,
+            "row": identifier.row,
+            "column": identifier.column,
+            "end_row": identifier.end_row,
+            "end_column": identifier.end_column,
+        }
+    else:
+        node.__dict__ = {"children": _PackageHeader_children, "identifier": identifier}
+        _PackageHeader.__post_init__(node)
+    return node
+
+
+# FunctionDeclaration
+# ------------------->
+_FunctionDeclaration = AST.FunctionDeclaration
+_newFunctionDeclaration = _FunctionDeclaration.__new__
+_FunctionDeclaration_children = _FunctionDeclaration.__dataclass_fields__[
+    "children"
+].default_factory()
+
+
+def FunctionDeclaration(
+    modifiers, receiverType, identifier, /
+) -> AST.FunctionDeclaration:
+    node = _newFunctionDeclaration(_FunctionDeclaration)
+    if (
+        isinstance(modifiers, _Node)
+        and modifiers.row is not None
+        and modifiers.row >= 0
+        and modifiers.end_row is not None
+        and modifiers.end_row >= 0
+        and isinstance(identifier, _Node)
+        and identifier.row is not None
+        and identifier.row >= 0
+        and identifier.end_row is not None
+        and identifier.end_row >= 0
+    ):
+        node.__dict__ = {
+            "children": _FunctionDeclaration_children,
+            "modifiers": modifiers,
+            "receiverType": receiverType,
+            "identifier": identifier,
+            "row": modifiers.row,
+            "column": modifiers.column,
+            "end_row": identifier.end_row,
+            "end_column": identifier.end_column,
+        }
+    else:
+        node.__dict__ = {
+            "children": _FunctionDeclaration_children,
+            "modifiers": modifiers,
+            "receiverType": receiverType,
+            "identifier": identifier,
+        }
+        _FunctionDeclaration.__post_init__(node)
+    return node
+
+
+# List
+# ---->
+_List = AST.List
+_newList = _List.__new__
+_List_elements = _List.__dataclass_fields__["elements"].default_factory
+_List_children = _List.__dataclass_fields__["children"].default_factory()
+
+
+def List(elements=_MISSING, /) -> AST.List:
+    node = _newList(_List)
+    if elements is _MISSING:
+        elements = _List_elements()
+    node.extend(elements)
+    if len(node):
+        first, last = node[0], node[-1]
+        if not (
+            first.row is not None
+            and first.row >= 0
+            and first.end_row is not None
+            and first.end_row >= 0
+            and last.row is not None
+            and last.row >= 0
+            and last.end_row is not None
+            and last.end_row >= 0
+        ):
+            first = next((element for element in node if _hasPosition(element)), first)
+            last = next(
+                (element for element in reversed(node) if _hasPosition(element)), last
+            )
+        row, column, end_row, end_column = (
+            first.row,
+            first.column,
+            last.end_row,
+            last.end_column,
+        )
+    else:
+        row = column = end_row = end_column = -1
+    node.__dict__ = {
+        "row": row,
+        "column": column,
+        "end_row": end_row,
+        "end_column": end_column,
+        "children": _List_children,
+        "elements": elements,
+    }
+    return node
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+from frontend.parser.AST import Node
+from frontend.parser.NodeVisitor import childNodes, replaceChildren, thawedClass, walk
+from frontend.parser.NodeStructure import leafKey
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'NodeFactory',
+    'Position',
+]
+
+# MAIN CONTENT
+# ============>
+
+Position = typing.Tuple[typing.Optional[int], typing.Optional[int], typing.Optional[int], typing.Optional[int]]
+
+_T = typing.TypeVar('_T', bound=Node)
+
+
+class NodeFactory:
+    """
+    A hash-consing factory, structurally identical subtrees are shared.
+
+    Attributes
+    ----------
+    hits: int
+        The number of nodes replaced by a shared node.
+    misses: int
+        The number of nodes that became shared nodes.
+    _table: typing.Dict[typing.Tuple[typing.Any, ...], Node]
+        The shared nodes by their structural key.
+
+    Notes
+    -----
+    The structural key of a node is its (thawed) class, the identities of its (shared) children and
+    the values of its other fields, positions are ignored. Since children are shared first,
+    two shared nodes are structurally equal if and only if they are the same object, so
+    comparing them (e.g. Identifier chains) is O(1), even across files.
+
+    A shared node keeps the position of its first occurrence, use `positions` before
+    interning to keep the positions of every occurrence in a side table.
+
+    Shared nodes must not be mutated, `mapNodes` and `NodeTransformer` copy them.
+    The factory is opt-in, the parser doesn't use it by default.
+
+    Doctests
+    --------
+    >>> factory = NodeFactory()
+    >>> from frontend.parser.AST import Null
+    >>> factory.make(Null) is factory.make(Null)
+    True
+    """
+    hits: int
+    misses: int
+    _table: typing.Dict[typing.Tuple[typing.Any, ...], Node]
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._table = dict()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def key(self, node: Node, children: typing.Optional[typing.List[Node]] = None) -> typing.Tuple[typing.Any, ...]:
+        """
+        Returns the structural key of a node whose children are already shared.
+
+        Parameters
+        ----------
+        node: Node
+            The node.
+        children: typing.Optional[typing.List[Node]]
+            The shared children to use instead of the children of the node.
+
+        Returns
+        -------
+        typing.Tuple[typing.Any, ...]
+            The key.
+        """
+        # Frozen nodes are structurally equal to regular nodes
+        return (
+            thawedClass(type(node)),
+            tuple(map(id, childNodes(node) if children is None else children)),
+            leafKey(node),
+        )
+
+    def share(self, node: _T) -> _T:
+        """
+        Returns the shared node that is structurally equal to a node whose children are
+        already shared, the node itself becomes the shared one if there's none.
+        """
+        key = self.key(node)
+        shared = self._table.get(key)
+        if shared is None:
+            self.misses += 1
+            self._table[key] = node
+            return node
+        self.hits += 1
+        return shared
+
+    def make(self, cls: typing.Type[_T], **fields: typing.Any) -> _T:
+        """
+        Creates a node and returns the shared node that is structurally equal to it.
+
+        Parameters
+        ----------
+        cls: typing.Type[_T]
+            The class of the node.
+        fields: typing.Any
+            The fields of the node, children must be created by the same factory.
+
+        Returns
+        -------
+        _T
+            The shared node.
+        """
+        return self.share(cls(**fields))
+
+    def intern(self, root: _T) -> _T:
+        """
+        Shares every subtree of a tree, bottom-up.
+
+        Parameters
+        ----------
+        root: _T
+            The root of the tree, it is not modified.
+
+        Returns
+        -------
+        _T
+            The root of the shared tree.
+        """
+        stack: typing.List[typing.Tuple[Node, typing.Optional[typing.List[Node]]]] = [(root, None)]
+        results: typing.List[Node] = []
+        while stack:
+            node, children = stack.pop()
+            if children is None:
+                children = childNodes(node)
+                stack.append((node, children))
+                stack.extend((child, None) for child in reversed(children))
+                continue
+            if children:
+                shared = results[-len(children):]
+                del results[-len(children):]
+                if any(new is not old for new, old in zip(shared, children)):
+                    # Look up the key first, so duplicates are not copied
+                    key = self.key(node, shared)
+                    if key in self._table:
+                        self.hits += 1
+                        results.append(self._table[key])
+                        continue
+                    node = replaceChildren(node, children, shared)
+            results.append(self.share(node))
+        return results[0]
+
+    @staticmethod
+    def positions(root: Node) -> typing.List[Position]:
+        """
+        Returns the positions of every node of a tree, in preorder.
+
+        Notes
+        -----
+        A shared tree is walked in the same order as the tree it was interned from (shared
+        nodes are visited once per occurrence), so `zip(walk(shared), positions)` gives the
+        original position of every occurrence.
+        """
+        return [(node.row, node.column, node.end_row, node.end_column) for node in walk(root)]
+
+    @staticmethod
+    def equal(a: Node, b: Node) -> bool:
+        """
+        Returns whether two shared nodes are structurally equal, in O(1).
+        """
+        return a is b
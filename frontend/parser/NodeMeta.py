@@ -16,7 +16,8 @@ __all__ = [
     'NodeMeta',
     'MetaEffect',
     'MetaEffectWrapper',
-    'meta_effect'
+    'meta_effect',
+    'hasPosition',
 ]
 
 # MAIN CONTENT
@@ -25,6 +26,16 @@ if typing.TYPE_CHECKING:
     from frontend.parser.AST import Node
 
 
+def hasPosition(node: typing.Any) -> bool:
+    """
+    Returns whether a node has a position, i.e. it's not a Null, an empty List or a node
+    made only of them (their rows are None or -1).
+    """
+    row = getattr(node, 'row', None)
+    end_row = getattr(node, 'end_row', None)
+    return row is not None and row >= 0 and end_row is not None and end_row >= 0
+
+
 class NodeMeta(ABCMeta):
     """
     Metaclass for all nodes
@@ -43,6 +54,8 @@ class NodeMeta(ABCMeta):
     _initialized_classes: typing.Dict[str, typing.Tuple[type]]
         A dictionary of all classes that have been initialized, used to know which classes are inherited from
         parentbase classes
+    _unresolved: typing.List[typing.Callable[[], None]]
+        The classes whose children are not computed yet, see `resolveAll`
 
     Notes
     -----
@@ -51,9 +64,47 @@ class NodeMeta(ABCMeta):
 
     Use `no_track=True` to disable the row and column tracking.
     This is useful for classes that are not nodes.
+
+    The children of a class are its fields annotated with node types, in declaration
+    order (the fields of the bases first), so the position of a node is taken from its
+    first and last children in the source. Children without a position (see `hasPosition`)
+    are skipped, unless none has one.
     """
 
     _initialized_classes: typing.Dict[str, typing.Tuple[type]] = dict()
+    _unresolved: typing.List[typing.Callable[[], None]] = list()
+
+    @classmethod
+    def _isChild(mcs, annotation: typing.Any, parentbase: type) -> bool:
+        """
+        Returns whether a field with the given annotation holds nodes.
+        """
+        if isinstance(annotation, MetaEffectWrapper):
+            if MetaEffect.IGNORED_FIELD in annotation.effects:
+                return False
+            return mcs._isChild(annotation.value, parentbase)
+        if not isinstance(annotation, str):
+            return False
+        for value in map(str.strip, re.sub(r"\[(.*?)]", str(), annotation).split('|')):
+            value_bases = mcs._initialized_classes.get(value, tuple())
+            if any(issubclass(value_base, parentbase) for value_base in value_bases):
+                return True
+        return False
+
+    @classmethod
+    def resolveAll(mcs):
+        """
+        Computes the children of every class defined so far.
+
+        Notes
+        -----
+        Annotations may name classes that are defined later in the module, so the children
+        can't be computed in `__new__`. AST.py calls this once all its classes are defined,
+        so the first parse of a process (e.g. of a pool worker) doesn't pay for it. Classes
+        defined afterwards are resolved when their first instance is created.
+        """
+        while mcs._unresolved:
+            mcs._unresolved.pop(0)()
 
     def __new__(mcs, name, bases, namespace, **kwargs):
         """
@@ -101,46 +152,25 @@ class NodeMeta(ABCMeta):
         if 'children' not in namespace['__annotations__']:
             namespace['__annotations__']['children'] = typing.List[str]
 
-        # Row and column fields
-        # --------------------->
-        def lazy_init():
-            def isValidAttribute(key: str, annotations) -> bool:
-                value: str = annotations.get(key, None)
-                if isinstance(value, str):
-                    value = re.sub(r"\[(.*?)]", str(), value)
-                if isinstance(value, MetaEffectWrapper):
-                    effectWrapper: MetaEffectWrapper = value
-                    if MetaEffect.IGNORED_FIELD in value.effects:
-                        return False
-                    annotations[key] = effectWrapper.value
-                    return isValidAttribute(key, annotations)
-                if not isinstance(value, str):
-                    return False
-                for value in map(str.strip, value.split('|')):
-                    value_bases = mcs._initialized_classes.get(value, tuple())
-                    if any([issubclass(value_base, parentbase) for value_base in value_bases]):
-                        return True
-                return False
-
-            nonlocal children
-            new_set = set()
+        # Children
+        # -------->
+        def resolve():
+            nonlocal resolved
+            if resolved:
+                return
+            # Base fields first, then the fields of the class, in declaration order
+            annotations = dict()
             for base in bases:
-                if hasattr(base, '__annotations__'):
-                    new_set.update(
-                        filter(
-                            lambda x: isValidAttribute(x, base.__annotations__),
-                            base.__annotations__.keys()
-                        )
-                    )
-            new_set.update(
-                filter(
-                    lambda x: isValidAttribute(x, namespace['__annotations__']),
-                    namespace['__annotations__'].keys()
-                )
+                annotations.update(getattr(base, '__annotations__', dict()))
+            annotations.update(namespace['__annotations__'])
+            children.extend(
+                key for key, value in annotations.items()
+                if key not in ('name', 'children') and mcs._isChild(value, parentbase)
             )
-            new_set.discard('name')
-            new_set.discard('children')
-            children.extend(new_set)
+            resolved = True
+
+        resolved = False
+        mcs._unresolved.append(resolve)
 
         if 'row' not in namespace['__annotations__']:
             namespace['__annotations__']['row'] = 'int'
@@ -154,16 +184,13 @@ class NodeMeta(ABCMeta):
         if 'end_column' not in namespace['__annotations__']:
             namespace['__annotations__']['end_column'] = 'int'
         namespace['end_column'] = field(init=False, repr=False, compare=True)
-        namespace['_was_lazy_init'] = False
         post_init = namespace.get('__post_init__', lambda self: None)
 
         def post_init_wrapper(self):
             post_init(self)
-            class_object = type(self)
-            # noinspection PyProtectedMember
-            if not class_object._was_lazy_init:
-                lazy_init()
-                class_object._was_lazy_init = True
+            if not resolved:
+                # A class defined after `NodeMeta.resolveAll` (e.g. outside of AST.py)
+                resolve()
 
             # Row and column
             # -------------->
@@ -174,18 +201,25 @@ class NodeMeta(ABCMeta):
                     self.end_column is not None
             ):
                 return
-            first_child = next(
-                filter(
-                    lambda x: hasattr(x, 'row') and hasattr(x, 'column'),
-                    map(lambda key: self.__getattribute__(key), children)),
-                None
-            )
-            last_child = next(
-                filter(
-                    lambda x: hasattr(x, 'end_row') and hasattr(x, 'end_column'),
-                    map(lambda key: self.__getattribute__(key), reversed(children))),
-                None
-            )
+            # The first and last children with a position, or without one if none has
+            first_child = None
+            for key in children:
+                value = self.__getattribute__(key)
+                if hasattr(value, 'row') and hasattr(value, 'column'):
+                    if hasPosition(value):
+                        first_child = value
+                        break
+                    if first_child is None:
+                        first_child = value
+            last_child = None
+            for key in reversed(children):
+                value = self.__getattribute__(key)
+                if hasattr(value, 'end_row') and hasattr(value, 'end_column'):
+                    if hasPosition(value):
+                        last_child = value
+                        break
+                    if last_child is None:
+                        last_child = value
 
             if first_child is None or last_child is None:
                 raise (ValueError('Node must have at least one child with row '
@@ -197,6 +231,9 @@ class NodeMeta(ABCMeta):
             self.end_row = self.end_row if self.end_row is not None else last_child.end_row
             self.end_column = self.end_column if self.end_column is not None else last_child.end_column
 
+        if '__post_init__' in namespace:
+            # So the builders of the nodes (see scripts/grammar.py) know it has to be called
+            post_init_wrapper.__wrapped__ = post_init
         if not kwargs.get('no_track', False):
             namespace['__post_init__'] = post_init_wrapper
         # noinspection PyTypeChecker
@@ -0,0 +1,178 @@
+"""
+Structural identity of AST nodes.
+
+Notes
+-----
+The dataclass `__eq__` of nodes compares their positions too, and nodes are not hashable.
+Two nodes are structurally equal when they have the same (thawed) class, the same
+non-node fields (tokens are compared by their type and string) and structurally equal
+children, wherever they are in the source.
+
+The structural hash of a node is cached on the node, so hashing a tree is linear and
+hashing it again is O(1). Copies (`copy.copy`, `mapNodes`, pickling) don't keep it.
+Modifying a node in place after it was hashed leaves a stale hash on it and on its
+ancestors, use `clearStructuralHash` on the root of the tree then.
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import dataclasses
+import tokenize
+from frontend.parser.AST import Node, Identifier, List
+from frontend.parser.NodeVisitor import childNodes, thawedClass, walk
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'structuralHash',
+    'structurallyEqual',
+    'clearStructuralHash',
+    'leafFields',
+    'leafKey',
+]
+
+# MAIN CONTENT
+# ============>
+
+# Fields that are not part of the structure of a node
+IGNORED_FIELDS = {'name', 'children', 'row', 'column', 'end_row', 'end_column', 'elements'}
+
+# The attribute that holds the cached hash of a node
+HASH_ATTRIBUTE = '_structuralHash'
+
+# The fields of each class that are not children (e.g. the token of a TokenWrapper)
+_leafFields: typing.Dict[type, typing.Tuple[str, ...]] = dict()
+
+
+def leafFields(node: Node) -> typing.Tuple[str, ...]:
+    """
+    Returns the fields of a node that are part of its structure but are not children.
+    """
+    cls = thawedClass(type(node))
+    fields = _leafFields.get(cls)
+    if fields is None:
+        childFields = set(node.children or tuple())
+        fields = _leafFields[cls] = tuple(
+            field.name for field in dataclasses.fields(cls)
+            if field.name not in IGNORED_FIELDS and field.name not in childFields
+        )
+    return fields
+
+
+def _leafValue(value: typing.Any) -> typing.Any:
+    # Tokens are compared by their type and string, their positions are ignored
+    if isinstance(value, tokenize.TokenInfo):
+        return value.type, value.string
+    return value
+
+
+def leafKey(node: Node) -> typing.Tuple[typing.Any, ...]:
+    """
+    Returns the values of the fields of a node that are not children, without positions.
+    """
+    return tuple(_leafValue(node.__getattribute__(field)) for field in leafFields(node))
+
+
+def _identifierKey(node: Identifier) -> typing.Tuple[str, ...]:
+    return tuple(attr.value for attr in node.attrs)
+
+
+def structuralHash(root: Node) -> int:
+    """
+    Returns the structural hash of a node, i.e. a hash that ignores positions.
+
+    Notes
+    -----
+    The hashes of the node and of its descendants are cached on them. Identifiers are
+    hashed by their names, without hashing their tokens one by one.
+
+    Doctests
+    --------
+    >>> from frontend.parser import parseCached
+    >>> a = parseCached('package a.b\\n').packageHeader
+    >>> b = parseCached('\\npackage  a.b\\n').packageHeader
+    >>> structuralHash(a) == structuralHash(b), (a.row, a.column) == (b.row, b.column)
+    (True, False)
+    """
+    cached = root.__dict__.get(HASH_ATTRIBUTE)
+    if cached is not None:
+        return cached
+    stack: typing.List[typing.Tuple[Node, typing.Optional[typing.List[Node]]]] = [(root, None)]
+    while stack:
+        node, children = stack.pop()
+        state = node.__dict__
+        if HASH_ATTRIBUTE in state:
+            # Shared subtrees are hashed once
+            continue
+        cls = thawedClass(type(node))
+        if cls is Identifier:
+            state[HASH_ATTRIBUTE] = hash((cls, _identifierKey(node)))
+            continue
+        if children is None:
+            children = childNodes(node)
+            stack.append((node, children))
+            stack.extend((child, None) for child in children if HASH_ATTRIBUTE not in child.__dict__)
+            continue
+        hashes = tuple(child.__dict__[HASH_ATTRIBUTE] for child in children)
+        state[HASH_ATTRIBUTE] = hash((cls, hashes) if cls is List else (cls, hashes, leafKey(node)))
+    return root.__dict__[HASH_ATTRIBUTE]
+
+
+def structurallyEqual(a: Node, b: Node) -> bool:
+    """
+    Returns whether two nodes are structurally equal, i.e. equal regardless of their positions.
+
+    Notes
+    -----
+    It takes linear time in the size of the smaller tree at worst. Identical subtrees
+    (e.g. shared by a NodeFactory) and nodes with different cached hashes are decided in
+    O(1), Lists of different lengths too.
+
+    Doctests
+    --------
+    >>> from frontend.parser import parseCached
+    >>> a = parseCached('package a.b\\n')
+    >>> structurallyEqual(a, parseCached('\\npackage  a.b\\n')), structurallyEqual(a, parseCached('package a\\n'))
+    (True, False)
+    """
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        cls = thawedClass(type(a))
+        if cls is not thawedClass(type(b)):
+            return False
+        hashA = a.__dict__.get(HASH_ATTRIBUTE)
+        if hashA is not None:
+            hashB = b.__dict__.get(HASH_ATTRIBUTE)
+            if hashB is not None and hashA != hashB:
+                return False
+        if cls is Identifier:
+            if _identifierKey(a) != _identifierKey(b):
+                return False
+            continue
+        if cls is List:
+            if len(a) != len(b):
+                return False
+        elif leafKey(a) != leafKey(b):
+            return False
+        childrenA, childrenB = childNodes(a), childNodes(b)
+        if len(childrenA) != len(childrenB):
+            return False
+        stack.extend(zip(childrenA, childrenB))
+    return True
+
+
+def clearStructuralHash(root: Node):
+    """
+    Drops the cached hashes of every node of a tree, e.g. after modifying it in place.
+    """
+    for node in walk(root):
+        node.__dict__.pop(HASH_ATTRIBUTE, None)
@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import copy
+import copyreg
+import dataclasses
+from frontend.parser.AST import Node, List
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'NodeVisitor',
+    'NodeTransformer',
+    'childNodes',
+    'walk',
+    'findAll',
+    'mapNodes',
+    'replaceChildren',
+    'freeze',
+    'isFrozen',
+    'thawedClass',
+]
+
+# MAIN CONTENT
+# ============>
+
+_T = typing.TypeVar('_T', bound=Node)
+
+# The elements of a List are its children
+ELEMENTS = ('*',)
+
+# The child fields of each class, `None` for values that are not nodes (e.g. tokens)
+_fields: typing.Dict[type, typing.Optional[typing.Tuple[str, ...]]] = dict()
+
+
+def _childFields(value: typing.Any) -> typing.Optional[typing.Tuple[str, ...]]:
+    cls = type(value)
+    if cls in _fields:
+        return _fields[cls]
+    if issubclass(cls, List):
+        _fields[cls] = ELEMENTS
+    elif issubclass(cls, Node):
+        # The children are computed by NodeMeta when the first instance is created
+        _fields[cls] = tuple(value.children or tuple())
+    else:
+        _fields[cls] = None
+    return _fields[cls]
+
+
+def childNodes(node: Node) -> typing.List[Node]:
+    """
+    Returns the children of a node that are nodes themselves.
+
+    Parameters
+    ----------
+    node: Node
+        The node.
+
+    Returns
+    -------
+    typing.List[Node]
+        The children, in the order of the class `children` (or the elements of a List).
+    """
+    fields = _childFields(node)
+    if fields is None:
+        return []
+    if fields is ELEMENTS:
+        children = node
+    else:
+        children = [node.__getattribute__(field) for field in fields]
+    return [child for child in children if _childFields(child) is not None]
+
+
+def walk(root: Node) -> typing.Iterator[Node]:
+    """
+    Yields every node of the tree in preorder.
+
+    Parameters
+    ----------
+    root: Node
+        The root of the tree.
+
+    Notes
+    -----
+    The tree is walked with an explicit stack, so its depth is not limited by the recursion limit.
+    """
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        children = childNodes(node)
+        children.reverse()
+        stack.extend(children)
+
+
+def findAll(root: Node, types: typing.Type[_T] | typing.Tuple[typing.Type[_T], ...]) -> typing.List[_T]:
+    """
+    Returns every node of the tree that is an instance of the given types, in preorder.
+
+    Parameters
+    ----------
+    root: Node
+        The root of the tree.
+    types: typing.Type[_T] | typing.Tuple[typing.Type[_T], ...]
+        The types to look for.
+
+    Returns
+    -------
+    typing.List[_T]
+        The matching nodes.
+    """
+    matches: typing.Dict[type, bool] = dict()
+    result = []
+    for node in walk(root):
+        cls = type(node)
+        match = matches.get(cls)
+        if match is None:
+            match = matches[cls] = issubclass(cls, types)
+        if match:
+            result.append(node)
+    return result
+
+
+def mapNodes(root: Node, function: typing.Callable[[Node], typing.Any]) -> typing.Any:
+    """
+    Maps every node of the tree bottom-up, i.e. the children of a node are mapped first.
+
+    Parameters
+    ----------
+    root: Node
+        The root of the tree.
+    function: typing.Callable[[Node], typing.Any]
+        Returns the replacement of a node, or the node itself to keep it.
+
+    Returns
+    -------
+    typing.Any
+        The replacement of the root.
+
+    Notes
+    -----
+    The original tree is never modified: when some children are replaced, the parent is
+    copied (keeping its position) before the function is called on it, so unchanged
+    subtrees are shared between the trees.
+    """
+    stack: typing.List[typing.Tuple[Node, typing.Optional[typing.List[Node]]]] = [(root, None)]
+    results: typing.List[typing.Any] = []
+    while stack:
+        node, children = stack.pop()
+        if children is None:
+            children = childNodes(node)
+            stack.append((node, children))
+            stack.extend((child, None) for child in reversed(children))
+            continue
+        if children:
+            mapped = results[-len(children):]
+            del results[-len(children):]
+            if any(new is not old for new, old in zip(mapped, children)):
+                node = replaceChildren(node, children, mapped)
+        results.append(function(node))
+    return results[0]
+
+
+def replaceChildren(node: Node, children: typing.List[Node], mapped: typing.List[typing.Any]) -> Node:
+    """
+    Returns a copy of a node with some of its children replaced, keeping its position.
+
+    Parameters
+    ----------
+    node: Node
+        The node.
+    children: typing.List[Node]
+        The children of the node, as returned by `childNodes`.
+    mapped: typing.List[typing.Any]
+        The replacement of each child.
+
+    Returns
+    -------
+    Node
+        The copy.
+    """
+    replacements = {id(old): new for old, new in zip(children, mapped)}
+    if _childFields(node) is ELEMENTS:
+        result = List(elements=[replacements.get(id(element), element) for element in node])
+        result.row, result.column, result.end_row, result.end_column = (
+            node.row, node.column, node.end_row, node.end_column
+        )
+        return result
+    result = copy.copy(node)
+    for field in _childFields(node):
+        value = node.__getattribute__(field)
+        if id(value) in replacements:
+            result.__setattr__(field, replacements[id(value)])
+    return result
+
+
+# Frozen nodes
+# ------------>
+
+# The frozen subclass of each node class, and the other way around
+_frozenClasses: typing.Dict[type, type] = dict()
+_thawedClasses: typing.Dict[type, type] = dict()
+
+# The methods of list that modify it in place
+LIST_MUTATORS = (
+    '__setitem__', '__delitem__', '__iadd__', '__imul__',
+    'append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+)
+
+
+def _readOnly(self, *args, **kwargs):
+    raise TypeError(
+        f'{type(self).__name__} node is frozen, copy it first (e.g. with copy.copy, mapNodes or NodeTransformer)'
+    )
+
+
+def _readOnlyElements(self, *args, **kwargs):
+    raise TypeError('the elements of a frozen List are read-only, copy the List first (e.g. with mapNodes)')
+
+
+class _FrozenElements(list):
+    """
+    The `elements` of a frozen List, a list that raises TypeError when it is modified.
+
+    Notes
+    -----
+    It is equal to a list with the same items, and copies (and pickles) of it are lists.
+    """
+    __hash__ = None
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+for _name in LIST_MUTATORS:
+    setattr(_FrozenElements, _name, _readOnlyElements)
+del _name
+
+
+def _newNode(cls: type, *args) -> Node:
+    return cls.__new__(cls, *args)
+
+
+def _frozenClass(cls: type) -> type:
+    frozen = _frozenClasses.get(cls)
+    if frozen is not None:
+        return frozen
+    fields = tuple(field.name for field in dataclasses.fields(cls) if field.compare)
+
+    def __eq__(self, other):
+        if thawedClass(type(other)) is not cls:
+            return NotImplemented
+        return all(self.__getattribute__(field) == other.__getattribute__(field) for field in fields)
+
+    def __reduce_ex__(self, protocol):
+        # Copies (and pickles) of a frozen node are regular nodes
+        reduced = object.__reduce_ex__(self, protocol)
+        # pickle requires the class of the object itself for copyreg.__newobj__
+        function = _newNode if reduced[0] is copyreg.__newobj__ else reduced[0]
+        return (function, tuple(cls if arg is frozen else arg for arg in reduced[1]), *reduced[2:])
+
+    namespace = {
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '__setattr__': _readOnly,
+        '__delattr__': _readOnly,
+        '__eq__': __eq__,
+        '__hash__': None,
+        '__reduce_ex__': __reduce_ex__,
+    }
+    if issubclass(cls, list):
+        namespace.update(dict.fromkeys(LIST_MUTATORS, _readOnly))
+    # NodeMeta.__new__ is skipped, the fields are inherited as they are
+    frozen = super(type(cls), type(cls)).__new__(type(cls), cls.__name__, (cls,), namespace)
+    _frozenClasses[cls] = frozen
+    _thawedClasses[frozen] = cls
+    return frozen
+
+
+def thawedClass(cls: type) -> type:
+    """
+    Returns the class of the regular nodes of a frozen node class, or the class itself.
+    """
+    return _thawedClasses.get(cls, cls)
+
+
+def isFrozen(node: Node) -> bool:
+    return type(node) in _thawedClasses
+
+
+def freeze(root: _T) -> _T:
+    """
+    Makes every node of a tree read-only, in place.
+
+    Parameters
+    ----------
+    root: _T
+        The root of the tree.
+
+    Returns
+    -------
+    _T
+        The root.
+
+    Notes
+    -----
+    The class of each node is replaced by a read-only subclass with the same name, so
+    isinstance checks, visitors and repr are unchanged. Setting a field (or modifying a
+    List, or its `elements`) raises TypeError. Copies are regular nodes, so `copy.copy`,
+    `copy.deepcopy`, `mapNodes` and `NodeTransformer` give copy-on-write access to frozen
+    trees.
+    """
+    for node in walk(root):
+        _freezeNode(node)
+    return root
+
+
+def _freezeNode(node: Node):
+    cls = type(node)
+    if cls in _thawedClasses:
+        return
+    object.__setattr__(node, '__class__', _frozenClass(cls))
+    if isinstance(node, list):
+        elements = node.__dict__.get('elements', None)
+        if isinstance(elements, Node):
+            # The loops of the parser wrap a List in another one, it's not a child
+            _freezeNode(elements)
+        elif elements is not None:
+            node.__dict__['elements'] = _FrozenElements(elements)
+
+
+class NodeVisitor:
+    """
+    Visits every node of a tree in preorder.
+
+    Notes
+    -----
+    Subclasses define `visit<ClassName>` methods (e.g. `visitIdentifier`), the method of the
+    closest base class is called when a class has none (`visitNode` for all nodes).
+    A method returns False to skip the children of the node.
+
+    The method of each node class is resolved once per visitor class.
+    """
+    _dispatch: typing.ClassVar[typing.Dict[type, typing.Optional[typing.Callable]]] = dict()
+    _prefix: typing.ClassVar[str] = 'visit'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = dict()
+
+    def _method(self, cls: type) -> typing.Optional[typing.Callable]:
+        dispatch = type(self)._dispatch
+        if cls not in dispatch:
+            dispatch[cls] = next(
+                (
+                    getattr(type(self), self._prefix + base.__name__)
+                    for base in cls.__mro__ if hasattr(type(self), self._prefix + base.__name__)
+                ),
+                None
+            )
+        return dispatch[cls]
+
+    def visit(self, root: Node):
+        """
+        Visits the tree.
+
+        Parameters
+        ----------
+        root: Node
+            The root of the tree.
+        """
+        dispatch = type(self)._dispatch
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            cls = type(node)
+            method = dispatch[cls] if cls in dispatch else self._method(cls)
+            if method is not None and method(self, node) is False:
+                continue
+            children = childNodes(node)
+            children.reverse()
+            stack.extend(children)
+
+
+class NodeTransformer(NodeVisitor):
+    """
+    Transforms a tree bottom-up.
+
+    Notes
+    -----
+    Subclasses define `transform<ClassName>` methods, they receive a node whose children are
+    already transformed and return its replacement. Nodes without a method are kept.
+    See `mapNodes` for how the tree is rebuilt.
+    """
+    _prefix: typing.ClassVar[str] = 'transform'
+
+    def transform(self, root: Node) -> typing.Any:
+        """
+        Transforms the tree.
+
+        Parameters
+        ----------
+        root: Node
+            The root of the tree.
+
+        Returns
+        -------
+        typing.Any
+            The replacement of the root.
+        """
+        dispatch = type(self)._dispatch
+
+        def function(node: Node) -> typing.Any:
+            cls = type(node)
+            method = dispatch[cls] if cls in dispatch else self._method(cls)
+            return node if method is None else method(self, node)
+
+        return mapNodes(root, function)
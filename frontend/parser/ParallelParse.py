@@ -0,0 +1,258 @@
+"""
+Parallel parsing of a single large source.
+
+Notes
+-----
+Top-level statements start at the beginning of a line (`import ...` and `fun ...`), and
+the parser never looks past the `semi` that ends them (they are commit points of the
+grammar, see `ParserBase.commit`). So a source can be split at these lines with a plain
+text scan, and the chunks can be tokenized and parsed independently: the package header
+with `packageHeader`, runs of imports with `importList` and runs of declarations with
+`topLevelObjectList`. The results are stitched into one `File`, the same as the tree of
+a sequential parse (node classes, attributes and positions).
+
+The rows of the tokens of a chunk are shifted by the number of lines before it in the
+worker, so the nodes have their absolute positions without a pass over the tree. Workers
+send their nodes back pickled, and they are unpickled here with the garbage collector
+paused, which is most of the cost of unpickling many nodes.
+
+The text scan doesn't know about strings or brackets, but a line split inside one leaves
+the chunk before it unterminated, so it fails to tokenize. If any chunk fails, the whole
+source is parsed sequentially, which reports the syntax error exactly as usual.
+
+Usage
+-----
+>>> from concurrent.futures import ProcessPoolExecutor
+>>> with ProcessPoolExecutor() as executor:  # doctest: +SKIP
+...     tree = parseParallel(source, executor=executor)
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import gc
+import pickle
+import re
+import token
+from dataclasses import dataclass
+from frontend.lexer import Lexer
+from frontend.lexer.KiwiTokenizer import KiwiTokenizer
+from frontend.lexer.TokenInfo import TokenInfo
+from frontend.parser.AST import File, Node
+from frontend.parser.ParseCache import parseSource
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'Chunk',
+    'splitSource',
+    'parseParallel',
+]
+
+# MAIN CONTENT
+# ============>
+
+# The approximate size of a chunk, in characters
+CHUNK_SIZE = 1 << 16
+
+# The lines that start a top-level statement, and the rule that parses a run of them
+BOUNDARY = re.compile(r'^(import|fun)\b', re.MULTILINE)
+RULES = {'import': 'importList', 'fun': 'topLevelObjectList'}
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """
+    A part of a source that is parsed on its own.
+
+    Attributes
+    ----------
+    start: int
+        The offset of the first character of the chunk in the source.
+    end: int
+        The offset after the last character of the chunk.
+    row: int
+        The number of lines before the chunk, i.e. the shift of the rows of its tokens.
+    rule: str
+        The rule that parses the whole chunk.
+    """
+    start: int
+    end: int
+    row: int
+    rule: str
+
+
+def splitSource(source: str, chunkSize: int = CHUNK_SIZE) -> typing.List[Chunk]:
+    """
+    Splits a source at the lines that start a top-level statement.
+
+    Parameters
+    ----------
+    source: str
+        The source.
+    chunkSize: int
+        The approximate size of a chunk, consecutive statements are grouped up to it.
+
+    Returns
+    -------
+    typing.List[Chunk]
+        The chunks, the package header first, or an empty list if the source can't be
+        split (i.e. it has no statements after the header, or imports after declarations).
+
+    Doctests
+    --------
+    >>> [(chunk.row, chunk.rule) for chunk in splitSource('package a\\nimport b\\nimport c\\n', chunkSize=1)]
+    [(0, 'packageHeader'), (1, 'importList'), (2, 'importList')]
+    """
+    boundaries = [(match.start(), RULES[match.group(1)]) for match in BOUNDARY.finditer(source)]
+    if not boundaries:
+        return []
+    chunks = []
+    start, rule, row = 0, 'packageHeader', 0
+    rules = list(RULES.values())
+    for offset, kind in boundaries:
+        if offset == 0:
+            # No package header, the sequential parse reports it
+            return []
+        if kind != rule and rule != 'packageHeader' and rules.index(kind) < rules.index(rule):
+            return []
+        if kind != rule or offset - start >= chunkSize:
+            chunks.append(Chunk(start, offset, row, rule))
+            row += source.count('\n', start, offset)
+            start, rule = offset, kind
+    chunks.append(Chunk(start, len(source), row, rule))
+    return chunks
+
+
+def parseChunk(source: str, row: int, rule: str, last: bool) -> typing.Optional[typing.List[Node]]:
+    """
+    Parses a chunk, see `Chunk`.
+
+    Parameters
+    ----------
+    source: str
+        The text of the chunk.
+    row: int
+        The number of lines before the chunk.
+    rule: str
+        The rule that parses the whole chunk.
+    last: bool
+        Whether the chunk ends the source, so it may end with a `semi` as a File does.
+
+    Returns
+    -------
+    typing.Optional[typing.List[Node]]
+        The nodes of the chunk, or None if the chunk is not exactly one match of the rule.
+    """
+    from frontend.parser.Parser import Parser
+
+    tokenizer = Lexer().load(source).tokenize()
+    if tokenizer._error is not None:
+        return None
+    if row:
+        new = tuple.__new__
+        tokenizer = KiwiTokenizer([
+            new(TokenInfo, (kind, string, (start[0] + row, start[1]), (end[0] + row, end[1]), line))
+            for kind, string, start, end, line in tokenizer._array
+        ], source)
+    parser = Parser(tokenizer)
+    try:
+        result = getattr(parser, rule)()
+        if result is None:
+            return None
+        if last:
+            parser.semi()
+        if tokenizer.peek().type != token.ENDMARKER:
+            return None
+    except SyntaxError:
+        return None
+    return [result] if rule == 'packageHeader' else list(result)
+
+
+def parseChunkPickled(source: str, row: int, rule: str, last: bool) -> typing.Optional[bytes]:
+    """
+    Same as `parseChunk`, but pickles the result, see `parseParallel`.
+    """
+    nodes = parseChunk(source, row, rule, last)
+    return None if nodes is None else pickle.dumps(nodes, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def parseParallel(source: str, *, executor: typing.Optional[Executor] = None,
+                  chunkSize: int = CHUNK_SIZE) -> File:
+    """
+    Parses a source by chunks, in parallel with an executor.
+
+    Parameters
+    ----------
+    source: str
+        The source.
+    executor: typing.Optional[Executor]
+        The worker pool (e.g. a ProcessPoolExecutor), the chunks are parsed in this
+        thread by default.
+    chunkSize: int
+        The approximate size of a chunk, see `splitSource`.
+
+    Returns
+    -------
+    File
+        The tree, the same as the tree of a sequential parse.
+
+    Raises
+    ------
+    SyntaxError
+        If the source is not valid, the same error as a sequential parse.
+
+    Notes
+    -----
+    Sources that can't be split in more than one chunk after the header are parsed
+    sequentially.
+
+    Doctests
+    --------
+    >>> from frontend.parser import structurallyEqual
+    >>> source = 'package a\\n' + 'import b.c as d\\n' * 100
+    >>> tree = parseParallel(source, chunkSize=256)
+    >>> structurallyEqual(tree, parseSource(source)), tree.importList[-1].row
+    (True, 101)
+    """
+    from frontend.parser import NodeBuilders as Nodes
+
+    chunks = splitSource(source, chunkSize)
+    if len(chunks) < 3:
+        return parseSource(source)
+    texts = [source[chunk.start:chunk.end] for chunk in chunks]
+    rows = [chunk.row for chunk in chunks]
+    rules = [chunk.rule for chunk in chunks]
+    lasts = [False] * (len(chunks) - 1) + [True]
+    if executor is None:
+        results = list(map(parseChunk, texts, rows, rules, lasts))
+    else:
+        results = list(executor.map(parseChunkPickled, texts, rows, rules, lasts))
+    if any(result is None for result in results):
+        return parseSource(source)
+    if executor is not None:
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            results = [pickle.loads(result) for result in results]
+        finally:
+            if enabled:
+                gc.enable()
+
+    lists = {rule: [] for rule in RULES.values()}
+    for rule, nodes in zip(rules[1:], results[1:]):
+        lists[rule].extend(nodes)
+    # The loops and the rules that return them both build a List, as in `memoize`
+    return Nodes.File(
+        results[0][0],
+        Nodes.List(Nodes.List(lists['importList'])),
+        Nodes.List(Nodes.List(lists['topLevelObjectList'])),
+    )
@@ -0,0 +1,305 @@
+"""
+Process-level cache of parse results.
+
+Notes
+-----
+Long-running tools parse the same sources over and over (e.g. unchanged open files or
+shared snippets). The cache maps the hash of a source to its AST (or its syntax error),
+so a source is only parsed once as long as it stays in the cache.
+
+Cached trees are frozen (see `freeze`) since they are shared by every caller: reading
+them is free, and `copy.copy`, `mapNodes` or `NodeTransformer` give copy-on-write access.
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import collections
+import hashlib
+import sys
+import threading
+from dataclasses import dataclass
+from frontend.parser.AST import File, TokenWrapper
+from frontend.parser.NodeVisitor import freeze, walk
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'ParseCache',
+    'CacheStats',
+    'defaultCache',
+    'parseCached',
+    'sourceHash',
+    'estimateSize',
+]
+
+# MAIN CONTENT
+# ============>
+
+# The position of a syntax error, as (message, row, column, line)
+ErrorInfo = typing.Tuple[str, typing.Optional[int], typing.Optional[int], typing.Optional[str]]
+
+
+def sourceHash(source: str) -> bytes:
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).digest()
+
+
+def estimateSize(tree: File) -> int:
+    """
+    Returns the approximate memory used by a tree, in bytes.
+
+    Notes
+    -----
+    The nodes, their attribute dictionaries and their tokens are counted, the strings
+    shared with the source (e.g. the lines of the tokens) are not.
+    """
+    size = 0
+    for node in walk(tree):
+        size += sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+        if isinstance(node, TokenWrapper):
+            size += sys.getsizeof(node.token) + sys.getsizeof(node.token.string)
+    return size
+
+
+def parseSource(source: str) -> File:
+    from frontend.lexer import Lexer
+    from frontend.parser.Parser import Parser
+    parser = Parser(Lexer().load(source).tokenize())
+    tree = parser.start()
+    if tree is None:
+        raise parser.make_syntax_error('invalid syntax')
+    return tree
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    The counters of a cache.
+
+    Attributes
+    ----------
+    hits: int
+        The number of lookups that found their source.
+    misses: int
+        The number of lookups that had to parse their source.
+    evictions: int
+        The number of entries evicted to stay within the budget.
+    entries: int
+        The number of cached sources.
+    size: int
+        The estimated memory used by the cached trees, in bytes.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+    @property
+    def hitRate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ParseCache:
+    """
+    A thread-safe LRU cache of parse results, keyed by the hash of the source.
+
+    Attributes
+    ----------
+    maxEntries: typing.Optional[int]
+        The maximum number of cached sources, None for no limit.
+    maxSize: typing.Optional[int]
+        The maximum estimated memory of the cached trees in bytes, None for no limit.
+    hits: int
+        The number of lookups that found their source.
+    misses: int
+        The number of lookups that had to parse their source.
+    evictions: int
+        The number of entries evicted to stay within the budget.
+    size: int
+        The estimated memory used by the cached trees, in bytes.
+    _parse: typing.Callable[[str], File]
+        Parses a source, raises SyntaxError on errors.
+    _entries: typing.OrderedDict[bytes, typing.Tuple[typing.Optional[File], typing.Optional[ErrorInfo], int]]
+        The cached results (tree, error, size), least recently used first.
+    _lock: threading.Lock
+        Guards the entries and the counters.
+
+    Notes
+    -----
+    Syntax errors are cached too, a new SyntaxError is raised on every lookup.
+    Sources are parsed outside the lock, so lookups of different sources run in parallel.
+    Two threads that miss the same source at the same time both parse it, the first
+    result is kept.
+
+    Doctests
+    --------
+    >>> cache = ParseCache(maxEntries=2)
+    >>> cache.parse('package a\\n') is cache.parse('package a\\n')
+    True
+    >>> cache.stats().hits, cache.stats().misses
+    (1, 1)
+    """
+    maxEntries: typing.Optional[int]
+    maxSize: typing.Optional[int]
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    _parse: typing.Callable[[str], File]
+    _entries: typing.OrderedDict[bytes, typing.Tuple[typing.Optional[File], typing.Optional[ErrorInfo], int]]
+    _lock: threading.Lock
+
+    def __init__(self, maxEntries: typing.Optional[int] = 128, maxSize: typing.Optional[int] = None,
+                 parse: typing.Optional[typing.Callable[[str], File]] = None):
+        """
+        Parameters
+        ----------
+        maxEntries: typing.Optional[int]
+            The maximum number of cached sources, None for no limit.
+        maxSize: typing.Optional[int]
+            The maximum estimated memory of the cached trees in bytes, None for no limit.
+        parse: typing.Optional[typing.Callable[[str], File]]
+            Parses a source and raises SyntaxError on errors, e.g. to use TableParser.
+            The generated parser is used by default.
+        """
+        self.maxEntries = maxEntries
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._parse = parse or parseSource
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, source: str) -> bool:
+        return sourceHash(source) in self._entries
+
+    def parse(self, source: str, filename: str = '<unknown>') -> File:
+        """
+        Returns the AST of a source, parsing it only if it's not cached.
+
+        Parameters
+        ----------
+        source: str
+            The source code.
+        filename: str
+            The name used in syntax errors.
+
+        Returns
+        -------
+        File
+            The frozen AST, shared with every other caller.
+
+        Raises
+        ------
+        SyntaxError
+            If the source has a syntax error.
+        """
+        key = sourceHash(source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None:
+            entry = self._store(key, *self._result(source))
+        tree, error, _ = entry
+        if error is not None:
+            message, row, column, line = error
+            raise SyntaxError(message, (filename, row, column, line))
+        return tree
+
+    def _result(self, source: str) -> typing.Tuple[typing.Optional[File], typing.Optional[ErrorInfo], int]:
+        try:
+            tree = self._parse(source)
+        except SyntaxError as error:
+            info = (error.msg, error.lineno, error.offset, error.text)
+            return None, info, sys.getsizeof(info) + sys.getsizeof(error.text or str())
+        return freeze(tree), None, estimateSize(tree)
+
+    def _store(self, key: bytes, tree: typing.Optional[File], error: typing.Optional[ErrorInfo],
+               size: int) -> typing.Tuple[typing.Optional[File], typing.Optional[ErrorInfo], int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Another thread parsed the same source meanwhile
+                return entry
+            entry = self._entries[key] = (tree, error, size)
+            self.size += size
+            self._evict()
+            return entry
+
+    def _evict(self):
+        # The last entry is never evicted, even if it's larger than the budget on its own
+        while len(self._entries) > 1 and (
+                (self.maxEntries is not None and len(self._entries) > self.maxEntries) or
+                (self.maxSize is not None and self.size > self.maxSize)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def resize(self, maxEntries: typing.Optional[int] = None, maxSize: typing.Optional[int] = None):
+        """
+        Changes the budget, evicting entries if needed.
+        """
+        with self._lock:
+            self.maxEntries = maxEntries
+            self.maxSize = maxSize
+            self._evict()
+
+    def discard(self, source: str) -> bool:
+        """
+        Removes a source from the cache, returns whether it was cached.
+        """
+        with self._lock:
+            entry = self._entries.pop(sourceHash(source), None)
+            if entry is None:
+                return False
+            self.size -= entry[2]
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                size=self.size,
+            )
+
+
+_defaultCache = ParseCache()
+
+
+def defaultCache() -> ParseCache:
+    """
+    Returns the cache shared by the whole process, use `resize` to change its budget.
+    """
+    return _defaultCache
+
+
+def parseCached(source: str, filename: str = '<unknown>') -> File:
+    """
+    Parses a source with the cache of the process, see `ParseCache.parse`.
+    """
+    return _defaultCache.parse(source, filename)
@@ -7,9 +7,10 @@ import tokenize
 
 # noinspection PyUnresolvedReferences
 from typing import Optional, Any
-from pegen.parser import Parser
+from frontend.parser.ParserBase import ParserBase as Parser
 from frontend.parser.memoizetools import memoize, memoize_left_rec
 import frontend.parser.AST as AST
+import frontend.parser.NodeBuilders as Nodes
 
 # EXPORTS
 # =======>
@@ -20,14 +21,15 @@ __all__ = ["Parser"]
 # MAIN CONTENT
 # ============>
 
-memoize.List = AST.List
-memoize_left_rec.List = AST.List
+memoize.List = Nodes.List
+memoize_left_rec.List = Nodes.List
 
 
 # noinspection PyRedundantParentheses
 # noinspection PyUnboundLocalVariable
 # Keywords and soft keywords are listed at the end of the parser definition.
 class Parser(Parser):
+
     @memoize
     def start(self) -> Optional[AST.File]:
         # start: packageHeader importList topLevelObjectList semi? &&($)
@@ -39,7 +41,7 @@ class Parser(Parser):
             and (self.semi(),)
             and (self.expect_forced(self.expect("ENDMARKER"), """($)"""))
         ):
-            return AST.File(packageHeader=i1, importList=i2, declarations=i3)
+            return Nodes.File(i1, i2, i3)
         self._reset(mark)
         return None
 
@@ -55,7 +57,7 @@ class Parser(Parser):
             and (self.expect("("))
             and (self.expect(")"))
         ):
-            return AST.FunctionDeclaration(modifiers=i1, receiverType=i2, identifier=i3)
+            return Nodes.FunctionDeclaration(i1, i2, i3)
         self._reset(mark)
         return None
 
@@ -64,7 +66,7 @@ class Parser(Parser):
         # identifier: simpleIdentifier identifier_i2_List
         mark = self._mark()
         if (i1 := self.simpleIdentifier()) and (i2 := self.identifier_i2_List()):
-            return AST.Identifier(attrs=AST.List(elements=list([i1])) + i2)
+            return Nodes.Identifier(Nodes.List([i1, *i2]))
         self._reset(mark)
         return None
 
@@ -94,7 +96,7 @@ class Parser(Parser):
         # simpleIdentifier: NAME
         mark = self._mark()
         if i1 := self.name():
-            return AST.TokenWrapper(token=i1)
+            return Nodes.TokenWrapper(i1)
         self._reset(mark)
         return None
 
@@ -104,20 +106,21 @@ class Parser(Parser):
         # nullable=True
         mark = self._mark()
         if (self.expect("DEDENT"),):
-            return AST.List(elements=list())
+            return Nodes.List(list())
         self._reset(mark)
         return None
 
     @memoize
     def packageHeader(self) -> Optional[AST.PackageHeader]:
-        # packageHeader: 'package' (&&(identifier)) &&(semi)
+        # packageHeader: 'package' (&&(identifier)) &&(semi) COMMIT
         mark = self._mark()
         if (
             (self.expect("package"))
             and (i1 := self.expect_forced(self.identifier(), """(identifier)"""))
             and (self.expect_forced(self.semi(), """(semi)"""))
+            and (self.commit())
         ):
-            return AST.PackageHeader(identifier=i1)
+            return Nodes.PackageHeader(i1)
         self._reset(mark)
         return None
 
@@ -133,15 +136,16 @@ class Parser(Parser):
 
     @memoize
     def importHeader(self) -> Optional[AST.ImportHeader]:
-        # importHeader: 'import' (&&(identifier)) importHeader_i2 &&(semi)
+        # importHeader: 'import' (&&(identifier)) importHeader_i2 &&(semi) COMMIT
         mark = self._mark()
         if (
             (self.expect("import"))
             and (i1 := self.expect_forced(self.identifier(), """(identifier)"""))
             and (i2 := self.importHeader_i2())
             and (self.expect_forced(self.semi(), """(semi)"""))
+            and (self.commit())
         ):
-            return AST.ImportHeader(identifier=i1, alias=i2)
+            return Nodes.ImportHeader(i1, i2)
         self._reset(mark)
         return None
 
@@ -154,10 +158,10 @@ class Parser(Parser):
             return importAlias
         self._reset(mark)
         if (self.expect(".")) and (self.expect("*")):
-            return AST.ImportAlias()
+            return Nodes.ImportAlias()
         self._reset(mark)
         if (self.expect("DEDENT"),):
-            return AST.Null()
+            return Nodes.Null()
         self._reset(mark)
         return None
 
@@ -168,7 +172,7 @@ class Parser(Parser):
         if (self.expect("as")) and (
             i1 := self.expect_forced(self.simpleIdentifier(), """(simpleIdentifier)""")
         ):
-            return AST.ImportAlias(identifier=i1)
+            return Nodes.ImportAlias(i1)
         self._reset(mark)
         return None
 
@@ -196,10 +200,12 @@ class Parser(Parser):
 
     @memoize
     def topLevelObject(self) -> Optional[AST.Declaration]:
-        # topLevelObject: declaration &&(semi)
+        # topLevelObject: declaration &&(semi) COMMIT
         mark = self._mark()
-        if (i1 := self.declaration()) and (
-            self.expect_forced(self.semi(), """(semi)""")
+        if (
+            (i1 := self.declaration())
+            and (self.expect_forced(self.semi(), """(semi)"""))
+            and (self.commit())
         ):
             return i1
         self._reset(mark)
@@ -0,0 +1,97 @@
+"""
+Base class of the parsers, i.e. pegen's parser with commit points.
+
+Notes
+-----
+A packrat parser memoizes the result of every rule at every position, so its memo table
+grows with the length of the source. The `COMMIT` marker of the grammar tells the parser
+that it never goes back before the current position (e.g. after a top-level declaration
+and its `semi`), so the memo entries of the positions before it can be dropped, and the
+tokens before it can be released by the tokenizer (see `KiwiTokenizer.release`).
+
+The memo table is pruned in place, and only once it has doubled since the last pruning,
+so commits cost amortized O(1) per memo entry and the table stays proportional to the
+part of the source after the last commit (instead of the whole source).
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import pegen.parser as pegen
+from pegen.tokenizer import Tokenizer
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'ParserBase',
+]
+
+# MAIN CONTENT
+# ============>
+
+# The size of the memo table below which it is never pruned
+PRUNE_THRESHOLD = 1024
+
+
+class ParserBase(pegen.Parser):
+    """
+    pegen's parser with the commit points of the grammar.
+
+    Attributes
+    ----------
+    _committed: int
+        The mark of the last commit.
+    _pruneAt: int
+        The size of the memo table that triggers the next pruning.
+    _leftRecursion: int
+        The number of left-recursive rules being parsed, commits are ignored meanwhile as
+        their seeds live in the memo table.
+
+    Doctests
+    --------
+    >>> from frontend.lexer import Lexer
+    >>> from frontend.parser.Parser import Parser
+    >>> parser = Parser(Lexer().load('package a\\n' + 'import b\\n' * 5000).tokenize())
+    >>> len(parser.start().importList), len(parser._cache) < 5000
+    (5000, True)
+    """
+    _committed: int
+    _pruneAt: int
+    _leftRecursion: int
+
+    def __init__(self, tokenizer: Tokenizer, *, verbose: bool = False):
+        super().__init__(tokenizer, verbose=verbose)
+        self._committed = 0
+        self._pruneAt = PRUNE_THRESHOLD
+        self._leftRecursion = 0
+
+    def commit(self) -> bool:
+        """
+        Marks the current position as a point the parser never goes back before.
+
+        Returns
+        -------
+        bool
+            Always True, it's an item of the grammar that matches nothing.
+        """
+        mark = self._mark()
+        if mark <= self._committed or self._leftRecursion:
+            return True
+        self._committed = mark
+        cache = self._cache
+        if len(cache) < self._pruneAt:
+            return True
+        # In place, the running rules hold a reference to the table
+        live = [(key, value) for key, value in cache.items() if key[0] >= mark]
+        cache.clear()
+        cache.update(live)
+        self._pruneAt = max(2 * len(cache), PRUNE_THRESHOLD)
+        release = getattr(self._tokenizer, 'release', None)
+        if release is not None:
+            release(mark)
+        return True
@@ -0,0 +1,483 @@
+"""
+Opcode tables of `frontend.parser.TableParser`.
+
+@generated by scripts/grammar.py from build/grammar, do not edit.
+"""
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+from typing import Optional, Any
+import token
+import frontend.parser.AST as AST
+import frontend.parser.NodeBuilders as Nodes
+from frontend.parser.TableParser import (
+    RULE,
+    EXPECT,
+    NAME,
+    TYPE,
+    SOFT_KEYWORD,
+    CUT,
+    COMMIT,
+    PLAIN,
+    FORCED,
+    POSITIVE,
+    NEGATIVE,
+    OPTIONAL,
+    NOT_NONE,
+    MEMO,
+    LOOP,
+    GATHER,
+    LEFT_REC,
+    LOCATIONS,
+)
+
+# MAIN CONTENT
+# ============>
+
+# Actions
+# ------->
+
+
+def _action_0(self, i1, i2, i3):
+    # start: packageHeader importList topLevelObjectList semi? &&($)
+    return Nodes.File(i1, i2, i3)
+
+
+def _action_1(self, i1, i2, i3):
+    # functionDeclaration: modifiers? 'fun' receiverType identifier '(' ')'
+    return Nodes.FunctionDeclaration(i1, i2, i3)
+
+
+def _action_2(self, i1, i2):
+    # identifier: simpleIdentifier identifier_i2_List
+    return Nodes.Identifier(Nodes.List([i1, *i2]))
+
+
+def _action_3(self, i1):
+    # identifier_i2_List: identifier_i2*
+    return i1
+
+
+def _action_4(self, i1):
+    # identifier_i2: '.' (&&(simpleIdentifier))
+    return i1
+
+
+def _action_5(self, i1):
+    # simpleIdentifier: NAME
+    return Nodes.TokenWrapper(i1)
+
+
+def _action_6(self):
+    # modifiers: DEDENT?
+    return Nodes.List(list())
+
+
+def _action_7(self, i1):
+    # packageHeader: 'package' (&&(identifier)) &&(semi) COMMIT
+    return Nodes.PackageHeader(i1)
+
+
+def _action_8(self, _loop0_2):
+    # importList: importHeader*
+    return _loop0_2
+
+
+def _action_9(self, i1, i2):
+    # importHeader: 'import' (&&(identifier)) importHeader_i2 &&(semi) COMMIT
+    return Nodes.ImportHeader(i1, i2)
+
+
+def _action_10(self, importAlias):
+    # importHeader_i2: importAlias
+    return importAlias
+
+
+def _action_11(self):
+    # importHeader_i2: '.' '*'
+    return Nodes.ImportAlias()
+
+
+def _action_12(self):
+    # importHeader_i2: DEDENT?
+    return Nodes.Null()
+
+
+def _action_13(self, i1):
+    # importAlias: 'as' (&&(simpleIdentifier))
+    return Nodes.ImportAlias(i1)
+
+
+def _action_14(self, _newline):
+    # semi: NEWLINE
+    return _newline
+
+
+def _action_15(self, literal):
+    # semi: ';'
+    return literal
+
+
+def _action_16(self, i1):
+    # topLevelObjectList: topLevelObject*
+    return i1
+
+
+def _action_17(self, i1):
+    # topLevelObject: declaration &&(semi) COMMIT
+    return i1
+
+
+def _action_18(self, functionDeclaration):
+    # declaration: functionDeclaration
+    return functionDeclaration
+
+
+def _action_19(self, parenthisedType):
+    # receiverType: parenthisedType
+    return parenthisedType
+
+
+def _action_20(self, typeReference):
+    # receiverType: typeReference
+    return typeReference
+
+
+def _action_21(self, literal, type, literal_1):
+    # parenthisedType: '(' type ')'
+    return [literal, type, literal_1]
+
+
+def _action_22(self, userType):
+    # typeReference: userType
+    return userType
+
+
+def _action_23(self, simpleUserType):
+    # userType: simpleUserType
+    return simpleUserType
+
+
+def _action_24(self, _dedent):
+    # type: DEDENT
+    return _dedent
+
+
+def _action_25(self, _dedent):
+    # simpleUserType: DEDENT
+    return _dedent
+
+
+def _action_26(self, identifier_i2):
+    # _loop0_1: identifier_i2
+    return identifier_i2
+
+
+def _action_27(self, importHeader):
+    # _loop0_2: importHeader
+    return importHeader
+
+
+def _action_28(self, topLevelObject):
+    # _loop0_3: topLevelObject
+    return topLevelObject
+
+
+# Rules
+# ----->
+
+RULE_INDEX = {
+    "start": 0,
+    "functionDeclaration": 1,
+    "identifier": 2,
+    "identifier_i2_List": 3,
+    "identifier_i2": 4,
+    "simpleIdentifier": 5,
+    "modifiers": 6,
+    "packageHeader": 7,
+    "importList": 8,
+    "importHeader": 9,
+    "importHeader_i2": 10,
+    "importAlias": 11,
+    "semi": 12,
+    "topLevelObjectList": 13,
+    "topLevelObject": 14,
+    "declaration": 15,
+    "receiverType": 16,
+    "parenthisedType": 17,
+    "typeReference": 18,
+    "userType": 19,
+    "type": 20,
+    "simpleUserType": 21,
+    "_loop0_1": 22,
+    "_loop0_2": 23,
+    "_loop0_3": 24,
+}
+
+RULES = (
+    # start: packageHeader importList topLevelObjectList semi? &&($)
+    (
+        "start",
+        MEMO,
+        (
+            (
+                (
+                    (RULE, 7, PLAIN, True, None),
+                    (RULE, 8, PLAIN, True, None),
+                    (RULE, 13, PLAIN, True, None),
+                    (RULE, 12, OPTIONAL, False, None),
+                    (EXPECT, ("ENDMARKER", token.ENDMARKER), FORCED, False, "($)"),
+                ),
+                _action_0,
+                False,
+            ),
+        ),
+    ),
+    # functionDeclaration: modifiers? 'fun' receiverType identifier '(' ')'
+    (
+        "functionDeclaration",
+        MEMO,
+        (
+            (
+                (
+                    (RULE, 6, OPTIONAL, True, None),
+                    (EXPECT, ("fun", None), PLAIN, False, None),
+                    (RULE, 16, PLAIN, True, None),
+                    (RULE, 2, PLAIN, True, None),
+                    (EXPECT, ("(", token.LPAR), PLAIN, False, None),
+                    (EXPECT, (")", token.RPAR), PLAIN, False, None),
+                ),
+                _action_1,
+                False,
+            ),
+        ),
+    ),
+    # identifier: simpleIdentifier identifier_i2_List
+    (
+        "identifier",
+        MEMO,
+        (
+            (
+                (
+                    (RULE, 5, PLAIN, True, None),
+                    (RULE, 3, PLAIN, True, None),
+                ),
+                _action_2,
+                False,
+            ),
+        ),
+    ),
+    # identifier_i2_List: identifier_i2*
+    (
+        "identifier_i2_List",
+        MEMO,
+        ((((RULE, 22, OPTIONAL, True, None),), _action_3, False),),
+    ),
+    # identifier_i2: '.' (&&(simpleIdentifier))
+    (
+        "identifier_i2",
+        MEMO,
+        (
+            (
+                (
+                    (EXPECT, (".", token.DOT), PLAIN, False, None),
+                    (RULE, 5, FORCED, True, "(simpleIdentifier)"),
+                ),
+                _action_4,
+                False,
+            ),
+        ),
+    ),
+    # simpleIdentifier: NAME
+    (
+        "simpleIdentifier",
+        MEMO,
+        ((((NAME, None, PLAIN, True, None),), _action_5, False),),
+    ),
+    # modifiers: DEDENT?
+    (
+        "modifiers",
+        MEMO,
+        (
+            (
+                ((EXPECT, ("DEDENT", token.DEDENT), OPTIONAL, False, None),),
+                _action_6,
+                False,
+            ),
+        ),
+    ),
+    # packageHeader: 'package' (&&(identifier)) &&(semi) COMMIT
+    (
+        "packageHeader",
+        MEMO,
+        (
+            (
+                (
+                    (EXPECT, ("package", None), PLAIN, False, None),
+                    (RULE, 2, FORCED, True, "(identifier)"),
+                    (RULE, 12, FORCED, False, "(semi)"),
+                    (COMMIT, None, PLAIN, False, None),
+                ),
+                _action_7,
+                False,
+            ),
+        ),
+    ),
+    # importList: importHeader*
+    ("importList", MEMO, ((((RULE, 23, OPTIONAL, True, None),), _action_8, False),)),
+    # importHeader: 'import' (&&(identifier)) importHeader_i2 &&(semi) COMMIT
+    (
+        "importHeader",
+        MEMO,
+        (
+            (
+                (
+                    (EXPECT, ("import", None), PLAIN, False, None),
+                    (RULE, 2, FORCED, True, "(identifier)"),
+                    (RULE, 10, PLAIN, True, None),
+                    (RULE, 12, FORCED, False, "(semi)"),
+                    (COMMIT, None, PLAIN, False, None),
+                ),
+                _action_9,
+                False,
+            ),
+        ),
+    ),
+    # importHeader_i2: importAlias | '.' '*' | DEDENT?
+    (
+        "importHeader_i2",
+        MEMO,
+        (
+            (((RULE, 11, PLAIN, True, None),), _action_10, False),
+            (
+                (
+                    (EXPECT, (".", token.DOT), PLAIN, False, None),
+                    (EXPECT, ("*", token.STAR), PLAIN, False, None),
+                ),
+                _action_11,
+                False,
+            ),
+            (
+                ((EXPECT, ("DEDENT", token.DEDENT), OPTIONAL, False, None),),
+                _action_12,
+                False,
+            ),
+        ),
+    ),
+    # importAlias: 'as' (&&(simpleIdentifier))
+    (
+        "importAlias",
+        MEMO,
+        (
+            (
+                (
+                    (EXPECT, ("as", None), PLAIN, False, None),
+                    (RULE, 5, FORCED, True, "(simpleIdentifier)"),
+                ),
+                _action_13,
+                False,
+            ),
+        ),
+    ),
+    # semi: NEWLINE | ';'
+    (
+        "semi",
+        MEMO,
+        (
+            (
+                ((EXPECT, ("NEWLINE", token.NEWLINE), PLAIN, True, None),),
+                _action_14,
+                False,
+            ),
+            (((EXPECT, (";", token.SEMI), PLAIN, True, None),), _action_15, False),
+        ),
+    ),
+    # topLevelObjectList: topLevelObject*
+    (
+        "topLevelObjectList",
+        MEMO,
+        ((((RULE, 24, OPTIONAL, True, None),), _action_16, False),),
+    ),
+    # topLevelObject: declaration &&(semi) COMMIT
+    (
+        "topLevelObject",
+        MEMO,
+        (
+            (
+                (
+                    (RULE, 15, PLAIN, True, None),
+                    (RULE, 12, FORCED, False, "(semi)"),
+                    (COMMIT, None, PLAIN, False, None),
+                ),
+                _action_17,
+                False,
+            ),
+        ),
+    ),
+    # declaration: functionDeclaration
+    ("declaration", MEMO, ((((RULE, 1, PLAIN, True, None),), _action_18, False),)),
+    # receiverType: parenthisedType | typeReference
+    (
+        "receiverType",
+        MEMO,
+        (
+            (((RULE, 17, PLAIN, True, None),), _action_19, False),
+            (((RULE, 18, PLAIN, True, None),), _action_20, False),
+        ),
+    ),
+    # parenthisedType: '(' type ')'
+    (
+        "parenthisedType",
+        MEMO,
+        (
+            (
+                (
+                    (EXPECT, ("(", token.LPAR), PLAIN, True, None),
+                    (RULE, 20, PLAIN, True, None),
+                    (EXPECT, (")", token.RPAR), PLAIN, True, None),
+                ),
+                _action_21,
+                False,
+            ),
+        ),
+    ),
+    # typeReference: userType
+    ("typeReference", MEMO, ((((RULE, 19, PLAIN, True, None),), _action_22, False),)),
+    # userType: simpleUserType
+    ("userType", MEMO, ((((RULE, 21, PLAIN, True, None),), _action_23, False),)),
+    # type: DEDENT
+    (
+        "type",
+        MEMO,
+        (
+            (
+                ((EXPECT, ("DEDENT", token.DEDENT), PLAIN, True, None),),
+                _action_24,
+                False,
+            ),
+        ),
+    ),
+    # simpleUserType: DEDENT
+    (
+        "simpleUserType",
+        MEMO,
+        (
+            (
+                ((EXPECT, ("DEDENT", token.DEDENT), PLAIN, True, None),),
+                _action_25,
+                False,
+            ),
+        ),
+    ),
+    # _loop0_1: identifier_i2
+    ("_loop0_1", MEMO | LOOP, ((((RULE, 4, PLAIN, True, None),), _action_26, False),)),
+    # _loop0_2: importHeader
+    ("_loop0_2", MEMO | LOOP, ((((RULE, 9, PLAIN, True, None),), _action_27, False),)),
+    # _loop0_3: topLevelObject
+    ("_loop0_3", MEMO | LOOP, ((((RULE, 14, PLAIN, True, None),), _action_28, False),)),
+)
+
+KEYWORDS = ("as", "fun", "import", "package")
+SOFT_KEYWORDS = ()
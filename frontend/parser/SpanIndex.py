@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+from bisect import bisect_left, bisect_right
+from frontend.lexer.SourceIndex import SourceIndex
+from frontend.parser.AST import Node, List
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'SpanIndex'
+]
+
+
+# MAIN CONTENT
+# ============>
+
+class SpanIndex:
+    """
+    An index over the spans of all nodes in the AST.
+
+    Attributes
+    ----------
+    sourceIndex: SourceIndex
+        The source index used to convert positions to offsets.
+    _starts: typing.List[int]
+        The start offsets of the nodes, in ascending order.
+    _ends: typing.List[int]
+        The end offsets of the nodes.
+    _nodes: typing.List[Node]
+        The nodes, in the same order as the offsets.
+    _parents: typing.List[int]
+        The index of the parent of each node, or -1 for the root.
+
+    Notes
+    -----
+    Nodes are stored in preorder with siblings sorted by their start offset, so the
+    starts are sorted and every node is preceded by all of its ancestors.
+    Spans are half-open, i.e. a node covers the offsets in [start, end).
+    Nodes without a position (i.e. Null and empty List) are not indexed.
+    """
+    sourceIndex: SourceIndex
+    _starts: typing.List[int]
+    _ends: typing.List[int]
+    _nodes: typing.List[Node]
+    _parents: typing.List[int]
+
+    def __init__(self, root: Node, sourceIndex: SourceIndex):
+        self.sourceIndex = sourceIndex
+        self._starts = []
+        self._ends = []
+        self._nodes = []
+        self._parents = []
+        # Spans, computed bottom-up
+        # ------------------------>
+        spans: typing.Dict[int, typing.Tuple[int, int]] = dict()
+        childrenOf: typing.Dict[int, typing.List[Node]] = dict()
+        stack: typing.List[typing.Tuple[Node, bool]] = [(root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                if isinstance(node, List):
+                    children = [child for child in node if isinstance(child, Node)]
+                else:
+                    children = [node.__getattribute__(child) for child in node.children]
+                    children = [child for child in children if isinstance(child, Node)]
+                childrenOf[id(node)] = children
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+            # Some nodes don't track their position (e.g. nested lists), and the position of a node
+            # may not cover all of its children, so we always extend it by the children spans
+            childSpans = [spans[id(child)] for child in childrenOf[id(node)] if id(child) in spans]
+            if node.row is not None and node.row >= 0 and node.end_row is not None and node.end_row >= 0:
+                childSpans.append((
+                    sourceIndex.positionToOffset(node.row, node.column),
+                    sourceIndex.positionToOffset(node.end_row, node.end_column),
+                ))
+            if childSpans:
+                spans[id(node)] = (min(x[0] for x in childSpans), max(x[1] for x in childSpans))
+
+        # Preorder, siblings sorted by start
+        # ---------------------------------->
+        order: typing.List[typing.Tuple[Node, int]] = [(root, -1)]
+        while order:
+            node, parent = order.pop()
+            span = spans.get(id(node), None)
+            if span is not None:
+                self._starts.append(span[0])
+                self._ends.append(span[1])
+                self._nodes.append(node)
+                self._parents.append(parent)
+                parent = len(self._nodes) - 1
+            children = [child for child in childrenOf[id(node)] if id(child) in spans]
+            children.sort(key=lambda x: spans[id(x)], reverse=True)
+            order.extend((child, parent) for child in children)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _containing(self, offset: int) -> int:
+        """
+        Finds the innermost node that contains the offset.
+
+        Parameters
+        ----------
+        offset: int
+            The character offset.
+
+        Returns
+        -------
+        int
+            The index of the node, or -1 if there is no such node.
+
+        Notes
+        -----
+        The last node that starts at or before the offset is either the innermost node that
+        contains the offset, or one of its descendants, so we only walk up the parents.
+        """
+        index = bisect_right(self._starts, offset) - 1
+        while index != -1 and self._ends[index] <= offset:
+            index = self._parents[index]
+        return index
+
+    def nodeAt(self, offset: int) -> typing.Optional[Node]:
+        """
+        Returns the innermost node at the offset.
+
+        Parameters
+        ----------
+        offset: int
+            The character offset (i.e. the cursor).
+
+        Returns
+        -------
+        typing.Optional[Node]
+            The node, or None if there is no node at the offset.
+        """
+        index = self._containing(offset)
+        return self._nodes[index] if index != -1 else None
+
+    def nodeAtPosition(self, row: int, column: int) -> typing.Optional[Node]:
+        """
+        Returns the innermost node at the position.
+
+        Parameters
+        ----------
+        row: int
+            The row.
+        column: int
+            The column.
+
+        Returns
+        -------
+        typing.Optional[Node]
+            The node, or None if there is no node at the position.
+        """
+        return self.nodeAt(self.sourceIndex.positionToOffset(row, column))
+
+    def nodesIntersecting(self, start: int, end: int) -> typing.List[Node]:
+        """
+        Returns all nodes that intersect the range.
+
+        Parameters
+        ----------
+        start: int
+            The start character offset.
+        end: int
+            The end character offset (exclusive).
+
+        Returns
+        -------
+        typing.List[Node]
+            The nodes, outermost first.
+
+        Notes
+        -----
+        The result consists of the ancestors of the offset `start`, and of the nodes that
+        start inside the range, which are a contiguous slice of the index.
+        """
+        ancestors = []
+        index = self._containing(start)
+        while index != -1:
+            if self._starts[index] < start:
+                ancestors.append(self._nodes[index])
+            index = self._parents[index]
+        ancestors.reverse()
+        first = bisect_left(self._starts, start)
+        last = bisect_left(self._starts, max(end, start + 1))
+        return ancestors + self._nodes[first:last]
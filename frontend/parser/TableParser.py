@@ -0,0 +1,327 @@
+"""
+Table-driven parser for the frontend.
+
+Notes
+-----
+This is an alternative backend to the generated recursive-descent `Parser`. The grammar is
+compiled by `scripts/grammar.py` into the opcode tables of `frontend/parser/ParserTables.py`,
+and they are run by a single interpreter loop with an explicit stack, so the depth of the
+input is not limited by the Python recursion limit and rules cost no Python calls.
+
+Both backends produce the same AST.
+
+Tables
+------
+RULES: typing.Tuple[Rule, ...]
+    Rule = (name, flags, alternatives)
+    Alternative = (instructions, action, locations)
+    Instruction = (opcode, argument, mode, bind, expectation)
+RULE_INDEX: typing.Dict[str, int]
+    The index of each rule in RULES.
+KEYWORDS, SOFT_KEYWORDS: typing.Tuple[str, ...]
+    The keywords of the grammar.
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import importlib
+import token
+from pegen.tokenizer import Tokenizer
+from frontend.parser.ParserBase import ParserBase
+import frontend.parser.AST as AST
+import frontend.parser.NodeBuilders as Nodes
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'TableParser',
+]
+
+# MAIN CONTENT
+# ============>
+
+# Opcodes
+# ------->
+RULE = 0  # Calls the rule at index `argument`
+EXPECT = 1  # Matches a token by its string or type, `argument` is (string, type)
+NAME = 2  # Matches a NAME token that is not a keyword
+TYPE = 3  # Matches a token by its type, `argument` is the type
+SOFT_KEYWORD = 4  # Matches a NAME token that is a soft keyword
+CUT = 5  # Commits to the current alternative
+COMMIT = 6  # Commits to the current position, see `ParserBase.commit`
+
+# Modes (bit flags, applied in this order)
+# ---------------------------------------->
+PLAIN = 0
+FORCED = 1  # Raises a syntax error if the item doesn't match
+POSITIVE = 2  # Positive lookahead, doesn't consume tokens
+NEGATIVE = 4  # Negative lookahead, doesn't consume tokens
+OPTIONAL = 8  # Always succeeds
+NOT_NONE = 16  # Succeeds if the result is not None (instead of truthy), used by gathers
+LOOKAHEAD = POSITIVE | NEGATIVE
+
+# Rule flags
+# ---------->
+MEMO = 1  # Memoized
+LOOP = 2  # Repeats its only alternative and returns the list of results
+GATHER = 4  # Gathers the items of a separated list
+LEFT_REC = 8  # Leader of a left-recursive cycle
+LOCATIONS = 16  # Some alternative uses the location of the rule
+MEMOIZED = MEMO | LEFT_REC
+
+_tables: typing.Any = None
+
+
+def loadTables() -> typing.Any:
+    """
+    Returns the generated tables module, importing it on first use.
+    """
+    global _tables
+    if _tables is None:
+        _tables = importlib.import_module('frontend.parser.ParserTables')
+    return _tables
+
+
+class TableParser(ParserBase):
+    """
+    Table-driven parser for the frontend.
+
+    Attributes
+    ----------
+    _rules: typing.Tuple[typing.Any, ...]
+        The compiled rules.
+    _ruleIndex: typing.Dict[str, int]
+        The index of each rule.
+
+    Notes
+    -----
+    The memo table is shared with pegen's `_cache`, keys are (mark, rule index).
+    """
+    _rules: typing.Tuple[typing.Any, ...]
+    _ruleIndex: typing.Dict[str, int]
+
+    def __init__(self, tokenizer: Tokenizer, *, verbose: bool = False):
+        super().__init__(tokenizer, verbose=verbose)
+        tables = loadTables()
+        self._rules = tables.RULES
+        self._ruleIndex = tables.RULE_INDEX
+        self.KEYWORDS = tables.KEYWORDS
+        self.SOFT_KEYWORDS = tables.SOFT_KEYWORDS
+
+    def start(self) -> typing.Optional[AST.File]:
+        return self.parseRule('start')
+
+    def parseRule(self, name: str) -> typing.Any:
+        """
+        Parses a rule at the current position.
+
+        Parameters
+        ----------
+        name: str
+            The name of the rule.
+
+        Returns
+        -------
+        typing.Any
+            The result of the rule, or None if it doesn't match.
+        """
+        return self._run(self._ruleIndex[name])
+
+    def _run(self, index: int) -> typing.Any:
+        """
+        Runs the interpreter loop, starting with the rule at `index`.
+
+        Notes
+        -----
+        The state of the running rule is kept in local variables, and it is pushed on the
+        stack as a tuple when the rule calls another rule. The position is read from
+        `tokenizer._index` directly, as it's what `tokenizer.mark()` returns.
+        """
+        tokenizer = self._tokenizer
+        peek = tokenizer.peek
+        getnext = tokenizer.getnext
+        reset = tokenizer.reset
+        cache = self._cache
+        rules = self._rules
+        keywords = self.KEYWORDS
+        soft_keywords = self.SOFT_KEYWORDS
+        ListType = Nodes.List
+        NAME_TYPE = token.NAME
+        stack: typing.List[typing.Tuple[typing.Any, ...]] = []
+
+        # Frame of the running rule
+        # ------------------------->
+        rule_index = index
+        flags, alts = rules[index][1], rules[index][2]
+        start = alt_mark = saved = lr_mark = tokenizer._index
+        alt_i = item_i = 0
+        instrs = alts[0][0]
+        count = len(instrs)
+        values: typing.List[typing.Any] = []
+        children: typing.Optional[typing.List[typing.Any]] = [] if flags & LOOP else None
+        cut = False
+        lr_result = None
+        start_pos = peek().start if flags & LOCATIONS else None
+        if flags & LEFT_REC:
+            cache[(start, rule_index)] = (None, start)
+            self._leftRecursion += 1
+
+        returned = False
+        result: typing.Any = None
+        while True:
+            done = False
+            if item_i < count:
+                op, arg, mode, bind, expectation = instrs[item_i]
+                if returned:
+                    returned = False
+                    value = result
+                else:
+                    if mode & LOOKAHEAD:
+                        saved = tokenizer._index
+                    if op == RULE:
+                        callee_flags = rules[arg][1]
+                        hit = cache.get((tokenizer._index, arg)) if callee_flags & MEMOIZED else None
+                        if hit is None:
+                            # Call the rule
+                            # ------------->
+                            stack.append((
+                                rule_index, flags, alts, start, alt_i, instrs, count, item_i, values, children,
+                                cut, alt_mark, saved, lr_result, lr_mark, start_pos,
+                            ))
+                            rule_index = arg
+                            flags, alts = callee_flags, rules[arg][2]
+                            start = alt_mark = lr_mark = tokenizer._index
+                            alt_i = item_i = 0
+                            instrs = alts[0][0]
+                            count = len(instrs)
+                            values = []
+                            children = [] if flags & LOOP else None
+                            cut = False
+                            lr_result = None
+                            start_pos = peek().start if flags & LOCATIONS else None
+                            if flags & LEFT_REC:
+                                cache[(start, rule_index)] = (None, start)
+                                self._leftRecursion += 1
+                            continue
+                        value = hit[0]
+                        if value or not callee_flags & LEFT_REC:
+                            reset(hit[1])
+                        if isinstance(value, list):
+                            value = ListType(value)
+                    elif op == EXPECT:
+                        tok = peek()
+                        value = getnext() if tok.string == arg[0] or tok.type == arg[1] else None
+                    elif op == NAME:
+                        tok = peek()
+                        value = getnext() if tok.type == NAME_TYPE and tok.string not in keywords else None
+                    elif op == TYPE:
+                        value = getnext() if peek().type == arg else None
+                    elif op == SOFT_KEYWORD:
+                        tok = peek()
+                        value = getnext() if tok.type == NAME_TYPE and tok.string in soft_keywords else None
+                    elif op == COMMIT:
+                        value = self.commit()
+                    else:
+                        cut = True
+                        value = True
+
+                # Modes
+                # ----->
+                ok = value
+                if mode:
+                    if mode & FORCED and value is None:
+                        raise self.make_syntax_error(f'expected {expectation}')
+                    if mode & POSITIVE:
+                        reset(saved)
+                    elif mode & NEGATIVE:
+                        reset(saved)
+                        ok = value = not value
+                    if mode & OPTIONAL:
+                        ok = True
+                    elif mode & NOT_NONE:
+                        ok = value is not None
+
+                if ok:
+                    if bind:
+                        values.append(value)
+                    item_i += 1
+                    continue
+
+                # The alternative failed
+                # ---------------------->
+                reset(alt_mark)
+                if flags & LOOP:
+                    result = children
+                    done = True
+                elif cut:
+                    result = None
+                    done = True
+                else:
+                    alt_i += 1
+                    if alt_i < len(alts):
+                        instrs = alts[alt_i][0]
+                        count = len(instrs)
+                        item_i = 0
+                        values = []
+                        continue
+                    result = None
+                    done = True
+            else:
+                # The alternative matched
+                # ----------------------->
+                _, action, locations = alts[alt_i]
+                if locations:
+                    end_pos = tokenizer.get_last_non_whitespace_token().end
+                    value = action(self, *values, *start_pos, *end_pos)
+                else:
+                    value = action(self, *values)
+                if flags & LOOP:
+                    children.append(value)
+                    alt_mark = tokenizer._index
+                    item_i = 0
+                    values = []
+                    continue
+                result = value
+                done = True
+
+            if not done:
+                continue
+
+            # The rule finished
+            # ----------------->
+            if flags & LEFT_REC:
+                end = tokenizer._index
+                if result and end > lr_mark:
+                    # Grow the seed and parse the rule again
+                    cache[(start, rule_index)] = (result, end)
+                    lr_result, lr_mark = result, end
+                    reset(start)
+                    alt_i = item_i = 0
+                    instrs = alts[0][0]
+                    count = len(instrs)
+                    values = []
+                    cut = False
+                    continue
+                reset(lr_mark)
+                result = lr_result
+                end = tokenizer._index if result else start
+                reset(end)
+                cache[(start, rule_index)] = (result, end)
+                self._leftRecursion -= 1
+            elif flags & MEMO:
+                cache[(start, rule_index)] = (result, tokenizer._index)
+            if isinstance(result, list):
+                result = ListType(result)
+            if not stack:
+                return result
+            (
+                rule_index, flags, alts, start, alt_i, instrs, count, item_i, values, children,
+                cut, alt_mark, saved, lr_result, lr_mark, start_pos,
+            ) = stack.pop()
+            returned = True
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import difflib
+from dataclasses import dataclass, field
+from frontend.parser.AST import Node, File
+from frontend.parser.NodeFactory import Position
+from frontend.parser.NodeVisitor import walk
+from frontend.parser.NodeStructure import structuralHash, structurallyEqual
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'TreeEdit',
+    'TreeDiff',
+    'nodeSpan',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+def nodeSpan(node: Node) -> typing.Optional[Position]:
+    """
+    Returns the span of a node, i.e. the union of the positions of the node and its descendants.
+
+    Returns
+    -------
+    typing.Optional[Position]
+        (row, column, end_row, end_column), or None if no node in the subtree has a position.
+
+    Notes
+    -----
+    Some nodes don't track their position (e.g. Null and empty List), so the position of
+    a node is not enough on its own.
+    """
+    start = end = None
+    for child in walk(node):
+        if child.row is None or child.row < 0 or child.end_row is None or child.end_row < 0:
+            continue
+        if start is None or (child.row, child.column) < start:
+            start = (child.row, child.column)
+        if end is None or (child.end_row, child.end_column) > end:
+            end = (child.end_row, child.end_column)
+    if start is None:
+        return None
+    return start + end
+
+
+@dataclass
+class TreeEdit:
+    """
+    A change between two trees.
+
+    Attributes
+    ----------
+    kind: str
+        One of `insert`, `delete` or `update`.
+    field: str
+        The field of the file that changed, i.e. `packageHeader`, `importList` or `declarations`.
+    index: int
+        The index in the list of the new tree (`insert` and `update`) or of the old tree
+        (`delete`), 0 for `packageHeader`.
+    old: typing.Optional[Node]
+        The node of the old tree, None for `insert`.
+    new: typing.Optional[Node]
+        The node of the new tree, None for `delete`.
+    oldSpan: typing.Optional[Position]
+        The span of the old node.
+    newSpan: typing.Optional[Position]
+        The span of the new node.
+    """
+    kind: str
+    field: str
+    index: int
+    old: typing.Optional[Node] = field(default=None, repr=False)
+    new: typing.Optional[Node] = field(default=None, repr=False)
+    oldSpan: typing.Optional[Position] = field(default=None)
+    newSpan: typing.Optional[Position] = field(default=None)
+
+    KINDS = ('insert', 'delete', 'update')
+
+
+class TreeDiff:
+    """
+    Computes the changes between two parses of the same file.
+
+    Notes
+    -----
+    The units of the diff are the package header, the import headers and the declarations.
+    Units are matched by their structural hashes (see `structuralHash`), and matches are
+    confirmed with `structurallyEqual`, so positions are ignored. Lists are compared by
+    trimming the common prefix and suffix first, and the rest is matched with
+    `difflib.SequenceMatcher`, so typical edits take linear time. The hashes are cached on
+    the nodes, so diffing a tree against the next version only hashes the new tree.
+    """
+
+    def diff(self, old: File, new: File) -> typing.List[TreeEdit]:
+        """
+        Returns the edits that turn the old tree into the new tree.
+
+        Parameters
+        ----------
+        old: File
+            The old tree.
+        new: File
+            The new tree.
+
+        Returns
+        -------
+        typing.List[TreeEdit]
+            The edits, ordered by field and index.
+        """
+        edits: typing.List[TreeEdit] = []
+        if not structurallyEqual(old.packageHeader, new.packageHeader):
+            edits.append(self._edit('update', 'packageHeader', 0, old.packageHeader, new.packageHeader))
+        for name in ('importList', 'declarations'):
+            self._diffList(name, list(old.__getattribute__(name)), list(new.__getattribute__(name)), edits)
+        return edits
+
+    def _diffList(self, name: str, old: typing.List[Node], new: typing.List[Node], edits: typing.List[TreeEdit]):
+        oldKeys = [structuralHash(node) for node in old]
+        newKeys = [structuralHash(node) for node in new]
+
+        def same(i: int, j: int) -> bool:
+            return oldKeys[i] == newKeys[j] and structurallyEqual(old[i], new[j])
+
+        # Common prefix and suffix
+        # ------------------------>
+        start = 0
+        while start < len(old) and start < len(new) and same(start, start):
+            start += 1
+        oldEnd, newEnd = len(old), len(new)
+        while oldEnd > start and newEnd > start and same(oldEnd - 1, newEnd - 1):
+            oldEnd -= 1
+            newEnd -= 1
+
+        matcher = difflib.SequenceMatcher(None, oldKeys[start:oldEnd], newKeys[start:newEnd], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            i1, i2, j1, j2 = i1 + start, i2 + start, j1 + start, j2 + start
+            if tag == 'equal':
+                # Units with colliding hashes are updated
+                for k in range(i2 - i1):
+                    if not structurallyEqual(old[i1 + k], new[j1 + k]):
+                        edits.append(self._edit('update', name, j1 + k, old[i1 + k], new[j1 + k]))
+                continue
+            # Replaced units are updated pairwise, the rest is deleted or inserted
+            common = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+            for k in range(common):
+                edits.append(self._edit('update', name, j1 + k, old[i1 + k], new[j1 + k]))
+            for i in range(i1 + common, i2):
+                edits.append(self._edit('delete', name, i, old[i], None))
+            for j in range(j1 + common, j2):
+                edits.append(self._edit('insert', name, j, None, new[j]))
+
+    @staticmethod
+    def _edit(kind: str, name: str, index: int, old: typing.Optional[Node], new: typing.Optional[Node]) -> TreeEdit:
+        return TreeEdit(
+            kind=kind,
+            field=name,
+            index=index,
+            old=old,
+            new=new,
+            oldSpan=None if old is None else nodeSpan(old),
+            newSpan=None if new is None else nodeSpan(new),
+        )
@@ -1,6 +1,134 @@
 """
 This package contains the parser for the frontend of the compiler.
+
+Notes
+-----
+The exports are imported lazily on first access, so importing this package doesn't build
+the AST classes, and pegen is not imported until `frontend.parser.Parser` is.
 """
 
-from .AST import *
-from .NodeMeta import *
+# noinspection PyUnresolvedReferences
+import typing
+from util.lazyimport import lazyExports
+
+if typing.TYPE_CHECKING:
+    from .AST import *
+    from .NodeMeta import *
+    from .NodeVisitor import *
+    from .NodeStructure import *
+    from .NodeFactory import *
+    from .TreeDiff import *
+    from .SpanIndex import *
+    from .ParseCache import *
+    from .ParallelParse import *
+
+__all__ = [
+    # AST
+    'Node',
+    'File',
+    'TokenWrapper',
+    'Identifier',
+    'ImportAlias',
+    'Null',
+    'ImportHeader',
+    'PackageHeader',
+    'Declaration',
+    'FunctionDeclaration',
+    'List',
+    # NodeMeta
+    'NodeMeta',
+    'MetaEffect',
+    'MetaEffectWrapper',
+    'meta_effect',
+    # NodeVisitor
+    'NodeVisitor',
+    'NodeTransformer',
+    'childNodes',
+    'walk',
+    'findAll',
+    'mapNodes',
+    'replaceChildren',
+    'freeze',
+    'isFrozen',
+    'thawedClass',
+    # NodeStructure
+    'structuralHash',
+    'structurallyEqual',
+    'clearStructuralHash',
+    'leafFields',
+    'leafKey',
+    # NodeFactory
+    'NodeFactory',
+    'Position',
+    # TreeDiff
+    'TreeEdit',
+    'TreeDiff',
+    'nodeSpan',
+    # SpanIndex
+    'SpanIndex',
+    # ParseCache
+    'ParseCache',
+    'CacheStats',
+    'defaultCache',
+    'parseCached',
+    'sourceHash',
+    'estimateSize',
+    # ParallelParse
+    'Chunk',
+    'splitSource',
+    'parseParallel',
+]
+
+lazyExports(__name__, {
+    **dict.fromkeys([
+        'Node',
+        'File',
+        'TokenWrapper',
+        'Identifier',
+        'ImportAlias',
+        'Null',
+        'ImportHeader',
+        'PackageHeader',
+        'Declaration',
+        'FunctionDeclaration',
+        'List',
+    ], '.AST'),
+    **dict.fromkeys([
+        'NodeMeta',
+        'MetaEffect',
+        'MetaEffectWrapper',
+        'meta_effect',
+    ], '.NodeMeta'),
+    **dict.fromkeys([
+        'NodeVisitor',
+        'NodeTransformer',
+        'childNodes',
+        'walk',
+        'findAll',
+        'mapNodes',
+        'replaceChildren',
+        'freeze',
+        'isFrozen',
+        'thawedClass',
+    ], '.NodeVisitor'),
+    **dict.fromkeys([
+        'structuralHash',
+        'structurallyEqual',
+        'clearStructuralHash',
+        'leafFields',
+        'leafKey',
+    ], '.NodeStructure'),
+    'NodeFactory': '.NodeFactory',
+    'Position': '.NodeFactory',
+    **dict.fromkeys(['TreeEdit', 'TreeDiff', 'nodeSpan'], '.TreeDiff'),
+    'SpanIndex': '.SpanIndex',
+    **dict.fromkeys([
+        'ParseCache',
+        'CacheStats',
+        'defaultCache',
+        'parseCached',
+        'sourceHash',
+        'estimateSize',
+    ], '.ParseCache'),
+    **dict.fromkeys(['Chunk', 'splitSource', 'parseParallel'], '.ParallelParse'),
+})
@@ -25,13 +25,32 @@ T = typing.TypeVar("T")
 def memoize(method: F) -> F:
     """
     A wrapper for memoize from pegen.parser that overrides list type
+
+    Notes
+    -----
+    The cache is the same as pegen's (same keys and values), but the fast path reads the
+    position of the tokenizer directly and skips the bookkeeping of verbose mode, which
+    is delegated to pegen's wrapper.
+
+    `memoize.List` is called with the list only, i.e. it's the builder of List nodes.
     """
-    method = pegen.memoize(method)
+    method_name = method.__name__
+    verbose_method = pegen.memoize(method)
 
-    def wrapper(self: pegen.Parser, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-        result = method(self, *args, **kwargs)
+    def wrapper(self: pegen.Parser, *args: typing.Any) -> typing.Any:
+        if self._verbose:
+            result = verbose_method(self, *args)
+        else:
+            key = self._tokenizer._index, method_name, args
+            cache = self._cache
+            if key in cache:
+                result, endmark = cache[key]
+                self._reset(endmark)
+            else:
+                result = method(self, *args)
+                cache[key] = result, self._tokenizer._index
         if isinstance(result, list):
-            return memoize.List(elements=result)  # type: ignore
+            return memoize.List(result)  # type: ignore
         return result
 
     return typing.cast(F, wrapper)
@@ -40,13 +59,21 @@ def memoize(method: F) -> F:
 def memoize_left_rec(method: typing.Callable[[P], typing.Optional[T]]) -> typing.Callable[[P], typing.Optional[T]]:
     """
     A wrapper for memoize_left_rec from pegen.parser that overrides list type
+
+    Notes
+    -----
+    Commits are ignored while the rule runs (see `ParserBase.commit`), its seed is in the cache.
     """
     method = pegen.memoize_left_rec(method)
 
     def wrapper(self: pegen.Parser, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-        result = method(self, *args, **kwargs)  # type: ignore
+        self._leftRecursion += 1
+        try:
+            result = method(self, *args, **kwargs)  # type: ignore
+        finally:
+            self._leftRecursion -= 1
         if isinstance(result, list):
-            return memoize.List(elements=result)  # type: ignore
+            return memoize.List(result)  # type: ignore
         return result
 
     return typing.cast(F, wrapper)
@@ -6,8 +6,10 @@ if __name__ == '__main__':
         source = f.read()
     # LEXER TEST
     # ==========>
+    # from frontend.lexer import TokenInfo
+    # from util.formatter import TableWriter
     # lexer = Lexer().load(source)
-    # print(*map(lambda x: x.toFormatString(), lexer.wrapper()), sep='\n')
+    # TableWriter(TokenInfo.tableColumns()).write(token.tableRow() for token in lexer.wrapper())
 
     # PARSER TEST
     # ===========>
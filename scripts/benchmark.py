@@ -0,0 +1,230 @@
+"""
+Throughput benchmark of the lexer and the parser, with a regression gate.
+
+Every scenario runs on the same generated source: it is warmed up first, then timed many
+times (each sample repeats the scenario enough times to last `--min-time`). The median
+time per run is reported with its 95% confidence interval, computed from the order
+statistics of the samples, so no assumption is made about the distribution of the times.
+
+With `--compare`, the results are compared against a baseline saved by `--save`, and the
+exit code is 1 when a scenario is slower than the baseline by more than `--threshold`
+and the confidence intervals don't overlap (i.e. noise alone doesn't fail the gate).
+Baselines are only meaningful on the machine (and Python version) that saved them.
+
+Scenarios
+---------
+lexer.wrapper
+    `list(Lexer.wrapper())`, the raw TokenInfo stream.
+lexer.tokenize
+    `Lexer.tokenize()`, the filtered token list the parser reads.
+parser.start
+    `Parser.start()` on already tokenized source.
+node.toFormatString
+    `Node.toFormatString()` of the AST of a smaller source, it is much slower per node.
+
+Usage
+-----
+python scripts/benchmark.py [--save [FILE]] [--compare [FILE]] [--threshold RATIO] [scenario ...]
+"""
+
+import argparse
+import gc
+import json
+import math
+import pathlib
+import platform
+import statistics
+import sys
+import time
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from frontend.lexer import Lexer  # noqa: E402
+from frontend.lexer.KiwiTokenizer import KiwiTokenizer  # noqa: E402
+from frontend.parser.Parser import Parser  # noqa: E402
+
+baseline_file = 'build/benchmark.json'
+
+# Number of import headers of the source of each scenario
+SIZES = {
+    'lexer.wrapper': 2000,
+    'lexer.tokenize': 2000,
+    'parser.start': 2000,
+    'node.toFormatString': 10,
+}
+
+
+def generateSource(imports: int) -> str:
+    """
+    Returns a deterministic source with the given number of import headers.
+    """
+    lines = ['package kiwi.benchmark.sample']
+    for index in range(imports):
+        path = '.'.join(f'm{(index * prime) % 97}' for prime in (3, 5, 7)[:1 + index % 3])
+        if index % 3 == 0:
+            lines.append(f'import {path} as alias{index}')
+        else:
+            lines.append(f'import {path}')
+    return '\n'.join(lines) + '\n'
+
+
+def scenarios() -> dict:
+    """
+    Returns the scenarios, i.e. functions without arguments that run one iteration.
+    """
+    def lexerWrapper(source: str):
+        return lambda: list(Lexer().load(source).wrapper())
+
+    def lexerTokenize(source: str):
+        return lambda: Lexer().load(source).tokenize()
+
+    def parserStart(source: str):
+        tokenizer = Lexer().load(source).tokenize()
+        if tokenizer._error is not None or Parser(KiwiTokenizer(list(tokenizer._array), source)).start() is None:
+            raise RuntimeError('the benchmark source is not valid')
+        # A new tokenizer over a copy of the tokens (the parser releases them), so only
+        # the parser is measured
+        return lambda: Parser(KiwiTokenizer(list(tokenizer._array), source)).start()
+
+    def nodeToFormatString(source: str):
+        tree = Parser(Lexer().load(source).tokenize()).start()
+        return lambda: tree.toFormatString()
+
+    factories = {
+        'lexer.wrapper': lexerWrapper,
+        'lexer.tokenize': lexerTokenize,
+        'parser.start': parserStart,
+        'node.toFormatString': nodeToFormatString,
+    }
+    return {name: (lambda name=name: factories[name](generateSource(SIZES[name]))) for name in factories}
+
+
+def measure(function, warmup: int, repeat: int, min_time: float) -> list:
+    """
+    Returns the time per iteration of each sample, in seconds.
+
+    Notes
+    -----
+    The number of iterations per sample is calibrated during the warmup, and the garbage
+    collector is disabled while a sample runs, as `timeit` does.
+    """
+    iterations = 1
+    for _ in range(max(warmup, 1)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed < min_time:
+            iterations = max(iterations + 1, math.ceil(iterations * min_time / max(elapsed, 1e-9)))
+    samples = []
+    enabled = gc.isenabled()
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                function()
+            samples.append((time.perf_counter() - start) / iterations)
+            if enabled:
+                gc.enable()
+    finally:
+        if enabled:
+            gc.enable()
+    return samples
+
+
+def medianInterval(samples: list, z: float = 1.96) -> tuple:
+    """
+    Returns the median of the samples and its confidence interval (95% by default).
+
+    Notes
+    -----
+    The bounds are the order statistics at ranks n/2 -+ z*sqrt(n)/2 (the normal
+    approximation of the binomial distribution of the rank of the median).
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    spread = z * math.sqrt(n) / 2
+    low = max(math.floor(n / 2 - spread), 0)
+    high = min(math.ceil(n / 2 + spread), n - 1)
+    return statistics.median(ordered), ordered[low], ordered[high]
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns the names of the scenarios that regressed against the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        ratio = result['median'] / old['median']
+        if ratio > 1 + threshold and result['low'] > old['high']:
+            regressions.append(name)
+    return regressions
+
+
+def formatTime(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f}{unit}'
+    return f'{seconds / 1e-9:.0f}ns'
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Benchmark the lexer and the parser')
+    argparser.add_argument('--warmup', type=int, default=3, help='warmup iterations per scenario')
+    argparser.add_argument('--repeat', type=int, default=30, help='samples per scenario')
+    argparser.add_argument('--min-time', type=float, default=0.02, help='minimum duration of a sample, in seconds')
+    argparser.add_argument('--save', nargs='?', const=baseline_file, help=f'save the results (default: {baseline_file})')
+    argparser.add_argument('--compare', nargs='?', const=baseline_file, help='compare against a saved baseline')
+    argparser.add_argument('--threshold', type=float, default=0.05, help='tolerated slowdown ratio (default: 0.05)')
+    argparser.add_argument('scenarios', nargs='*', help='scenarios to run (default: all)')
+    args = argparser.parse_args()
+
+    available = scenarios()
+    unknown = set(args.scenarios) - set(available)
+    if unknown:
+        argparser.error(f'unknown scenarios: {", ".join(sorted(unknown))} (available: {", ".join(available)})')
+    baseline = None
+    if args.compare:
+        baseline = json.loads((root / args.compare).read_text())
+        if baseline.get('environment') != environment():
+            print(f'warning: the baseline was saved in another environment ({baseline.get("environment")})',
+                  file=sys.stderr)
+
+    results = dict()
+    print(f'{"scenario":<22} {"median":>10} {"95% CI":>22}' + (f' {"baseline":>10} {"change":>8}' if baseline else ''))
+    for name in args.scenarios or available:
+        function = available[name]()
+        median, low, high = medianInterval(measure(function, args.warmup, args.repeat, args.min_time))
+        results[name] = {'median': median, 'low': low, 'high': high, 'samples': args.repeat}
+        line = f'{name:<22} {formatTime(median):>10} {f"[{formatTime(low)}, {formatTime(high)}]":>22}'
+        if baseline and name in baseline['scenarios']:
+            old = baseline['scenarios'][name]['median']
+            line += f' {formatTime(old):>10} {(median / old - 1) * 100:>+7.1f}%'
+        print(line)
+
+    if args.save:
+        path = root / args.save
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'environment': environment(), 'scenarios': results}, indent=4) + '\n')
+        print(f'saved to {args.save}')
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'regressions over {args.threshold:.0%}: {", ".join(regressions)}', file=sys.stderr)
+            sys.exit(1)
+        print('no regression')
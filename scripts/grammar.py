@@ -1,12 +1,62 @@
-import subprocess
-import sys
+"""
+Grammar build script.
+
+Glues every `grammar/*.gram` file together, runs the replacements on it and generates
+`frontend/parser/Parser.py` with pegen, and the opcode tables of the table-driven parser
+(`frontend/parser/ParserTables.py`).
+
+It also generates positional-only builders of the AST nodes from their classes
+(`frontend/parser/NodeBuilders.py`), and the actions of both parsers call them instead
+of the keyword-only dataclass constructors, e.g. `AST.PackageHeader(identifier=i1)`
+becomes `Nodes.PackageHeader(i1)`.
+
+Besides pegen's syntax, an alternative can contain the `COMMIT` marker: it matches
+nothing, and tells the parser that it never goes back before the current position, so
+the memo entries and the tokens before it can be dropped (see `ParserBase.commit`).
+
+The build is incremental: the hashes of the grammar files, of the node classes and of the generator are
+stored in `build/grammar.lock`, and the outputs are only regenerated when one of them (or
+one of the outputs itself) changed.
+
+The `analyze` command reads the combined grammar and reports performance hazards (i.e.
+designs that make the packrat parser backtrack a lot, loop forever or fail unexpectedly),
+each with an estimate of its cost.
+
+Usage
+-----
+python scripts/grammar.py [build] [--force]
+python scripts/grammar.py analyze [--strict]
+"""
+
+import argparse
+import ast
+import dataclasses
+import hashlib
+import importlib.metadata
+import io
+import json
 import pathlib
 import re
+import sys
+import token
+import tokenize
+
+from pegen.grammar import (
+    Alt, Cut, Forced, Gather, Group, Lookahead, NamedItem, NameLeaf, Opt, Repeat, Repeat0, Repeat1, Rhs, StringLeaf
+)
+from pegen.grammar_parser import GeneratedParser as GrammarParser
+from pegen.parser_generator import compute_left_recursives, compute_nullables
+from pegen.python_generator import PythonCallMakerVisitor, PythonParserGenerator
+from pegen.tokenizer import Tokenizer
 
 output_file = 'frontend/parser/Parser.py'
+tables_file = 'frontend/parser/ParserTables.py'
+builders_file = 'frontend/parser/NodeBuilders.py'
+# The node classes, the builders are generated from them
+ast_files = ['frontend/parser/AST.py', 'frontend/parser/NodeMeta.py']
 source_dir = 'grammar'
 build_dir = 'build'
-root = r'C:\Users\Days_\PycharmProjects\KiwiPreview'
+root = pathlib.Path(__file__).resolve().parent.parent
 
 # REPLACEMENTS
 # ------------>
@@ -16,39 +66,1015 @@ REPLACEMENTS = {
 }
 
 
+# The commit marker of the grammar, see `ParserBase.commit`
+COMMIT = 'COMMIT'
+
+
 def replacement(match):
     return REPLACEMENTS[match.group(1)] if match.group(1) in REPLACEMENTS else match.group(1)
 
 
-build_path = pathlib.Path(root) / build_dir
-source_path = pathlib.Path(root) / source_dir
-output_path = pathlib.Path(root) / output_file
+build_path = root / build_dir
+source_path = root / source_dir
+output_path = root / output_file
+tables_path = root / tables_file
+builders_path = root / builders_file
+lock_path = build_path / 'grammar.lock'
 
-if __name__ == '__main__':
+
+def sha256(data: str | bytes) -> str:
+    return hashlib.sha256(data.encode('utf-8') if isinstance(data, str) else data).hexdigest()
+
+
+def grammarFiles() -> list:
+    """
+    Returns the grammar files, `main.gram` first and the rest in alphabetical order.
+    """
+    files = sorted(source_path.glob('*.gram'))
+    return sorted(files, key=lambda file: file.stem != 'main')
+
+
+def combineGrammar(files: list) -> str:
+    """
+    Glues the grammar files together and runs the replacements on the result.
+    """
+    grammar = str()
+    for file in files:
+        grammar += file.read_text() + '\n'
+    grammar = re.sub(r'\b([A-Z]+)\b', replacement, grammar, flags=re.DOTALL)
+    grammar = re.sub(r'^\s*(->\s*)+', str(), grammar, flags=re.MULTILINE)
+    return grammar
+
+
+def generatorVersion() -> str:
+    """
+    Returns a fingerprint of everything that generates the parser besides the grammar.
+    """
+    return sha256('\n'.join([
+        importlib.metadata.version('pegen'),
+        importlib.metadata.version('black'),
+        sha256(pathlib.Path(__file__).read_bytes()),
+    ]))
+
+
+def readLock() -> dict:
+    try:
+        return json.loads(lock_path.read_text())
+    except (OSError, ValueError):
+        return dict()
+
+
+def parseGrammar(grammar: str):
+    """
+    Parses the combined grammar with the pegen metagrammar.
+    """
+    tokenizer = Tokenizer(tokenize.generate_tokens(io.StringIO(grammar).readline))
+    parser = GrammarParser(tokenizer)
+    rules = parser.start()
+    if not rules:
+        raise parser.make_syntax_error('invalid grammar', str(build_path / 'grammar'))
+    return rules
+
+
+class CallMaker(PythonCallMakerVisitor):
+    """
+    pegen's call maker, with the commit marker.
+    """
+
+    def visit_NameLeaf(self, node: NameLeaf) -> tuple:
+        if node.value == COMMIT:
+            # Not bound to a variable, so it's not a parameter of the default action
+            return None, 'self.commit()'
+        return super().visit_NameLeaf(node)
+
+
+class ParserGenerator(PythonParserGenerator):
+    """
+    pegen's generator of Python parsers, with the commit marker.
+    """
+
+    def __init__(self, grammar, file):
+        super().__init__(grammar, file, tokens=set(token.tok_name.values()) | {COMMIT})
+        self.callmakervisitor = CallMaker(self)
+
+
+def generateParser(grammar: str) -> str:
+    """
+    Generates the parser in-process, in its final form.
+    """
+    import black
+
+    rules = useBuilders(parseGrammar(grammar))
+    # No `if __name__ == '__main__'` block in the generated parser
+    rules.metas['trailer'] = ''
+    buffer = io.StringIO()
+    ParserGenerator(rules, buffer).generate(str(pathlib.PurePosixPath(build_dir) / 'grammar'))
+    return black.format_str(buffer.getvalue(), mode=black.Mode())
+
+
+# TABLES
+# ------>
+
+# Token methods of the pegen parser that match a single token type
+TOKEN_METHODS = {
+    'number': 'NUMBER',
+    'string': 'STRING',
+    'op': 'OP',
+    'type_comment': 'TYPE_COMMENT',
+    'fstring_start': 'FSTRING_START',
+    'fstring_middle': 'FSTRING_MIDDLE',
+    'fstring_end': 'FSTRING_END',
+}
+
+TABLES_HEADER = '''\\
+"""
+Opcode tables of `frontend.parser.TableParser`.
+
+@generated by scripts/grammar.py from {filename}, do not edit.
+"""
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+from typing import Optional, Any
+import token
+import frontend.parser.AST as AST
+import frontend.parser.NodeBuilders as Nodes
+from frontend.parser.TableParser import (
+    RULE, EXPECT, NAME, TYPE, SOFT_KEYWORD, CUT, COMMIT,
+    PLAIN, FORCED, POSITIVE, NEGATIVE, OPTIONAL, NOT_NONE,
+    MEMO, LOOP, GATHER, LEFT_REC, LOCATIONS,
+)
+
+# MAIN CONTENT
+# ============>
+'''
+
+
+def tokenType(value: str) -> str:
+    """
+    Returns the token type that `Parser.expect(value)` accepts besides the token string.
+    """
+    if value in token.EXACT_TOKEN_TYPES:
+        return f'token.{token.tok_name[token.EXACT_TOKEN_TYPES[value]]}'
+    if isinstance(token.__dict__.get(value, None), int):
+        return f'token.{value}'
+    return 'None'
+
+
+class TableGenerator(ParserGenerator):
+    """
+    Compiles the grammar into the opcode tables of `frontend.parser.TableParser`.
+
+    Notes
+    -----
+    The rules are expanded by pegen (i.e. loops, gathers and groups become artificial rules,
+    and items are named the same way), and every item is compiled from the call that pegen
+    generates for it, so both backends share the same semantics.
+    """
+
+    def __init__(self, grammar, file):
+        super().__init__(grammar, file)
+        self.compiled = dict()
+        self.actions = list()
+
+    def generate(self, filename: str):
+        while self.todo:
+            for name, rule in list(self.todo.items()):
+                del self.todo[name]
+                self.visit(rule)
+        index = {name: i for i, name in enumerate(self.compiled)}
+
+        self.print(TABLES_HEADER.format(filename=filename))
+        self.print('# Actions')
+        self.print('# ------->')
+        for action in self.actions:
+            self.print()
+            self.print(action)
+        self.print()
+        self.print('# Rules')
+        self.print('# ----->')
+        self.print()
+        self.print(f'RULE_INDEX = {index!r}')
+        self.print()
+        self.print('RULES = (')
+        with self.indent():
+            for name, (flags, alts, rhs) in self.compiled.items():
+                self.print(f'# {name}: {rhs}')
+                self.print(f'({name!r}, {flags}, (')
+                with self.indent():
+                    for items, action, locations in alts:
+                        self.print('((')
+                        with self.indent():
+                            for op, arg, mode, bind, expectation in items:
+                                if op == 'RULE':
+                                    arg = index[arg]
+                                self.print(f'({op}, {arg}, {mode}, {bind}, {expectation!r}),')
+                        self.print(f'), {action}, {locations}),')
+                self.print(')),')
+        self.print(')')
+        self.print()
+        self.print(f'KEYWORDS = {tuple(sorted(self.callmakervisitor.keywords))}')
+        self.print(f'SOFT_KEYWORDS = {tuple(sorted(self.callmakervisitor.soft_keywords))}')
+
+    def visit_Rule(self, node):
+        if node.name.endswith('without_invalid'):
+            raise ValueError(f'{node.name}: invalid rules are not supported by the table parser')
+        is_loop = node.is_loop()
+        is_gather = node.is_gather()
+        flags = []
+        if node.left_recursive:
+            # Non-leader rules in a cycle are not memoized
+            if node.leader:
+                flags.append('LEFT_REC')
+        else:
+            flags.append('MEMO')
+        if is_loop:
+            flags.append('LOOP')
+        if is_gather:
+            flags.append('GATHER')
+        if self.alts_uses_locations(node.rhs.alts):
+            flags.append('LOCATIONS')
+        rhs = node.flatten()
+        alts = [self.compileAlt(node.name, alt, is_gather) for alt in rhs.alts]
+        self.compiled[node.name] = (' | '.join(flags) or 'PLAIN', alts, rhs)
+
+    def compileAlt(self, rule: str, node: Alt, is_gather: bool) -> tuple:
+        """
+        Compiles an alternative into its instructions and the name of its action function.
+        """
+        if self.invalidvisitor.visit(node):
+            raise ValueError(f'{rule}: invalid rules are not supported by the table parser')
+        action = node.action
+        locations = False
+        used = None
+        if action:
+            if 'LOCATIONS' in action:
+                locations = True
+                action = action.replace('LOCATIONS', self.location_formatting)
+            used = self.usednamesvisitor.visit(ast.parse(action))
+        with self.local_variable_context():
+            items = [self.compileItem(item, used, is_gather) for item in node.items]
+            params = list(self.local_variable_names)
+        if not action:
+            if is_gather:
+                action = f'[{params[0]}] + {params[1]}'
+            elif len(params) == 1:
+                action = params[0]
+            else:
+                action = f'[{", ".join(params)}]'
+        if locations:
+            params += ['start_lineno', 'start_col_offset', 'end_lineno', 'end_col_offset']
+        name = f'_action_{len(self.actions)}'
+        self.actions.append(f'def {name}({", ".join(["self"] + params)}):\n    # {rule}: {node}\n    return {action}')
+        return items, name, locations
+
+    def compileItem(self, node: NamedItem, used: set | None, is_gather: bool) -> tuple:
+        """
+        Compiles an item into an instruction, i.e. (opcode, argument, mode, bind, expectation).
+        """
+        name, call = self.callmakervisitor.visit(node.item)
+        if node.name:
+            name = node.name
+        if used is not None and name not in used:
+            name = None
+        bind = bool(name) and name != 'cut'
+        if bind:
+            self.dedupe(name)
+
+        modes = ['NOT_NONE'] if is_gather else []
+        expectation = None
+        expr = ast.parse(f'({call})', mode='eval').body
+        if isinstance(expr, ast.Tuple):
+            modes.append('OPTIONAL')
+            expr = expr.elts[0]
+        if isinstance(expr, ast.Constant):
+            return 'CUT', None, ' | '.join(modes) or 'PLAIN', bind, None
+        method, args = expr.func.attr, expr.args
+        if method in ('positive_lookahead', 'negative_lookahead'):
+            modes.append('POSITIVE' if method == 'positive_lookahead' else 'NEGATIVE')
+            method, args = args[0].attr, args[1:]
+        if method == 'expect_forced':
+            modes.append('FORCED')
+            expectation = args[1].value
+            method, args = args[0].func.attr, args[0].args
+        mode = ' | '.join(modes) or 'PLAIN'
+
+        if method == 'expect':
+            value = args[0].value
+            return 'EXPECT', f'({value!r}, {tokenType(value)})', mode, bind, expectation
+        if method == 'name':
+            return 'NAME', None, mode, bind, expectation
+        if method == 'soft_keyword':
+            return 'SOFT_KEYWORD', None, mode, bind, expectation
+        if method == 'commit':
+            return 'COMMIT', None, mode, bind, expectation
+        if method in TOKEN_METHODS:
+            return 'TYPE', f'getattr(token, {TOKEN_METHODS[method]!r}, -1)', mode, bind, expectation
+        return 'RULE', method, mode, bind, expectation
+
+
+def generateTables(grammar: str) -> str:
+    """
+    Generates the opcode tables of the table-driven parser, in their final form.
+    """
+    import black
+
+    buffer = io.StringIO()
+    TableGenerator(useBuilders(parseGrammar(grammar)), buffer).generate(str(pathlib.PurePosixPath(build_dir) / 'grammar'))
+    return black.format_str(buffer.getvalue(), mode=black.Mode())
+
+
+# BUILDERS
+# -------->
+
+BUILDERS_HEADER = '''\\
+"""
+Positional-only builders of the AST nodes, called by the actions of the generated parsers.
+
+@generated by scripts/grammar.py from {filenames}, do not edit.
+
+Notes
+-----
+A builder creates the same node as its class (same attributes, same position), but the
+attribute dictionary is built at once instead of going through the keyword-only dataclass
+`__init__`, and the position is copied from the first and last children inline instead
+of being looked up by `__post_init__` (which is still called when one of them has no
+position, see `hasPosition`).
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import frontend.parser.AST as AST
+from frontend.parser.NodeMeta import hasPosition as _hasPosition
+
+# EXPORTS
+# =======>
+
+__all__ = {exports!r}
+
+# MAIN CONTENT
+# ============>
+
+_Node = AST.Node
+_MISSING = object()
+'''
+
+POSITION_FIELDS = ('row', 'column', 'end_row', 'end_column')
+
+
+def positioned(name: str) -> str:
+    """
+    Returns the inline expression of `hasPosition` for a variable that holds a node.
+    """
+    return f'{name}.row is not None and {name}.row >= 0 and {name}.end_row is not None and {name}.end_row >= 0'
+
+
+# The `__post_init__` of the most common nodes, inlined in their builders: the statements
+# that run before the attributes are set, and the attributes it sets. They must do the
+# same as the `__post_init__` of the class.
+INLINE_POST_INIT = {
+    'TokenWrapper': (
+        [
+            'row, column = token.start',
+            'end_row, end_column = token.end',
+        ],
+        {
+            'value': 'value or token.string',
+            'type': 'type or token.type',
+            'row': 'row',
+            'column': 'column',
+            'end_row': 'end_row',
+            'end_column': 'end_column',
+        },
+    ),
+    'List': (
+        [
+            'node.extend(elements)',
+            'if len(node):',
+            '    first, last = node[0], node[-1]',
+            f'    if not ({positioned("first")} and {positioned("last")}):',
+            '        first = next((element for element in node if _hasPosition(element)), first)',
+            '        last = next((element for element in reversed(node) if _hasPosition(element)), last)',
+            '    row, column, end_row, end_column = first.row, first.column, last.end_row, last.end_column',
+            'else:',
+            '    row = column = end_row = end_column = -1',
+        ],
+        {
+            'row': 'row',
+            'column': 'column',
+            'end_row': 'end_row',
+            'end_column': 'end_column',
+        },
+    ),
+}
+
+
+def nodeClasses() -> dict:
+    """
+    Returns the node classes that get a builder, by name.
+    """
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    import frontend.parser.AST as AST
+
+    classes = dict()
+    for name in AST.__all__:
+        cls = getattr(AST, name)
+        if isinstance(cls, type) and issubclass(cls, AST.Node) and cls is not AST.Node:
+            classes.setdefault(cls.__name__, cls)
+    return classes
+
+
+def builderParameters(cls: type) -> list:
+    """
+    Returns the fields of a node class that are parameters of its builder, in order.
+    """
+    return [field for field in dataclasses.fields(cls) if field.init and field.name not in POSITION_FIELDS]
+
+
+def literal(value) -> str | None:
+    """
+    Returns the source of a value if it's a literal, None otherwise.
+    """
     try:
-        grammar = str()
-        for file in source_path.glob('*.gram'):
-            with open(file, 'r') as f:
-                if file.stem == 'main':
-                    grammar = f.read() + '\n' + grammar
-                else:
-                    grammar += f.read() + '\n'
-        grammar = re.sub(r'\b([A-Z]+)\b', replacement, grammar, flags=re.DOTALL)
-        grammar = re.sub(r'^\s*(->\s*)+', str(), grammar, flags=re.MULTILINE)
-        # Run replacements on the grammar file
-        build_path.mkdir(parents=True, exist_ok=True)
-        with open(build_path / 'grammar', 'w+') as f:
-            f.write(grammar)
-        # `python -m pegen -o <output-file> <source-file>`
-        subprocess.run(['python', '-m', 'pegen', '-o', output_file, build_path.relative_to(root) / 'grammar'],
-                       cwd=root, check=True)
-        with open(output_path, 'r') as f:
-            lines = f.readlines()
-        with open(output_path, 'w') as f:
-            for line in lines:
-                if re.fullmatch(r"\s*if\s*__name__\s*==\s*'__main__'\s*:\s*", line):
-                    break
-                f.write(line)
-        subprocess.run(['black', output_file], cwd=root, check=True)
-    except subprocess.CalledProcessError as e:
-        sys.exit(e.returncode)
+        return repr(value) if ast.literal_eval(repr(value)) == value else None
+    except (ValueError, SyntaxError):
+        return None
+
+
+def generateBuilder(cls: type) -> str:
+    """
+    Generates the builder of a node class.
+    """
+    name = cls.__name__
+    fields = {field.name: field for field in dataclasses.fields(cls)}
+    lines = [f'# {name}', f'# {"-" * len(name)}>', f'_{name} = AST.{name}', f'_new{name} = _{name}.__new__']
+
+    # Parameters
+    # ---------->
+    params, defaults = [], []
+    for field in builderParameters(cls):
+        if field.default is not dataclasses.MISSING:
+            value = literal(field.default)
+            if value is None:
+                value = f'_{name}_{field.name}'
+                lines.append(f'{value} = _{name}.__dataclass_fields__[{field.name!r}].default')
+            params.append(f'{field.name}={value}')
+        elif field.default_factory is not dataclasses.MISSING:
+            lines.append(f'_{name}_{field.name} = _{name}.__dataclass_fields__[{field.name!r}].default_factory')
+            params.append(f'{field.name}=_MISSING')
+            defaults.append(f'if {field.name} is _MISSING:\n        {field.name} = _{name}_{field.name}()')
+        else:
+            params.append(field.name)
+
+    # Attributes, in the order the dataclass __init__ sets them
+    # --------------------------------------------------------->
+    attributes = dict()
+    for field in fields.values():
+        if field.init:
+            if field.name in POSITION_FIELDS:
+                attributes[field.name] = literal(field.default)
+            else:
+                attributes[field.name] = field.name
+        elif field.default_factory is not dataclasses.MISSING:
+            factory = field.default_factory
+            if factory() is factory():
+                # The children of a class are shared by its instances
+                lines.append(f'_{name}_{field.name} = _{name}.__dataclass_fields__[{field.name!r}].default_factory()')
+                attributes[field.name] = f'_{name}_{field.name}'
+            else:
+                lines.append(f'_{name}_{field.name} = _{name}.__dataclass_fields__[{field.name!r}].default_factory')
+                attributes[field.name] = f'_{name}_{field.name}()'
+    setup, inlined = INLINE_POST_INIT.get(name, ([], None))
+    if inlined is not None:
+        attributes.update(inlined)
+    items = [f'{key!r}: {value}' for key, value in attributes.items()]
+
+    # Position
+    # -------->
+    post_init = getattr(cls, '__post_init__', None)
+    tracked = post_init is not None and post_init.__name__ == 'post_init_wrapper'
+    children = list(fields['children'].default_factory() or ()) if 'children' in fields else []
+    body = [f'node = _new{name}(_{name})', *defaults, *setup]
+    if inlined is not None:
+        body.append(f'node.__dict__ = {{{", ".join(items)}}}')
+    elif tracked and children and not hasattr(post_init, '__wrapped__'):
+        first, last = children[0], children[-1]
+        span = [f"'row': {first}.row", f"'column': {first}.column",
+                f"'end_row': {last}.end_row", f"'end_column': {last}.end_column"]
+        # Children without a position are skipped by `__post_init__`
+        check = f'isinstance({first}, _Node) and {positioned(first)}'
+        if first != last:
+            check += f' and isinstance({last}, _Node) and {positioned(last)}'
+        body.append(f'if {check}:')
+        body.append(f'    node.__dict__ = {{{", ".join(items + span)}}}')
+        body.append('else:')
+        body.append(f'    node.__dict__ = {{{", ".join(items)}}}')
+        body.append(f'    _{name}.__post_init__(node)')
+    else:
+        body.append(f'node.__dict__ = {{{", ".join(items)}}}')
+        if post_init is not None:
+            body.append(f'_{name}.__post_init__(node)')
+    body.append('return node')
+
+    signature = ', '.join(params + ['/'] if params else [])
+    lines += ['', '', f'def {name}({signature}) -> AST.{name}:']
+    lines += ['    ' + line for line in '\n'.join(body).split('\n')]
+    return '\n'.join(lines)
+
+
+def generateBuilders() -> str:
+    """
+    Generates the builders of every node class, in their final form.
+    """
+    import black
+
+    classes = nodeClasses()
+    code = BUILDERS_HEADER.format(filenames=', '.join(ast_files), exports=list(classes))
+    for cls in classes.values():
+        code += '\n\n' + generateBuilder(cls) + '\n'
+    return black.format_str(code, mode=black.Mode())
+
+
+class BuilderCalls(ast.NodeTransformer):
+    """
+    Replaces the keyword-only constructor calls of the node classes in an action with builder calls.
+
+    Notes
+    -----
+    `AST.List(elements=...)` is a builder call too. Calls that skip a parameter but pass
+    a later one keep the constructor, since builders are positional-only.
+    """
+
+    def __init__(self, classes: dict):
+        self.classes = classes
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        func = node.func
+        if not (
+                isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == 'AST'
+                and not node.args and all(keyword.arg for keyword in node.keywords)
+        ):
+            return node
+        import frontend.parser.AST as AST
+        cls = getattr(AST, func.attr, None)
+        if not isinstance(cls, type) or cls.__name__ not in self.classes:
+            return node
+        given = {keyword.arg: keyword.value for keyword in node.keywords}
+        names = [field.name for field in builderParameters(cls)]
+        if set(given) - set(names):
+            return node
+        count = max((names.index(key) + 1 for key in given), default=0)
+        if any(name not in given for name in names[:count]):
+            return node
+        return ast.copy_location(ast.Call(
+            func=ast.Attribute(value=ast.Name(id='Nodes', ctx=ast.Load()), attr=cls.__name__, ctx=ast.Load()),
+            args=[given[name] for name in names[:count]],
+            keywords=[],
+        ), node)
+
+
+def useBuilders(rules):
+    """
+    Rewrites the actions of the grammar to call the builders, in place.
+    """
+    transformer = BuilderCalls(nodeClasses())
+
+    def visit(node):
+        if isinstance(node, list):
+            for child in node:
+                visit(child)
+            return
+        if isinstance(node, Alt) and node.action:
+            tree = transformer.visit(ast.parse(node.action.strip(), mode='eval'))
+            node.action = ast.unparse(ast.fix_missing_locations(tree))
+        for child in node:
+            visit(child)
+
+    visit(list(rules.rules.values()))
+    return rules
+
+
+def build(force: bool = False) -> bool:
+    """
+    Builds the parser, its tables and the node builders if the grammar, the node classes
+    or the generator changed.
+
+    Returns
+    -------
+    bool
+        Whether the outputs were regenerated.
+    """
+    files = grammarFiles()
+    lock = {
+        'generator': generatorVersion(),
+        'files': {file.name: sha256(file.read_bytes()) for file in files},
+        'nodes': {name: sha256((root / name).read_bytes()) for name in ast_files},
+    }
+    old_lock = readLock()
+    outputs = {output_file: output_path, tables_file: tables_path, builders_file: builders_path}
+    if (
+            not force and
+            all(path.exists() for path in outputs.values()) and
+            old_lock.get('generator') == lock['generator'] and
+            old_lock.get('files') == lock['files'] and
+            old_lock.get('nodes') == lock['nodes'] and
+            old_lock.get('outputs') == {name: sha256(path.read_bytes()) for name, path in outputs.items()}
+    ):
+        return False
+    grammar = combineGrammar(files)
+    build_path.mkdir(parents=True, exist_ok=True)
+    (build_path / 'grammar').write_text(grammar)
+    code = {
+        output_file: generateParser(grammar),
+        tables_file: generateTables(grammar),
+        builders_file: generateBuilders(),
+    }
+    for name, path in outputs.items():
+        path.write_text(code[name])
+    lock['outputs'] = {name: sha256(code[name]) for name in outputs}
+    lock_path.write_text(json.dumps(lock, indent=4) + '\n')
+    return True
+
+
+# ANALYSIS
+# -------->
+
+@dataclasses.dataclass
+class Finding:
+    """
+    A performance hazard found in the grammar.
+
+    Attributes
+    ----------
+    severity: str
+        One of `error`, `warning` or `info`.
+    kind: str
+        The kind of the hazard.
+    rule: str
+        The rule that contains the hazard.
+    message: str
+        The description of the hazard.
+    cost: int | None
+        The estimated extra token tests per invocation of the rule, None if unbounded.
+    """
+    severity: str
+    kind: str
+    rule: str
+    message: str
+    cost: int | None
+
+    SEVERITIES = ('error', 'warning', 'info')
+
+    def __str__(self) -> str:
+        cost = '∞' if self.cost is None else str(self.cost)
+        return f'{self.severity:<7} {self.kind:<20} {self.rule:<22} cost≈{cost:<4} {self.message}'
+
+
+class GrammarAnalyzer:
+    """
+    Computes FIRST/FOLLOW sets of the grammar and looks for performance hazards.
+
+    Notes
+    -----
+    Terminals are represented by their grammar spelling, i.e. `'fun'` or `NAME`.
+    Lookaheads, cuts and commits don't consume anything, so they are nullable and have empty FIRST sets.
+    Every rule is memoized, so calling a rule again at the same position costs one cache hit,
+    which is counted as a single token test in cost estimates.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.rules = grammar.rules
+        self.first = {name: set() for name in self.rules}
+        self.nullable = {name: False for name in self.rules}
+        self.follow = {name: set() for name in self.rules}
+        self.findings = []
+        self._computeFirst()
+        self._computeFollow()
+
+    # Sets
+    # ---->
+
+    def itemFirst(self, item) -> tuple:
+        """
+        Returns the FIRST set and the nullability of a grammar item.
+        """
+        if isinstance(item, NamedItem):
+            return self.itemFirst(item.item)
+        if isinstance(item, NameLeaf):
+            if item.value in self.rules:
+                return self.first[item.value], self.nullable[item.value]
+            if item.value == COMMIT:
+                return set(), True
+            return {item.value}, False
+        if isinstance(item, StringLeaf):
+            return {item.value}, False
+        if isinstance(item, (Lookahead, Cut)):
+            return set(), True
+        if isinstance(item, (Opt, Repeat0)):
+            return self.itemFirst(item.node)[0], True
+        if isinstance(item, (Repeat1, Gather, Forced)):
+            return self.itemFirst(item.node)
+        if isinstance(item, Group):
+            return self.itemFirst(item.rhs)
+        if isinstance(item, Rhs):
+            first, nullable = set(), False
+            for alt in item.alts:
+                alt_first, alt_nullable = self.itemFirst(alt)
+                first |= alt_first
+                nullable |= alt_nullable
+            return first, nullable
+        if isinstance(item, Alt):
+            return self.sequenceFirst(item.items)
+        raise TypeError(f'Unknown grammar item: {item!r}')
+
+    def sequenceFirst(self, items) -> tuple:
+        first = set()
+        for item in items:
+            item_first, item_nullable = self.itemFirst(item)
+            first |= item_first
+            if not item_nullable:
+                return first, False
+        return first, True
+
+    def _computeFirst(self):
+        changed = True
+        while changed:
+            changed = False
+            for name, rule in self.rules.items():
+                first, nullable = self.itemFirst(rule.rhs)
+                if first != self.first[name] or nullable != self.nullable[name]:
+                    self.first[name] = set(first)
+                    self.nullable[name] = nullable
+                    changed = True
+
+    def _walkFollow(self, rhs, follow: set, visit):
+        """
+        Calls `visit(item, follow)` for every item in the rhs, with the set of terminals that can follow it.
+        """
+        for alt in rhs.alts:
+            items = [named.item for named in alt.items]
+            for index, item in enumerate(items):
+                rest_first, rest_nullable = self.sequenceFirst(items[index + 1:])
+                item_follow = rest_first | follow if rest_nullable else set(rest_first)
+                visit(item, item_follow)
+                inner = item.node if isinstance(item, (Opt, Repeat, Lookahead, Forced)) else item
+                if isinstance(item, Repeat):
+                    # The body of a loop can be followed by itself
+                    item_follow = item_follow | self.itemFirst(item.node)[0]
+                if isinstance(item, Gather):
+                    item_follow = item_follow | self.itemFirst(item.separator)[0]
+                if isinstance(inner, Group):
+                    self._walkFollow(inner.rhs, item_follow, visit)
+                elif inner is not item:
+                    visit(inner, item_follow)
+
+    def _computeFollow(self):
+        changed = True
+
+        def visit(item, follow: set):
+            nonlocal changed
+            if isinstance(item, NameLeaf) and item.value in self.rules:
+                if not follow <= self.follow[item.value]:
+                    self.follow[item.value] |= follow
+                    changed = True
+
+        while changed:
+            changed = False
+            for name, rule in self.rules.items():
+                self._walkFollow(rule.rhs, self.follow[name], visit)
+
+    # Costs
+    # ----->
+
+    def weight(self, item) -> int:
+        """
+        Returns the number of token tests needed to match an item once (rules count as one, as they are memoized).
+        """
+        if isinstance(item, NamedItem):
+            return self.weight(item.item)
+        if isinstance(item, (Opt, Repeat, Lookahead, Forced)):
+            return self.weight(item.node) + (self.weight(item.separator) if isinstance(item, Gather) else 0)
+        if isinstance(item, Group):
+            return max(sum(self.weight(named) for named in alt.items) for alt in item.rhs.alts)
+        return 1
+
+    def ruleCost(self, name: str, seen: frozenset = frozenset()) -> int | None:
+        """
+        Returns the worst-case number of token tests of a rule at a fresh position (i.e. without memoized results).
+        """
+        if name in seen:
+            return None
+
+        def itemCost(item) -> int | None:
+            if isinstance(item, NamedItem):
+                return itemCost(item.item)
+            if isinstance(item, NameLeaf):
+                return self.ruleCost(item.value, seen | {name}) if item.value in self.rules else 1
+            if isinstance(item, Gather):
+                costs = [itemCost(item.node), itemCost(item.separator)]
+                return None if None in costs else sum(costs)
+            if isinstance(item, (Opt, Repeat, Lookahead, Forced)):
+                return itemCost(item.node)
+            if isinstance(item, Group):
+                return rhsCost(item.rhs)
+            return 1
+
+        def rhsCost(rhs) -> int | None:
+            total = 0
+            for alt in rhs.alts:
+                for named in alt.items:
+                    cost = itemCost(named)
+                    if cost is None:
+                        return None
+                    total += cost
+            return total
+
+        return rhsCost(self.rules[name].rhs)
+
+    # Hazards
+    # ------->
+
+    def report(self, severity: str, kind: str, rule: str, message: str, cost: int | None):
+        self.findings.append(Finding(severity, kind, rule, message, cost))
+
+    def analyze(self) -> list:
+        """
+        Runs every check on the grammar.
+
+        Returns
+        -------
+        list
+            The findings, the most severe and most expensive first.
+        """
+        for name, rule in self.rules.items():
+            self._checkRhs(name, rule.rhs)
+            self._walkFollow(rule.rhs, self.follow[name], lambda item, follow, name=name: self._checkItem(
+                name, item, follow
+            ))
+
+        # Left recursion
+        # -------------->
+        compute_nullables(self.rules)
+        compute_left_recursives(self.rules)
+        for name, rule in self.rules.items():
+            if rule.left_recursive:
+                self.report(
+                    'warning', 'left-recursion', name,
+                    ('leader, needs memoize_left_rec' if rule.leader else 'left-recursive, reached through its leader')
+                    + '; the rule is reparsed once per repetition it grows by',
+                    self.ruleCost(name)
+                )
+
+        self.findings.sort(key=lambda x: (
+            Finding.SEVERITIES.index(x.severity), -(x.cost if x.cost is not None else sys.maxsize), x.rule
+        ))
+        return self.findings
+
+    def _checkRhs(self, rule: str, rhs):
+
+        alts = rhs.alts
+        # Nullable alternatives shadow everything after them
+        for index, alt in enumerate(alts[:-1]):
+            if self.itemFirst(alt)[1]:
+                self.report(
+                    'error', 'unreachable-alt', rule,
+                    f'alternative {index + 1} ({alt}) can match empty, so the alternatives after it never run', 0
+                )
+        # Shared prefixes are parsed again by every alternative that has them
+        for index, alt in enumerate(alts):
+            for other_index in range(index + 1, len(alts)):
+                other = alts[other_index]
+                length = 0
+                for a, b in zip(alt.items, other.items):
+                    if str(a.item) != str(b.item):
+                        break
+                    length += 1
+                if length > 0:
+                    prefix = ' '.join(str(named.item) for named in alt.items[:length])
+                    self.report(
+                        'warning', 'common-prefix', rule,
+                        f'alternatives {index + 1} and {other_index + 1} both start with `{prefix}`, '
+                        f'factor it out so it is matched once',
+                        sum(self.weight(named) for named in alt.items[:length])
+                    )
+                    continue
+                overlap = self.itemFirst(alt)[0] & self.itemFirst(other)[0]
+                if overlap:
+                    self.report(
+                        'info', 'first-overlap', rule,
+                        f'alternatives {index + 1} and {other_index + 1} can both start with '
+                        f'{", ".join(sorted(overlap))}, so alternative {other_index + 1} may run after a partial match',
+                        sum(self.weight(named) for named in alt.items)
+                    )
+        for alt in alts:
+            for named in alt.items:
+                item = named.item
+                inner = item.node if isinstance(item, (Opt, Repeat, Lookahead, Forced)) else item
+                if isinstance(inner, Group):
+                    self._checkRhs(rule, inner.rhs)
+
+    def _checkItem(self, rule: str, item, follow: set):
+
+        if isinstance(item, Repeat):
+            body_first, body_nullable = self.itemFirst(item.node)
+            if body_nullable:
+                self.report(
+                    'error', 'nullable-loop-body', rule,
+                    f'the body of `{item}` can match empty, the loop can spin without consuming tokens', None
+                )
+            elif isinstance(item, Repeat0):
+                self.report(
+                    'info', 'nullable-loop', rule,
+                    f'`{item}` can match empty, every use ends with one failed attempt of its body',
+                    self.weight(item.node)
+                )
+        if isinstance(item, (Opt, Repeat)):
+            conflict = self.itemFirst(item.node)[0] & follow
+            if conflict:
+                forced = self._hasForced(item.node)
+                self.report(
+                    'error' if forced else 'warning', 'greedy-conflict', rule,
+                    f'`{item}` can start with {", ".join(sorted(conflict))}, which may also follow it; '
+                    + ('its body has a forced item, so this is a syntax error instead of a backtrack' if forced else
+                       'the greedy match is never undone'),
+                    self.weight(item.node)
+                )
+        if isinstance(item, Lookahead):
+            cost = self.weight(item.node)
+            if isinstance(item.node, NameLeaf) and item.node.value in self.rules:
+                cost = self.ruleCost(item.node.value)
+            if cost is None or cost > 1:
+                self.report(
+                    'info', 'lookahead', rule,
+                    f'`{item}` parses {item.node} and throws the result away', cost
+                )
+
+    def _hasForced(self, item, seen: frozenset = frozenset()) -> bool:
+        if isinstance(item, NamedItem):
+            return self._hasForced(item.item, seen)
+        if isinstance(item, Forced):
+            return True
+        if isinstance(item, NameLeaf):
+            if item.value not in self.rules or item.value in seen:
+                return False
+            return self._hasForced(self.rules[item.value].rhs, seen | {item.value})
+        if isinstance(item, (Opt, Repeat)):
+            return self._hasForced(item.node, seen)
+        if isinstance(item, Group):
+            return self._hasForced(item.rhs, seen)
+        if hasattr(item, 'alts'):
+            # Only the first item of an alternative is tried before the forced item can be reached
+            return any(any(self._hasForced(named, seen) for named in alt.items) for alt in item.alts)
+        return False
+
+
+def analyze(strict: bool = False) -> int:
+    """
+    Prints the performance hazards of the grammar.
+
+    Returns
+    -------
+    int
+        The exit code, non-zero if there are errors (or warnings with `strict`).
+    """
+    grammar = parseGrammar(combineGrammar(grammarFiles()))
+    findings = GrammarAnalyzer(grammar).analyze()
+    for finding in findings:
+        print(finding)
+    counts = {severity: sum(x.severity == severity for x in findings) for severity in Finding.SEVERITIES}
+    print(f'{counts["error"]} errors, {counts["warning"]} warnings, {counts["info"]} infos')
+    if counts['error'] or (strict and counts['warning']):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Kiwi grammar tools')
+    commands = argparser.add_subparsers(dest='command')
+    build_command = commands.add_parser('build', help='generate the parser (default)')
+    build_command.add_argument('--force', action='store_true', help='regenerate even if nothing changed')
+    analyze_command = commands.add_parser('analyze', help='report performance hazards of the grammar')
+    analyze_command.add_argument('--strict', action='store_true', help='fail on warnings too')
+    args = argparser.parse_args()
+
+    if args.command == 'analyze':
+        sys.exit(analyze(strict=args.strict))
+
+    if args.command in (None, 'build'):
+        try:
+            changed = build(force=getattr(args, 'force', False))
+        except SyntaxError as e:
+            print(f'{e.filename}:{e.lineno}: {e.msg}', file=sys.stderr)
+            sys.exit(1)
+        outputs = f'{output_file}, {tables_file}, {builders_file}'
+        print(f'{outputs} are up to date' if not changed else f'{outputs} regenerated')
@@ -0,0 +1,75 @@
+"""
+Import-time benchmark for the frontend packages.
+
+Every target is imported in a fresh interpreter with `python -X importtime`, and the
+cumulative import time of the target module is reported (median of all runs).
+It also reports whether heavy modules (e.g. pegen) were imported as a side effect.
+
+Usage
+-----
+python scripts/importtime.py [--repeat N] [target ...]
+"""
+
+import argparse
+import pathlib
+import statistics
+import subprocess
+import sys
+
+root = pathlib.Path(__file__).resolve().parent.parent
+
+TARGETS = [
+    'frontend.lexer',
+    'frontend.lexer.Lexer',
+    'frontend.parser',
+    'frontend.parser.AST',
+    'frontend.parser.Parser',
+]
+
+# Modules that should only be imported when they are actually needed
+HEAVY_MODULES = [
+    'pegen',
+    'util.formatter',
+    'frontend.parser.AST',
+]
+
+
+def measure(target: str) -> tuple:
+    """
+    Imports the target in a fresh interpreter.
+
+    Returns
+    -------
+    tuple
+        The cumulative import time in microseconds, and the heavy modules that were imported.
+    """
+    code = f'import sys, {target}; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    cumulative = None
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == target:
+            cumulative = int(parts[1])
+    if cumulative is None:
+        raise RuntimeError(f'{target} was not imported')
+    return cumulative, process.stdout.strip()
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Measure the import time of the frontend packages')
+    argparser.add_argument('--repeat', type=int, default=10, help='number of fresh interpreters per target')
+    argparser.add_argument('targets', nargs='*', default=TARGETS, help='modules to import')
+    args = argparser.parse_args()
+
+    print(f'{"target":<28} {"median":>10} {"min":>10}   side effects')
+    for target in args.targets:
+        times = []
+        loaded = ''
+        for _ in range(args.repeat):
+            cumulative, loaded = measure(target)
+            times.append(cumulative)
+        print(f'{target:<28} {statistics.median(times) / 1000:>8.2f}ms {min(times) / 1000:>8.2f}ms   {loaded or "-"}')
@@ -0,0 +1,218 @@
+"""
+Memory accounting of the lexer and the parser.
+
+A file is tokenized and parsed twice:
+
+- With `tracemalloc`, to measure the memory allocated by each phase (tokens, parse with
+  the parser still alive, tree alone once the parser is dropped), the peak, and the
+  source lines that allocated the most during the parse.
+- Without it, to attribute the retained memory with a deep-size walk, in this order (an
+  object is only counted by the first owner that reaches it):
+
+  TokenInfo
+      The tokens that are alive (i.e. not released by the tokenizer, or held by the
+      tree), with their positions, strings and lines.
+  token list
+      The list of tokens of the tokenizer (the list object alone).
+  AST
+      Every node of the tree, by class: the node, its attributes and the objects only it
+      references (e.g. its list of elements).
+  memo
+      The memo table of the parser by rule: keys, values and the nodes that are not in
+      the tree (i.e. results of alternatives that were discarded).
+
+Notes
+-----
+The memo of pegen (and of `memoizetools`) is one dictionary per parser, keyed by the
+position of the token, the name of the rule and its arguments, so it is reported per
+rule, with the number of entries per token.
+
+Usage
+-----
+python scripts/memory.py [FILE | --imports N] [--top N]
+"""
+
+import argparse
+import collections
+import enum
+import gc
+import pathlib
+import sys
+import tracemalloc
+import types
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from frontend.lexer import Lexer  # noqa: E402
+from frontend.parser.AST import Node, TokenWrapper  # noqa: E402
+from frontend.parser.NodeVisitor import walk  # noqa: E402
+from frontend.parser.Parser import Parser  # noqa: E402
+from util.formatter import Column, TableWriter, TextColor  # noqa: E402
+
+# Objects shared by the whole process, they are never counted
+SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, enum.Enum)
+
+
+def parse(source: str) -> tuple:
+    """
+    Returns the tokenizer, the parser and the tree of a source.
+    """
+    tokenizer = Lexer().load(source).tokenize()
+    parser = Parser(tokenizer)
+    tree = parser.start()
+    if tree is None:
+        raise parser.make_syntax_error('invalid syntax')
+    return tokenizer, parser, tree
+
+
+def deepSize(roots: list, seen: set, stop=lambda obj: False) -> int:
+    """
+    Returns the size of the objects reachable from the roots that are not seen yet.
+
+    Parameters
+    ----------
+    roots: list
+        The objects to measure.
+    seen: set
+        The ids of the objects already counted, updated with the counted ones.
+    stop: typing.Callable[[typing.Any], bool]
+        Whether an object (and what it references) belongs to another owner.
+    """
+    size = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED) or stop(obj):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if hasattr(obj, '__dict__'):
+            # The attribute dictionary of an instance is not always a referent
+            stack.append(obj.__dict__)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def account(tokenizer, parser, tree) -> dict:
+    """
+    Returns the retained memory of each owner, see the module docstring.
+
+    Returns
+    -------
+    dict
+        `(category, name) -> [count, bytes]`
+    """
+    seen = set()
+    result = dict()
+    tokens = {id(token): token for token in tokenizer._array if token is not None}
+    tokens.update((id(node.token), node.token) for node in walk(tree) if isinstance(node, TokenWrapper))
+    result['TokenInfo', 'TokenInfo'] = [len(tokens), deepSize(list(tokens.values()), seen)]
+    result['token list', 'list'] = [1, deepSize([tokenizer._array], seen)]
+
+    nodes = collections.defaultdict(lambda: [0, 0])
+    for node in walk(tree):
+        entry = nodes[type(node).__name__]
+        entry[0] += 1
+        entry[1] += deepSize([node], seen, lambda obj: obj is not node and isinstance(obj, Node))
+    for name, entry in sorted(nodes.items(), key=lambda item: -item[1][1]):
+        result['AST', name] = entry
+
+    cache = parser._cache
+    seen.add(id(cache))
+    rules = collections.defaultdict(lambda: [0, 0])
+    for key, value in cache.items():
+        entry = rules[key[1]]
+        entry[0] += 1
+        entry[1] += deepSize([key, value], seen)
+    result['memo', '(table)'] = [len(cache), sys.getsizeof(cache)]
+    for name, entry in sorted(rules.items(), key=lambda item: -item[1][1]):
+        result['memo', name] = entry
+    return result
+
+
+def trace(source: str, top: int) -> tuple:
+    """
+    Returns the memory allocated by each phase, the peak and the top allocation sites of the parse.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.take_snapshot()
+        tokenizer = Lexer().load(source).tokenize()
+        lexed = tracemalloc.take_snapshot()
+        parser = Parser(tokenizer)
+        tree = parser.start()
+        parsed = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        del tokenizer, parser
+        gc.collect()
+        alone = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del tree
+
+    def total(snapshot):
+        return sum(stat.size for stat in snapshot.statistics('filename'))
+
+    base = total(start)
+    phases = [
+        ('tokens', total(lexed) - base),
+        ('parse (parser alive)', total(parsed) - base),
+        ('tree alone', total(alone) - base),
+        ('peak', peak),
+    ]
+    # The snapshots themselves are allocated by tracemalloc
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    sites = parsed.filter_traces(ignored).compare_to(lexed.filter_traces(ignored), 'lineno')[:top]
+    return phases, sites
+
+
+def formatSize(size: int) -> str:
+    for unit, scale in (('MiB', 1 << 20), ('KiB', 1 << 10)):
+        if abs(size) >= scale:
+            return f'{size / scale:.1f} {unit}'
+    return f'{size} B'
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description='Account the memory of the lexer and the parser')
+    argparser.add_argument('file', nargs='?', default=str(root / 'resources' / 'main.kiwi'), help='the source file')
+    argparser.add_argument('--imports', type=int, help='use a generated source with N imports instead of a file')
+    argparser.add_argument('--top', type=int, default=10, help='number of allocation sites to show')
+    args = argparser.parse_args()
+
+    if args.imports is not None:
+        from benchmark import generateSource
+        source = generateSource(args.imports)
+    else:
+        source = pathlib.Path(args.file).read_text()
+    color = sys.stdout.isatty()
+
+    phases, sites = trace(source, args.top)
+    print('tracemalloc')
+    TableWriter([Column(TextColor.LIGHT_BLUE), Column(TextColor.LIGHT_YELLOW)], color=color).write([
+        (name, formatSize(size)) for name, size in phases
+    ])
+    print()
+    print('top allocation sites of the parse')
+    TableWriter([Column(TextColor.LIGHT_YELLOW), Column(TextColor.LIGHT_BLUE)], color=color).write([
+        (formatSize(stat.size_diff), str(stat.traceback[0])) for stat in sites
+    ])
+
+    tokenizer, parser, tree = parse(source)
+    accounts = account(tokenizer, parser, tree)
+    total = sum(size for _, size in accounts.values())
+    print()
+    print(f'retained memory ({len(source)} characters, {len(tokenizer)} tokens, '
+          f'{len(parser._cache) / max(len(tokenizer), 1):.1f} memo entries per token)')
+    rows = [('category', 'name', 'count', 'size', 'share')]
+    rows.extend(
+        (category, name, str(count), formatSize(size), f'{size / total:.1%}')
+        for (category, name), (count, size) in accounts.items()
+    )
+    rows.append(('total', str(), str(), formatSize(total), str()))
+    TableWriter([
+        Column(TextColor.LIGHT_GREEN), Column(TextColor.LIGHT_BLUE), Column(TextColor.LIGHT_PURPLE),
+        Column(TextColor.LIGHT_YELLOW), Column(TextColor.LIGHT_CYAN),
+    ], color=color).write(rows)
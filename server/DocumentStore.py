@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import asyncio
+import dataclasses
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from frontend.lexer import AsyncLexer, SourceIndex
+from frontend.parser.AST import File
+from frontend.parser.Parser import Parser
+from frontend.parser.ParseCache import parseCached
+
+if typing.TYPE_CHECKING:
+    from pegen.tokenizer import Tokenizer
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'ParseResult',
+    'Document',
+    'DocumentStore',
+    'parseSource',
+    'parseTokens',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+@dataclass
+class ParseResult:
+    """
+    A class that represents the result of parsing a document.
+
+    Attributes
+    ----------
+    tree: typing.Optional[File]
+        The AST, or None if the source has a syntax error.
+    sourceIndex: SourceIndex
+        The source index of the parsed source.
+    error: typing.Optional[SyntaxError]
+        The syntax error, if any.
+    """
+    tree: typing.Optional[File]
+    sourceIndex: SourceIndex
+    error: typing.Optional[SyntaxError] = field(default=None)
+
+
+def parseSource(source: str, uri: str = '<unknown>') -> ParseResult:
+    """
+    Parses the source code.
+
+    Parameters
+    ----------
+    source: str
+        The source code.
+    uri: str
+        The name used in syntax errors.
+
+    Returns
+    -------
+    ParseResult
+        The result of parsing.
+
+    Notes
+    -----
+    This function runs in the worker pool, so it must not touch the document store.
+    Sources are parsed through the parse cache of the process, so reopening a document or
+    undoing a change doesn't parse it again. The trees are frozen, as they may be shared.
+    """
+    sourceIndex = SourceIndex(source)
+    try:
+        tree = parseCached(source, uri)
+    except SyntaxError as error:
+        return ParseResult(tree=None, sourceIndex=sourceIndex, error=error)
+    return ParseResult(tree=tree, sourceIndex=sourceIndex)
+
+
+def parseTokens(tokenizer: Tokenizer, sourceIndex: typing.Optional[SourceIndex], uri: str = '<unknown>') -> ParseResult:
+    """
+    Parses the tokens of a tokenizer, see `parseSource`.
+
+    Notes
+    -----
+    The source index may be None if the source is not known yet (i.e. it is still being
+    received), it has to be set afterwards.
+    """
+    parser = Parser(tokenizer)
+    try:
+        tree = parser.start()
+    except SyntaxError as error:
+        return ParseResult(tree=None, sourceIndex=sourceIndex, error=error)
+    if tree is None:
+        return ParseResult(tree=None, sourceIndex=sourceIndex, error=parser.make_syntax_error('invalid syntax', uri))
+    return ParseResult(tree=tree, sourceIndex=sourceIndex)
+
+
+@dataclass
+class Document:
+    """
+    A class that represents an open document.
+
+    Attributes
+    ----------
+    uri: str
+        The uri of the document.
+    version: int
+        The version of the document, as sent by the editor.
+    source: str
+        The source code.
+    result: typing.Optional[asyncio.Future[ParseResult]]
+        The result of the last parse of the source.
+    """
+    uri: str
+    version: int
+    source: str
+    result: typing.Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class DocumentStore:
+    """
+    A class that keeps the open documents and their last ASTs in memory.
+
+    Attributes
+    ----------
+    documents: typing.Dict[str, Document]
+        The open documents.
+    _executor: typing.Optional[Executor]
+        The worker pool used for parsing, or None to use the default pool of the loop.
+
+    Notes
+    -----
+    Parsing never runs on the event loop. Each change schedules a new parse, and readers
+    await the result of the last scheduled parse, so they never see a stale AST.
+    """
+    documents: typing.Dict[str, Document]
+    _executor: typing.Optional[Executor]
+
+    def __init__(self, executor: typing.Optional[Executor] = None):
+        self.documents = dict()
+        self._executor = executor
+
+    def _schedule(self, document: Document):
+        loop = asyncio.get_running_loop()
+        document.result = loop.run_in_executor(self._executor, parseSource, document.source, document.uri)
+
+    def open(self, uri: str, source: str, version: int = 0) -> Document:
+        """
+        Opens a document and schedules its parse.
+
+        Parameters
+        ----------
+        uri: str
+            The uri of the document.
+        source: str
+            The source code.
+        version: int
+            The version of the document.
+
+        Returns
+        -------
+        Document
+            The document.
+        """
+        document = Document(uri=uri, version=version, source=source)
+        self.documents[uri] = document
+        self._schedule(document)
+        return document
+
+    def change(self, uri: str, source: str, version: typing.Optional[int] = None) -> Document:
+        """
+        Replaces the source of a document and schedules its parse.
+
+        Parameters
+        ----------
+        uri: str
+            The uri of the document.
+        source: str
+            The new source code.
+        version: typing.Optional[int]
+            The new version of the document.
+
+        Returns
+        -------
+        Document
+            The document.
+        """
+        document = self[uri]
+        document.version = version if version is not None else document.version + 1
+        if document.source != source:
+            document.source = source
+            self._schedule(document)
+        return document
+
+    async def stream(self, uri: str, lexer: AsyncLexer, version: typing.Optional[int] = None) -> Document:
+        """
+        Opens or replaces a document whose source is received from a stream.
+
+        Parameters
+        ----------
+        uri: str
+            The uri of the document.
+        lexer: AsyncLexer
+            The lexer of the stream, it must not be fed yet.
+        version: typing.Optional[int]
+            The new version of the document.
+
+        Returns
+        -------
+        Document
+            The document, once the whole source has been received.
+
+        Notes
+        -----
+        The parse is scheduled right away and consumes the tokens as they arrive, so it
+        mostly overlaps with the transfer. Readers awaiting `result` in the meantime get
+        the result of this parse.
+
+        If the stream fails (e.g. it is cut short), the document is left as it was before,
+        or it is not opened, and the error is raised.
+        """
+        document = self.documents.get(uri, None)
+        previous = None if document is None else (document.version, document.source, document.result)
+        if document is None:
+            document = self.documents[uri] = Document(uri=uri, version=version or 0, source=str())
+        else:
+            document.version = version if version is not None else document.version + 1
+        loop = asyncio.get_running_loop()
+        parsing = loop.run_in_executor(self._executor, parseTokens, lexer.tokenize(), None, uri)
+
+        async def result() -> ParseResult:
+            parsed = await parsing
+            await lexer.feed()
+            return dataclasses.replace(parsed, sourceIndex=SourceIndex(lexer.source))
+
+        future = document.result = asyncio.ensure_future(result())
+        try:
+            await lexer.feed()
+        except BaseException:
+            # The failed parse is superseded, its readers wait for the previous result again
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            if document.result is future:
+                if previous is not None:
+                    document.version, document.source, document.result = previous
+                elif self.documents.get(uri, None) is document:
+                    del self.documents[uri]
+            raise
+        document.source = lexer.source
+        return document
+
+    def close(self, uri: str):
+        """
+        Closes a document.
+
+        Parameters
+        ----------
+        uri: str
+            The uri of the document.
+        """
+        del self.documents[self[uri].uri]
+
+    async def result(self, uri: str) -> ParseResult:
+        """
+        Returns the result of the last parse of a document.
+
+        Parameters
+        ----------
+        uri: str
+            The uri of the document.
+
+        Returns
+        -------
+        ParseResult
+            The result of parsing.
+        """
+        document = self[uri]
+        while True:
+            future = document.result
+            try:
+                result = await asyncio.shield(future)
+            except Exception:
+                if future is document.result:
+                    raise
+                continue
+            # The document might have changed while we were waiting
+            if future is document.result:
+                return result
+
+    def __getitem__(self, uri: str) -> Document:
+        if uri not in self.documents:
+            raise KeyError(f'Document is not open: {uri}')
+        return self.documents[uri]
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self.documents
+
+    def __len__(self) -> int:
+        return len(self.documents)
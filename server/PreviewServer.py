@@ -0,0 +1,395 @@
+"""
+JSON-RPC preview server.
+
+Notes
+-----
+Messages are framed the same way as in the Language Server Protocol, i.e. each message
+is prefixed with a `Content-Length` header followed by an empty line.
+
+Methods
+-------
+initialize
+    Returns the server capabilities.
+textDocument/didOpen
+    Opens a document. (notification)
+textDocument/didChange
+    Replaces the full text of a document. (notification)
+textDocument/didClose
+    Closes a document. (notification)
+kiwi/dumpAst
+    Returns the formatted AST of a document.
+kiwi/diffAst
+    Returns the changes of the AST since the last `kiwi/dumpAst` or `kiwi/diffAst`.
+shutdown
+    Stops accepting requests.
+exit
+    Closes the connection. (notification)
+
+Batches of messages (JSON arrays) are not supported, they are answered with an
+`Invalid Request` error.
+
+Documents
+---------
+A message with a `Kiwi-Document: <uri>` header (and optionally `Kiwi-Version: <version>`)
+carries the raw text of a document instead of a JSON body. It opens or replaces the
+document like `textDocument/didOpen`, but the document is parsed while the body is still
+being received, so large documents are ready soon after the transfer finishes.
+
+References
+----------
+[1] https://www.jsonrpc.org/specification
+[2] https://microsoft.github.io/language-server-protocol/specifications/base/0.9/specification/
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor
+from frontend.lexer import AsyncLexer
+from frontend.parser.TreeDiff import TreeDiff
+from server.DocumentStore import *
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'PreviewServer',
+    'JsonRpcError',
+]
+
+# MAIN CONTENT
+# ============>
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SYNTAX_ERROR = -32001
+
+# The size of the chunks read from the body of a raw document
+CHUNK_SIZE = 1 << 16
+
+
+class JsonRpcError(Exception):
+    """
+    An error that is sent back to the client as a JSON-RPC error object.
+
+    Attributes
+    ----------
+    code: int
+        The error code.
+    message: str
+        The error message.
+    data: typing.Any
+        Additional information about the error.
+    """
+    code: int
+    message: str
+    data: typing.Any
+
+    def __init__(self, code: int, message: str, data: typing.Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def toJson(self) -> typing.Dict[str, typing.Any]:
+        error = {'code': self.code, 'message': self.message}
+        if self.data is not None:
+            error['data'] = self.data
+        return error
+
+
+class PreviewServer:
+    """
+    A long-running server that keeps open documents and their ASTs in memory.
+
+    Attributes
+    ----------
+    store: DocumentStore
+        The open documents.
+    _handlers: typing.Dict[str, typing.Callable]
+        The method handlers.
+    _shutdown: bool
+        Whether the client requested a shutdown.
+    _sent: typing.Dict[str, typing.Any]
+        The last AST sent to the client for each document, used by `kiwi/diffAst`.
+
+    Notes
+    -----
+    Requests are handled concurrently, parsing and rendering run in the worker pool.
+    """
+    store: DocumentStore
+    _handlers: typing.Dict[str, typing.Callable[[typing.Dict[str, typing.Any]], typing.Awaitable[typing.Any]]]
+    _shutdown: bool
+    _sent: typing.Dict[str, typing.Any]
+
+    def __init__(self, executor: typing.Optional[Executor] = None):
+        self.store = DocumentStore(executor)
+        self._executor = executor
+        self._shutdown = False
+        self._sent = dict()
+        self._handlers = {
+            'initialize': self.initialize,
+            'textDocument/didOpen': self.didOpen,
+            'textDocument/didChange': self.didChange,
+            'textDocument/didClose': self.didClose,
+            'kiwi/dumpAst': self.dumpAst,
+            'kiwi/diffAst': self.diffAst,
+            'shutdown': self.shutdown,
+        }
+
+    # Methods
+    # ------->
+
+    async def initialize(self, params: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        return {
+            'capabilities': {
+                'textDocumentSync': 1,  # Full
+                'experimental': {'dumpAst': True},
+            },
+            'serverInfo': {'name': 'KiwiPreview'},
+        }
+
+    async def didOpen(self, params: typing.Dict[str, typing.Any]):
+        document = params['textDocument']
+        self.store.open(document['uri'], document['text'], document.get('version', 0))
+
+    async def didChange(self, params: typing.Dict[str, typing.Any]):
+        document = params['textDocument']
+        changes = params['contentChanges']
+        if not changes:
+            return
+        # Only full document sync is supported, so the last change has the whole text
+        self.store.change(document['uri'], changes[-1]['text'], document.get('version', None))
+
+    async def didClose(self, params: typing.Dict[str, typing.Any]):
+        self.store.close(params['textDocument']['uri'])
+        self._sent.pop(params['textDocument']['uri'], None)
+
+    async def dumpAst(self, params: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        uri = params['textDocument']['uri']
+        result = await self.store.result(uri)
+        if result.error is not None:
+            raise JsonRpcError(SYNTAX_ERROR, result.error.msg, {
+                'row': result.error.lineno,
+                'column': result.error.offset,
+            })
+        indent = params.get('indent', 2)
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(self._executor, lambda: str(result.tree.toFormatString(indent=indent)))
+        self._sent[uri] = result.tree
+        return {'uri': uri, 'version': self.store[uri].version, 'text': text}
+
+    async def diffAst(self, params: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        uri = params['textDocument']['uri']
+        if uri not in self._sent:
+            return {**await self.dumpAst(params), 'full': True}
+        result = await self.store.result(uri)
+        if result.error is not None:
+            raise JsonRpcError(SYNTAX_ERROR, result.error.msg, {
+                'row': result.error.lineno,
+                'column': result.error.offset,
+            })
+        indent = params.get('indent', 2)
+        old, new = self._sent[uri], result.tree
+
+        def diff() -> typing.List[typing.Dict[str, typing.Any]]:
+            return [{
+                'kind': edit.kind,
+                'field': edit.field,
+                'index': edit.index,
+                'oldSpan': edit.oldSpan,
+                'newSpan': edit.newSpan,
+                'text': None if edit.new is None else str(edit.new.toFormatString(indent=indent)),
+            } for edit in TreeDiff().diff(old, new)]
+
+        loop = asyncio.get_running_loop()
+        edits = await loop.run_in_executor(self._executor, diff)
+        self._sent[uri] = new
+        return {'uri': uri, 'version': self.store[uri].version, 'full': False, 'edits': edits}
+
+    async def shutdown(self, params: typing.Dict[str, typing.Any]):
+        self._shutdown = True
+
+    # Dispatching
+    # ----------->
+
+    async def handle(self, message: typing.Dict[str, typing.Any]) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Handles a single JSON-RPC message.
+
+        Parameters
+        ----------
+        message: typing.Dict[str, typing.Any]
+            The message.
+
+        Returns
+        -------
+        typing.Optional[typing.Dict[str, typing.Any]]
+            The response, or None if the message is a notification.
+        """
+        identifier = message.get('id', None)
+        try:
+            if not isinstance(message.get('method', None), str):
+                raise JsonRpcError(INVALID_REQUEST, 'Invalid request')
+            if self._shutdown and message['method'] != 'exit':
+                raise JsonRpcError(INVALID_REQUEST, 'Server is shutting down')
+            handler = self._handlers.get(message['method'], None)
+            if handler is None:
+                raise JsonRpcError(METHOD_NOT_FOUND, f'Method not found: {message["method"]}')
+            try:
+                result = await handler(message.get('params', dict()))
+            except (KeyError, TypeError) as error:
+                raise JsonRpcError(INVALID_PARAMS, str(error))
+        except JsonRpcError as error:
+            if 'id' not in message:
+                return None
+            return {'jsonrpc': '2.0', 'id': identifier, 'error': error.toJson()}
+        except Exception as error:
+            if 'id' not in message:
+                return None
+            return {'jsonrpc': '2.0', 'id': identifier, 'error': JsonRpcError(INTERNAL_ERROR, repr(error)).toJson()}
+        if 'id' not in message:
+            return None
+        return {'jsonrpc': '2.0', 'id': identifier, 'result': result}
+
+    # Transport
+    # --------->
+
+    @staticmethod
+    async def _readHeaders(reader: asyncio.StreamReader) -> typing.Optional[typing.Dict[str, str]]:
+        headers = dict()
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            key, _, value = line.partition(b':')
+            headers[key.strip().lower().decode('ascii')] = value.strip().decode('utf-8')
+        if 'content-length' not in headers:
+            raise JsonRpcError(INVALID_REQUEST, 'Missing Content-Length header')
+        return headers
+
+    @staticmethod
+    async def _readBody(reader: asyncio.StreamReader, length: int) -> typing.AsyncIterator[bytes]:
+        while length:
+            chunk = await reader.read(min(length, CHUNK_SIZE))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b'', length)
+            length -= len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _writeMessage(writer: asyncio.StreamWriter, message: typing.Dict[str, typing.Any]):
+        body = json.dumps(message, separators=(',', ':')).encode('utf-8')
+        writer.write(b'Content-Length: %d\r\n\r\n' % len(body) + body)
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves a single connection until it is closed or the client sends `exit`.
+
+        Parameters
+        ----------
+        reader: asyncio.StreamReader
+            The input stream.
+        writer: asyncio.StreamWriter
+            The output stream.
+        """
+        tasks: typing.Set[asyncio.Task] = set()
+
+        async def respond(message: typing.Dict[str, typing.Any]):
+            response = await self.handle(message)
+            if response is not None:
+                self._writeMessage(writer, response)
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    headers = await self._readHeaders(reader)
+                    if headers is None:
+                        break
+                    length = int(headers['content-length'])
+                    if 'kiwi-document' in headers:
+                        version = headers.get('kiwi-version', None)
+                        lexer = AsyncLexer(self._readBody(reader, length))
+                        version = None if version is None else int(version)
+                        await self.store.stream(headers['kiwi-document'], lexer, version)
+                        continue
+                    body = await reader.readexactly(length)
+                except JsonRpcError as error:
+                    # The length of the body is unknown, so the next message can't be found
+                    self._writeMessage(writer, {'jsonrpc': '2.0', 'id': None, 'error': error.toJson()})
+                    await writer.drain()
+                    break
+                except (asyncio.IncompleteReadError, ValueError):
+                    break
+                try:
+                    message = json.loads(body)
+                except ValueError:
+                    self._writeMessage(writer, {
+                        'jsonrpc': '2.0', 'id': None, 'error': JsonRpcError(PARSE_ERROR, 'Parse error').toJson()
+                    })
+                    continue
+                if not isinstance(message, dict):
+                    reason = 'Batch requests are not supported' if isinstance(message, list) else 'Invalid request'
+                    self._writeMessage(writer, {
+                        'jsonrpc': '2.0', 'id': None, 'error': JsonRpcError(INVALID_REQUEST, reason).toJson()
+                    })
+                    continue
+                if message.get('method', None) == 'exit':
+                    break
+                # Notifications are handled in order, so a change is never overtaken by an older one
+                if 'id' not in message:
+                    await respond(message)
+                    continue
+                task = asyncio.create_task(respond(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serveStdio(self):
+        """
+        Serves the client connected to the standard input and output.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout.buffer)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self.serve(reader, writer)
+
+    async def serveSocket(self, host: typing.Optional[str] = None, port: typing.Optional[int] = None,
+                          path: typing.Optional[str] = None):
+        """
+        Serves clients connected to a local socket.
+
+        Parameters
+        ----------
+        host: typing.Optional[str]
+            The host of the TCP socket.
+        port: typing.Optional[int]
+            The port of the TCP socket.
+        path: typing.Optional[str]
+            The path of the UNIX socket, used instead of the TCP socket.
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.serve, path=path)
+        else:
+            server = await asyncio.start_server(self.serve, host=host or '127.0.0.1', port=port)
+        async with server:
+            await server.serve_forever()
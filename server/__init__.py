@@ -0,0 +1,20 @@
+"""
+Preview server package.
+
+This package contains a long-running server that keeps the open documents and their
+ASTs in memory, so the editor doesn't start a new interpreter for every preview.
+
+Classes
+-------
+PreviewServer
+    The JSON-RPC server.
+DocumentStore
+    The in-memory store of the open documents.
+
+Notes
+-----
+Run `python -m server --help` for the command line options.
+"""
+
+from .DocumentStore import *
+from .PreviewServer import *
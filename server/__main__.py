@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from server.PreviewServer import PreviewServer
+
+# MAIN CONTENT
+# ============>
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(prog='python -m server', description='KiwiPreview JSON-RPC server')
+    transport = argparser.add_mutually_exclusive_group()
+    transport.add_argument('--stdio', action='store_true', help='serve over stdin/stdout (default)')
+    transport.add_argument('--port', type=int, help='serve over a local TCP socket')
+    transport.add_argument('--socket', help='serve over a UNIX socket at the given path')
+    argparser.add_argument('--host', default='127.0.0.1', help='host of the TCP socket')
+    argparser.add_argument('--workers', type=int, default=None, help='size of the parsing worker pool')
+    args = argparser.parse_args()
+
+    # The ASTs are kept in this process, so the worker pool is made of threads
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix='parser') as executor:
+        server = PreviewServer(executor)
+        try:
+            if args.port is not None:
+                asyncio.run(server.serveSocket(host=args.host, port=args.port))
+            elif args.socket is not None:
+                asyncio.run(server.serveSocket(path=args.socket))
+            else:
+                asyncio.run(server.serveStdio())
+        except KeyboardInterrupt:
+            pass
@@ -21,6 +21,56 @@ __all__ = [
 # MAIN CONTENT
 # ============>
 
+# A style is (color, bold, underline, italic, strikethrough), with the colors as a tuple
+Style = typing.Tuple[typing.Any, bool, bool, bool, bool]
+
+# The SGR prefix of each style, built on first use
+_prefixes: typing.Dict[Style, str] = dict()
+_rawPrefixes: typing.Dict[Style, str] = dict()
+
+ESCAPE = '\033'
+RAW_ESCAPE = '\\033'
+
+
+def toRaw(string: str) -> str:
+    """
+    Writes the escape characters of a string as `\\033`.
+    """
+    return string.replace(ESCAPE, RAW_ESCAPE)
+
+
+def stylePrefix(style: Style, raw: bool = False) -> str:
+    """
+    Returns the escape sequences that switch to a style from the default style.
+
+    Parameters
+    ----------
+    style: Style
+        The style.
+    raw: bool
+        Whether to write the escape characters as `\\033`, see `FormatString.toRawString`.
+    """
+    if raw:
+        prefix = _rawPrefixes.get(style)
+        if prefix is None:
+            prefix = _rawPrefixes[style] = toRaw(stylePrefix(style))
+        return prefix
+    prefix = _prefixes.get(style)
+    if prefix is None:
+        color, bold, underline, italic, strikethrough = style
+        prefix = color.value if isinstance(color, TextColor) else ''.join(map(lambda x: x.value, color))
+        if bold:
+            prefix += TextEffects.BOLD.value
+        if underline:
+            prefix += TextEffects.UNDERLINE.value
+        if italic:
+            prefix += TextEffects.ITALIC.value
+        if strikethrough:
+            prefix += TextEffects.STRIKETHROUGH.value
+        _prefixes[style] = prefix
+    return prefix
+
+
 @dataclass
 class FormatString:
     """
@@ -99,22 +149,57 @@ class FormatString:
         str
             The string representation of the format string.
         """
-        string = ''
-        for i in range(len(self._strings)):
-            if isinstance(self._colors[i], TextColor):
-                string += self._colors[i].value
-            else:
-                string += ''.join(map(lambda x: x.value, self._colors[i]))
-            if self._bolds[i]:
-                string += TextEffects.BOLD.value
-            if self._underlines[i]:
-                string += TextEffects.UNDERLINE.value
-            if self._italics[i]:
-                string += TextEffects.ITALIC.value
-            if self._strikethroughs[i]:
-                string += TextEffects.STRIKETHROUGH.value
-            string += self._strings[i] + TextColor.RESET.value
-        return string
+        return self.render()
+
+    def render(self, raw: bool = False) -> str:
+        """
+        Renders the format string.
+
+        Parameters
+        ----------
+        raw: bool
+            Whether to write the escape characters as `\\033`, see `toRawString`.
+
+        Returns
+        -------
+        str
+            The rendered string.
+
+        Notes
+        -----
+        Adjacent segments with the same style are rendered as a single run, and escape
+        sequences are only emitted when the style changes: a reset followed by the prefix
+        of the new style (the prefix of each style is computed once, see `stylePrefix`).
+        Empty segments are skipped. The output looks the same as one prefix and one reset
+        per segment, but it is much shorter for big dumps.
+        """
+        reset = RAW_ESCAPE + TextColor.RESET.value[1:] if raw else TextColor.RESET.value
+        parts: typing.List[str] = []
+        append = parts.append
+        current = None
+        for string, color, bold, underline, italic, strikethrough in zip(
+                self._strings, self._colors, self._bolds, self._underlines, self._italics, self._strikethroughs
+        ):
+            if not string:
+                continue
+            style = (color if isinstance(color, TextColor) else tuple(color), bold, underline, italic, strikethrough)
+            if raw and ESCAPE in string:
+                # e.g. a nested FormatString that was already rendered
+                string = toRaw(string)
+            if style != current:
+                prefix = stylePrefix(style, raw)
+                if current is None:
+                    append(prefix)
+                elif prefix == reset:
+                    append(reset)
+                else:
+                    append(reset + prefix)
+                current = style
+            append(string)
+        if current is None:
+            return str()
+        append(reset)
+        return ''.join(parts)
 
     def __repr__(self) -> str:
         """
@@ -216,10 +301,9 @@ class FormatString:
         Notes
         -----
         This method is used for testing.
+        The raw codes are written by the renderer itself, so the output is not scanned
+        again. Every code of `TextColor.RawCodes` and `TextEffects.RawCodes` is the escape
+        sequence with ESC written as `\\033`, which is what the renderer does for every
+        escape character.
         """
-        string = self.__str__()
-        for color, code in TextColor.RawCodes().items():
-            string = string.replace(color.value, code)
-        for effect, code in TextEffects.RawCodes().items():
-            string = string.replace(effect.value, code)
-        return string
+        return self.render(raw=True)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import itertools
+import sys
+import unicodedata
+from dataclasses import dataclass, field
+from util.formatter.TextColor import *
+from util.formatter.FormatString import stylePrefix
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'Column',
+    'TableWriter',
+    'displayWidth',
+    'fitWidth',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+def displayWidth(text: str) -> int:
+    """
+    Returns the number of terminal cells a string takes.
+
+    Notes
+    -----
+    East asian wide and fullwidth characters take two cells, combining marks and
+    zero-width format characters take none.
+
+    Doctests
+    --------
+    >>> displayWidth('abc'), displayWidth('日本'), displayWidth('e\\u0301')
+    (3, 4, 1)
+    """
+    if text.isascii():
+        return len(text)
+    width = 0
+    for char in text:
+        if unicodedata.combining(char) or unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+    return width
+
+
+def fitWidth(text: str, width: int, truncate: bool = True) -> str:
+    """
+    Pads a string with spaces (or truncates it with `…`) to a display width.
+
+    Parameters
+    ----------
+    text: str
+        The string.
+    width: int
+        The display width.
+    truncate: bool
+        Whether to truncate longer strings, they are kept as they are otherwise.
+    """
+    current = displayWidth(text)
+    if current <= width:
+        return text + ' ' * (width - current)
+    if not truncate:
+        return text
+    result = []
+    used = 0
+    for char in text:
+        size = displayWidth(char)
+        if used + size > width - 1:
+            break
+        result.append(char)
+        used += size
+    return ''.join(result) + '…' + ' ' * (width - 1 - used)
+
+
+@dataclass
+class Column:
+    """
+    A column of a table.
+
+    Attributes
+    ----------
+    color: TextColor | typing.Tuple[TextColor, ...]
+        The color of the cells.
+    bold: bool
+        Whether the cells are bold.
+    minWidth: int
+        The minimum width of the column.
+    maxWidth: typing.Optional[int]
+        The maximum width of the column, longer cells are truncated with `…`.
+    """
+    color: TextColor | typing.Tuple[TextColor, ...] = field(default=TextColor.RESET)
+    bold: bool = field(default=False)
+    minWidth: int = field(default=0)
+    maxWidth: typing.Optional[int] = field(default=None)
+
+
+class TableWriter:
+    """
+    Writes rows of strings as aligned columns.
+
+    Attributes
+    ----------
+    columns: typing.Sequence[Column]
+        The columns.
+    stream: typing.TextIO
+        The output stream.
+    color: bool
+        Whether to write escape sequences.
+    separator: str
+        The string between two cells.
+    sample: int
+        The number of rows used to compute the column widths of a stream of rows.
+    chunkSize: int
+        The number of rows written to the stream at once.
+
+    Notes
+    -----
+    Column widths are computed in one pass when the rows are a sequence, and from the
+    first `sample` rows otherwise, so streams are written while they are read. Cells that
+    are wider than their column overflow it, unless the column has a maximum width.
+    The last column is not padded.
+
+    Widths are display widths (see `displayWidth`), so wide characters stay aligned.
+    Rows of ASCII cells that fit their columns are formatted by a precompiled template.
+
+    Doctests
+    --------
+    >>> import io
+    >>> stream = io.StringIO()
+    >>> TableWriter([Column(), Column(maxWidth=4), Column()], stream, color=False).write([
+    ...     ('1', 'NAME', 'a'), ('10', 'NUMBER', '1'),
+    ... ])
+    >>> print(stream.getvalue(), end='')
+    1  | NAME | a
+    10 | NUM… | 1
+    """
+    columns: typing.Sequence[Column]
+    stream: typing.TextIO
+    color: bool
+    separator: str
+    sample: int
+    chunkSize: int
+
+    def __init__(self, columns: typing.Sequence[Column], stream: typing.Optional[typing.TextIO] = None, *,
+                 color: bool = True, separator: str = ' | ', sample: int = 4096, chunkSize: int = 4096):
+        self.columns = columns
+        self.stream = sys.stdout if stream is None else stream
+        self.color = color
+        self.separator = separator
+        self.sample = sample
+        self.chunkSize = chunkSize
+
+    def widths(self, rows: typing.Iterable[typing.Sequence[str]]) -> typing.List[int]:
+        """
+        Returns the width of each column for the given rows.
+        """
+        widths = [column.minWidth for column in self.columns]
+        for row in rows:
+            for index, cell in enumerate(row):
+                size = len(cell) if cell.isascii() else displayWidth(cell)
+                if size > widths[index]:
+                    widths[index] = size
+        return [
+            width if column.maxWidth is None else min(width, column.maxWidth)
+            for width, column in zip(widths, self.columns)
+        ]
+
+    def write(self, rows: typing.Iterable[typing.Sequence[str]]):
+        """
+        Writes the rows.
+
+        Parameters
+        ----------
+        rows: typing.Iterable[typing.Sequence[str]]
+            The cells of each row, one string per column.
+        """
+        if isinstance(rows, typing.Sequence):
+            widths = self.widths(rows)
+        else:
+            rows = iter(rows)
+            head = list(itertools.islice(rows, self.sample))
+            widths = self.widths(head)
+            rows = itertools.chain(head, rows)
+        last = len(self.columns) - 1
+        prefixes = []
+        suffix = TextColor.RESET.value if self.color else str()
+        fields = []
+        for index, (column, width) in enumerate(zip(self.columns, widths)):
+            prefix = stylePrefix(
+                (column.color if isinstance(column.color, TextColor) else tuple(column.color),
+                 column.bold, False, False, False)
+            ) if self.color else str()
+            prefixes.append(prefix)
+            padding = str() if index == last else f':<{width}'
+            fields.append(prefix.replace('{', '{{').replace('}', '}}') + f'{{{index}{padding}}}' + suffix)
+        template = self.separator.replace('{', '{{').replace('}', '}}').join(fields)
+        # The cells longer than this can't use the template
+        limits = [
+            width if column.maxWidth is not None and index != last else sys.maxsize
+            for index, (column, width) in enumerate(zip(self.columns, widths))
+        ]
+
+        buffer: typing.List[str] = []
+        write = self.stream.write
+        for row in rows:
+            if all(cell.isascii() and len(cell) <= limit for cell, limit in zip(row, limits)):
+                buffer.append(template.format(*row))
+            else:
+                buffer.append(self.separator.join(
+                    prefixes[index] + (cell if index == last else fitWidth(
+                        cell, widths[index], self.columns[index].maxWidth is not None
+                    )) + suffix
+                    for index, cell in enumerate(row)
+                ))
+            if len(buffer) >= self.chunkSize:
+                buffer.append(str())
+                write('\n'.join(buffer))
+                buffer.clear()
+        if buffer:
+            buffer.append(str())
+            write('\n'.join(buffer))
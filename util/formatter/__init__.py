@@ -9,6 +9,8 @@ TextEffects
     A class that represents text effects.
 TextColor
     A class that represents a color.
+TableWriter
+    A class that writes aligned columns.
 
 References
 ----------
@@ -18,3 +20,4 @@ References
 from util.formatter.FormatString import *
 from util.formatter.TextEffects import *
 from util.formatter.TextColor import *
+from util.formatter.TableWriter import *
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import importlib
+import sys
+import types
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'LazyModule',
+    'lazyExports',
+]
+
+
+# MAIN CONTENT
+# ============>
+
+class LazyModule(types.ModuleType):
+    """
+    A module that imports its exports on first access.
+
+    Attributes
+    ----------
+    _lazy_names: typing.Dict[str, str]
+        The exported names mapped to the (relative) names of the modules that define them.
+
+    Notes
+    -----
+    Packages in this project name their modules after the class they define (e.g.
+    `frontend/lexer/Lexer.py` defines `Lexer`). Importing a submodule binds it as an attribute
+    of the package, which would shadow the class of the same name, so such bindings are
+    replaced with the class itself.
+    """
+    _lazy_names: typing.Dict[str, str]
+
+    def __getattr__(self, name: str) -> typing.Any:
+        lazy_names = self.__dict__.get('_lazy_names', dict())
+        if name not in lazy_names:
+            raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}')
+        module = importlib.import_module(lazy_names[name], self.__name__)
+        value = getattr(module, name)
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: typing.Any):
+        lazy_names = self.__dict__.get('_lazy_names', dict())
+        if name in lazy_names and isinstance(value, types.ModuleType) and hasattr(value, name):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self) -> typing.List[str]:
+        return sorted(set(self.__dict__) | set(self.__dict__.get('_lazy_names', dict())))
+
+
+def lazyExports(name: str, names: typing.Dict[str, str]):
+    """
+    Makes the exports of a package lazy.
+
+    Parameters
+    ----------
+    name: str
+        The name of the package (i.e. `__name__`).
+    names: typing.Dict[str, str]
+        The exported names mapped to the (relative) names of the modules that define them.
+
+    Notes
+    -----
+    Call it at the end of the package `__init__.py`, `__all__` should list the same names.
+    """
+    module = sys.modules[name]
+    module.__class__ = LazyModule
+    module.__dict__['_lazy_names'] = names
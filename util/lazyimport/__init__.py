@@ -0,0 +1,15 @@
+"""
+Package for lazy imports.
+
+Classes
+-------
+LazyModule
+    A module that imports its exports on first access.
+
+Functions
+---------
+lazyExports
+    Makes the exports of a package lazy.
+"""
+
+from util.lazyimport.LazyModule import *
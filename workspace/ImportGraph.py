@@ -0,0 +1,268 @@
+"""
+Import dependency graph of a workspace.
+
+Notes
+-----
+Imports are resolved to files by their package headers:
+
+- `import a.b.c` and `import a.b.c as d` depend on the files of package `a.b` (or of
+  package `a.b.c` if there's no package `a.b`, i.e. a package is imported by its name).
+- `import a.b.*` depends on the files of package `a.b`.
+
+A file depends on another file if one of its imports resolves to it, files never depend
+on themselves.
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+from concurrent.futures import Executor, ThreadPoolExecutor
+from workspace.WorkspaceIndex import WorkspaceIndex
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'ImportGraph',
+]
+
+# MAIN CONTENT
+# ============>
+
+_R = typing.TypeVar('_R')
+
+
+class ImportGraph:
+    """
+    The dependencies between the files of a workspace.
+
+    Attributes
+    ----------
+    files: typing.Dict[str, typing.Optional[str]]
+        The package of each file.
+    packages: typing.Dict[str, typing.List[str]]
+        The files of each package.
+    dependencies: typing.Dict[str, typing.Set[str]]
+        The files each file depends on.
+    dependents: typing.Dict[str, typing.Set[str]]
+        The files that depend on each file.
+    unresolved: typing.List[typing.Tuple[str, str]]
+        The imports that don't resolve to any file, as (path, imported name).
+    """
+    files: typing.Dict[str, typing.Optional[str]]
+    packages: typing.Dict[str, typing.List[str]]
+    dependencies: typing.Dict[str, typing.Set[str]]
+    dependents: typing.Dict[str, typing.Set[str]]
+    unresolved: typing.List[typing.Tuple[str, str]]
+
+    def __init__(self, files: typing.Dict[str, typing.Optional[str]],
+                 imports: typing.Iterable[typing.Tuple[str, str, str]]):
+        """
+        Parameters
+        ----------
+        files: typing.Dict[str, typing.Optional[str]]
+            The package of each file.
+        imports: typing.Iterable[typing.Tuple[str, str, str]]
+            The imports, as (path, package, name) where name is `*` for all names.
+        """
+        self.files = dict(files)
+        self.dependencies = {path: set() for path in self.files}
+        self.dependents = {path: set() for path in self.files}
+        self.unresolved = []
+        self.packages = packages = dict()
+        for path, package in sorted(self.files.items()):
+            if package is not None:
+                packages.setdefault(package, []).append(path)
+        for path, package, name in imports:
+            targets = packages.get(package, None)
+            if targets is None and name != '*':
+                targets = packages.get(f'{package}.{name}' if package else name, None)
+            if targets is None:
+                self.unresolved.append((path, f'{package}.{name}' if package else name))
+                continue
+            for target in targets:
+                if target != path:
+                    self.dependencies[path].add(target)
+                    self.dependents[target].add(path)
+
+    @classmethod
+    def fromIndex(cls, index: WorkspaceIndex) -> ImportGraph:
+        """
+        Builds the graph from a workspace index, without parsing anything.
+        """
+        files = dict(index.connection.execute('SELECT path, package FROM files'))
+        imports = index.connection.execute(
+            'SELECT files.path, imports.package, name FROM imports JOIN files ON files.id = imports.file'
+        )
+        return cls(files, imports)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def filesOf(self, package: str) -> typing.List[str]:
+        return list(self.packages.get(package, list()))
+
+    # Cycles
+    # ------>
+
+    def components(self) -> typing.List[typing.List[str]]:
+        """
+        Returns the strongly connected components, dependencies first.
+
+        Notes
+        -----
+        Tarjan's algorithm with an explicit stack, so large workspaces don't hit the
+        recursion limit. Components are returned in reverse topological order of the
+        dependency edges, i.e. a component comes after every component it depends on.
+        """
+        index: typing.Dict[str, int] = dict()
+        low: typing.Dict[str, int] = dict()
+        onStack: typing.Set[str] = set()
+        stack: typing.List[str] = []
+        result: typing.List[typing.List[str]] = []
+        counter = 0
+        for root in sorted(self.files):
+            if root in index:
+                continue
+            work: typing.List[typing.Tuple[str, typing.Iterator[str]]] = []
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            onStack.add(root)
+            work.append((root, iter(sorted(self.dependencies[root]))))
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        onStack.add(child)
+                        work.append((child, iter(sorted(self.dependencies[child]))))
+                    elif child in onStack:
+                        low[node] = min(low[node], index[child])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onStack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    result.append(sorted(component))
+        return result
+
+    def cycles(self) -> typing.List[typing.List[str]]:
+        """
+        Returns the groups of files that import each other (directly or indirectly).
+        """
+        return [component for component in self.components() if len(component) > 1]
+
+    # Scheduling
+    # ---------->
+
+    def waves(self, paths: typing.Optional[typing.Iterable[str]] = None) -> typing.List[typing.List[str]]:
+        """
+        Groups the files into waves, every file only depends on files of earlier waves.
+
+        Parameters
+        ----------
+        paths: typing.Optional[typing.Iterable[str]]
+            Only schedules these files (dependencies outside of them are considered done).
+
+        Returns
+        -------
+        typing.List[typing.List[str]]
+            The waves.
+
+        Notes
+        -----
+        The files of a cycle can't be ordered, so they are put in the same wave.
+        """
+        selected = set(self.files if paths is None else paths)
+        components = [
+            [path for path in component if path in selected]
+            for component in self.components()
+        ]
+        components = [component for component in components if component]
+        componentOf = {path: i for i, component in enumerate(components) for path in component}
+        level = [0] * len(components)
+        # Components come after their dependencies, so a single pass computes the levels
+        for i, component in enumerate(components):
+            for path in component:
+                for dependency in self.dependencies[path]:
+                    j = componentOf.get(dependency, i)
+                    if j != i:
+                        level[i] = max(level[i], level[j] + 1)
+        waves: typing.List[typing.List[str]] = [[] for _ in range(max(level, default=-1) + 1)]
+        for i, component in enumerate(components):
+            waves[level[i]].extend(component)
+        return [sorted(wave) for wave in waves]
+
+    def downstream(self, paths: typing.Iterable[str]) -> typing.Set[str]:
+        """
+        Returns the files that (transitively) depend on the given files, including them.
+        """
+        result = set(paths)
+        stack = list(result)
+        while stack:
+            for dependent in self.dependents[stack.pop()]:
+                if dependent not in result:
+                    result.add(dependent)
+                    stack.append(dependent)
+        return result
+
+    def downstreamOfPackage(self, package: str) -> typing.Set[str]:
+        """
+        Returns the files that have to be rebuilt when a package changes.
+        """
+        return self.downstream(self.filesOf(package))
+
+    def run(self, function: typing.Callable[[str], _R], paths: typing.Optional[typing.Iterable[str]] = None,
+            executor: typing.Optional[Executor] = None) -> typing.Dict[str, _R]:
+        """
+        Runs a function on every file, wave by wave, in a worker pool.
+
+        Parameters
+        ----------
+        function: typing.Callable[[str], _R]
+            The work of a file, it receives the path. With a process pool it must be picklable.
+        paths: typing.Optional[typing.Iterable[str]]
+            Only runs on these files, e.g. `downstream(changed)`.
+        executor: typing.Optional[Executor]
+            The worker pool, a thread pool is used by default.
+
+        Returns
+        -------
+        typing.Dict[str, _R]
+            The result of each file.
+
+        Notes
+        -----
+        A wave starts when the previous one has finished, so the function may use the
+        results of the dependencies of a file (e.g. through a shared store).
+        If the function raises, the exception is propagated and later waves don't start.
+        """
+        own = executor is None
+        if own:
+            executor = ThreadPoolExecutor(thread_name_prefix='workspace')
+        try:
+            results: typing.Dict[str, _R] = dict()
+            for wave in self.waves(paths):
+                futures = {path: executor.submit(function, path) for path in wave}
+                for path, future in futures.items():
+                    results[path] = future.result()
+            return results
+        finally:
+            if own:
+                executor.shutdown()
@@ -0,0 +1,344 @@
+"""
+Workspace-wide symbol and import index.
+
+Notes
+-----
+The index is a SQLite database. Every file is stored with the hash of its content, and
+it is only parsed again when the hash changes, so queries never parse anything.
+
+Tables
+------
+files(id, path, hash, package, error)
+    The indexed files, `package` is the identifier of the package header.
+imports(file, package, name, alias, row, column, end_row, end_column)
+    The import headers. `import a.b.c` imports `c` from package `a.b`, `import a.b.*`
+    imports `*` from package `a.b`, and `alias` is the name after `as`.
+functions(file, name, row, column, end_row, end_column)
+    The function declarations.
+"""
+
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import hashlib
+import pathlib
+import sqlite3
+from dataclasses import dataclass
+from frontend.lexer import Lexer, TokenView
+from frontend.parser.AST import File, FunctionDeclaration, ImportAlias, Identifier, TokenWrapper
+from frontend.parser.TreeDiff import nodeSpan
+
+# EXPORTS
+# =======>
+
+__all__ = [
+    'WorkspaceIndex',
+    'ImportSite',
+    'FunctionSite',
+]
+
+# MAIN CONTENT
+# ============>
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    hash TEXT NOT NULL,
+    package TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS imports (
+    file INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    package TEXT NOT NULL,
+    name TEXT NOT NULL,
+    alias TEXT,
+    row INTEGER,
+    column INTEGER,
+    end_row INTEGER,
+    end_column INTEGER
+);
+CREATE TABLE IF NOT EXISTS functions (
+    file INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    row INTEGER,
+    column INTEGER,
+    end_row INTEGER,
+    end_column INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_package ON files(package);
+CREATE INDEX IF NOT EXISTS imports_package ON imports(package);
+CREATE INDEX IF NOT EXISTS imports_file ON imports(file);
+CREATE INDEX IF NOT EXISTS functions_name ON functions(name);
+CREATE INDEX IF NOT EXISTS functions_file ON functions(file);
+'''
+
+
+@dataclass(frozen=True)
+class ImportSite:
+    """
+    An import header of an indexed file.
+
+    Attributes
+    ----------
+    path: str
+        The path of the importing file.
+    package: str
+        The imported package.
+    name: str
+        The imported name, `*` for all names.
+    alias: typing.Optional[str]
+        The alias of the imported name.
+    row, column, end_row, end_column: typing.Optional[int]
+        The span of the import header.
+    """
+    path: str
+    package: str
+    name: str
+    alias: typing.Optional[str]
+    row: typing.Optional[int]
+    column: typing.Optional[int]
+    end_row: typing.Optional[int]
+    end_column: typing.Optional[int]
+
+
+@dataclass(frozen=True)
+class FunctionSite:
+    """
+    A function declaration of an indexed file.
+
+    Attributes
+    ----------
+    path: str
+        The path of the file.
+    package: typing.Optional[str]
+        The package of the file.
+    name: str
+        The name of the function.
+    row, column, end_row, end_column: typing.Optional[int]
+        The span of the declaration.
+    """
+    path: str
+    package: typing.Optional[str]
+    name: str
+    row: typing.Optional[int]
+    column: typing.Optional[int]
+    end_row: typing.Optional[int]
+    end_column: typing.Optional[int]
+
+
+def identifierText(identifier: Identifier | TokenWrapper) -> str:
+    if isinstance(identifier, TokenWrapper):
+        return identifier.value
+    return '.'.join(attr.value for attr in identifier.attrs)
+
+
+def contentHash(source: str) -> str:
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class WorkspaceIndex:
+    """
+    A persistent index of the packages, imports and functions of a workspace.
+
+    Attributes
+    ----------
+    connection: sqlite3.Connection
+        The connection to the database.
+    parsed: int
+        The number of files parsed by this instance.
+
+    Notes
+    -----
+    Files are updated in a single transaction with bulk inserts, and unchanged files
+    (same content hash) are skipped without parsing.
+    """
+    connection: sqlite3.Connection
+    parsed: int
+
+    def __init__(self, database: str | pathlib.Path = ':memory:'):
+        self.connection = sqlite3.connect(str(database))
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.parsed = 0
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> WorkspaceIndex:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    # Updating
+    # -------->
+
+    def update(self, sources: typing.Mapping[str, str]) -> int:
+        """
+        Indexes the files whose content changed.
+
+        Parameters
+        ----------
+        sources: typing.Mapping[str, str]
+            The content of each file by its path.
+
+        Returns
+        -------
+        int
+            The number of files that were (re)indexed.
+        """
+        hashes = dict(self.connection.execute('SELECT path, hash FROM files'))
+        changed = {
+            path: (source, digest) for path, source in sources.items()
+            if hashes.get(path) != (digest := contentHash(source))
+        }
+        if not changed:
+            return 0
+        imports = []
+        functions = []
+        # All changed files are tokenized at once into a shared buffer
+        buffer = Lexer.tokenizeMany(source for source, _ in changed.values())
+        with self.connection:
+            self.connection.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in changed])
+            for (path, (source, digest)), tokens in zip(changed.items(), buffer):
+                tree, error = self._parse(tokens, path)
+                package = None if tree is None else identifierText(tree.packageHeader.identifier)
+                file = self.connection.execute(
+                    'INSERT INTO files (path, hash, package, error) VALUES (?, ?, ?, ?)',
+                    (path, digest, package, error)
+                ).lastrowid
+                if tree is not None:
+                    imports.extend(self._imports(file, tree))
+                    functions.extend(self._functions(file, tree))
+            self.connection.executemany('INSERT INTO imports VALUES (?, ?, ?, ?, ?, ?, ?, ?)', imports)
+            self.connection.executemany('INSERT INTO functions VALUES (?, ?, ?, ?, ?, ?)', functions)
+        return len(changed)
+
+    def remove(self, paths: typing.Iterable[str]) -> int:
+        """
+        Removes files from the index.
+
+        Returns
+        -------
+        int
+            The number of removed files.
+        """
+        with self.connection:
+            cursor = self.connection.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in paths])
+        return cursor.rowcount
+
+    def indexDirectory(self, root: str | pathlib.Path, pattern: str = '**/*.kiwi') -> int:
+        """
+        Indexes every file of a directory, and removes the files that no longer exist.
+
+        Parameters
+        ----------
+        root: str | pathlib.Path
+            The directory.
+        pattern: str
+            The glob pattern of the source files.
+
+        Returns
+        -------
+        int
+            The number of files that were (re)indexed.
+        """
+        root = pathlib.Path(root)
+        sources = {str(path): path.read_text() for path in sorted(root.glob(pattern)) if path.is_file()}
+        stale = [
+            path for path, in self.connection.execute('SELECT path FROM files')
+            if path not in sources and pathlib.Path(path).is_relative_to(root)
+        ]
+        if stale:
+            self.remove(stale)
+        return self.update(sources)
+
+    def _parse(self, tokens: TokenView, path: str) -> typing.Tuple[typing.Optional[File], typing.Optional[str]]:
+        from frontend.parser.Parser import Parser
+        self.parsed += 1
+        parser = Parser(tokens)  # type: ignore
+        try:
+            tree = parser.start()
+        except SyntaxError as error:
+            return None, f'{path}:{error.lineno}: {error.msg}'
+        if tree is None:
+            return None, f'{path}: invalid syntax'
+        return tree, None
+
+    @staticmethod
+    def _imports(file: int, tree: File) -> typing.Iterator[typing.Tuple[typing.Any, ...]]:
+        for header in tree.importList:
+            parts = identifierText(header.identifier).split('.')
+            alias = None
+            if isinstance(header.alias, ImportAlias) and isinstance(header.alias.identifier, TokenWrapper):
+                alias = header.alias.identifier.value
+            if isinstance(header.alias, ImportAlias) and alias is None:
+                package, name = '.'.join(parts), '*'
+            else:
+                package, name = '.'.join(parts[:-1]), parts[-1]
+            yield (file, package, name, alias, *(nodeSpan(header) or (None,) * 4))
+
+    @staticmethod
+    def _functions(file: int, tree: File) -> typing.Iterator[typing.Tuple[typing.Any, ...]]:
+        for declaration in tree.declarations:
+            if isinstance(declaration, FunctionDeclaration):
+                yield (file, identifierText(declaration.identifier), *(nodeSpan(declaration) or (None,) * 4))
+
+    # Queries
+    # ------->
+
+    def filesOf(self, package: str) -> typing.List[str]:
+        """
+        Returns the files that declare a package.
+        """
+        return [path for path, in self.connection.execute(
+            'SELECT path FROM files WHERE package = ? ORDER BY path', (package,)
+        )]
+
+    def importersOf(self, package: str, name: typing.Optional[str] = None) -> typing.List[ImportSite]:
+        """
+        Returns the import headers that import from a package.
+
+        Parameters
+        ----------
+        package: str
+            The package, e.g. `a.b` for `import a.b.c` or `import a.b.*`.
+        name: typing.Optional[str]
+            Only returns the imports of this name (or of `*`).
+        """
+        query = (
+            'SELECT files.path, imports.package, name, alias, row, column, end_row, end_column '
+            'FROM imports JOIN files ON files.id = imports.file WHERE imports.package = ?'
+        )
+        arguments: typing.Tuple[str, ...] = (package,)
+        if name is not None:
+            query += " AND name IN (?, '*')"
+            arguments += (name,)
+        query += ' ORDER BY files.path, row'
+        return [ImportSite(*row) for row in self.connection.execute(query, arguments)]
+
+    def functionsNamed(self, name: str) -> typing.List[FunctionSite]:
+        """
+        Returns the declarations of a function.
+        """
+        return [FunctionSite(*row) for row in self.connection.execute(
+            'SELECT files.path, files.package, name, row, column, end_row, end_column '
+            'FROM functions JOIN files ON files.id = functions.file WHERE name = ? ORDER BY files.path, row',
+            (name,)
+        )]
+
+    def errors(self) -> typing.List[typing.Tuple[str, str]]:
+        """
+        Returns the files that failed to parse, with their errors.
+        """
+        return list(self.connection.execute('SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path'))
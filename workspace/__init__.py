@@ -0,0 +1,19 @@
+"""
+Workspace package.
+
+This package contains the tools that work on all the files of a workspace at once.
+
+Classes
+-------
+WorkspaceIndex
+    The persistent index of the packages, imports and functions.
+ImportGraph
+    The dependencies between the files, with cycle detection and a parallel scheduler.
+
+Notes
+-----
+Run `python -m workspace --help` for the command line options.
+"""
+
+from .WorkspaceIndex import *
+from .ImportGraph import *
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+# IMPORTS
+# =======>
+
+# noinspection PyUnresolvedReferences
+import typing
+import argparse
+import sys
+import time
+from workspace.WorkspaceIndex import WorkspaceIndex
+from workspace.ImportGraph import ImportGraph
+
+# MAIN CONTENT
+# ============>
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(prog='python -m workspace', description='Kiwi workspace tools')
+    argparser.add_argument('--database', default='build/workspace.db', help='path of the index database')
+    commands = argparser.add_subparsers(dest='command', required=True)
+    index_command = commands.add_parser('index', help='index the files of a directory')
+    index_command.add_argument('root', help='the workspace directory')
+    index_command.add_argument('--pattern', default='**/*.kiwi', help='glob pattern of the source files')
+    importers_command = commands.add_parser('importers', help='list the files that import a package')
+    importers_command.add_argument('package')
+    importers_command.add_argument('--name', default=None, help='only the imports of this name')
+    function_command = commands.add_parser('function', help='list the declarations of a function')
+    function_command.add_argument('name')
+    package_command = commands.add_parser('package', help='list the files of a package')
+    package_command.add_argument('package')
+    graph_command = commands.add_parser('graph', help='print the build waves and the import cycles')
+    graph_command.add_argument('--changed', default=None, help='only the files downstream of this package')
+    args = argparser.parse_args()
+
+    with WorkspaceIndex(args.database) as index:
+        start = time.perf_counter()
+        if args.command == 'index':
+            count = index.indexDirectory(args.root, args.pattern)
+            for path, error in index.errors():
+                print(error, file=sys.stderr)
+            print(f'{count} files indexed, {len(index)} in total')
+        elif args.command == 'importers':
+            for site in index.importersOf(args.package, args.name):
+                alias = f' as {site.alias}' if site.alias else ''
+                print(f'{site.path}:{site.row}: import {site.package}.{site.name}{alias}')
+        elif args.command == 'function':
+            for site in index.functionsNamed(args.name):
+                print(f'{site.path}:{site.row}: fun {site.name} (package {site.package})')
+        elif args.command == 'graph':
+            graph = ImportGraph.fromIndex(index)
+            paths = None if args.changed is None else graph.downstreamOfPackage(args.changed)
+            for number, wave in enumerate(graph.waves(paths), start=1):
+                print(f'wave {number}: {" ".join(wave)}')
+            for cycle in graph.cycles():
+                print(f'cycle: {" -> ".join(cycle)}', file=sys.stderr)
+            for path, name in graph.unresolved:
+                print(f'{path}: unresolved import {name}', file=sys.stderr)
+        else:
+            print(*index.filesOf(args.package), sep='\n')
+        print(f'{(time.perf_counter() - start) * 1000:.1f}ms', file=sys.stderr)